@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Published Catalog Archives
+
+Exports published modules (courses/google-pm/cX/mY/, or the object store
+for modules published with --store) into one zip archive for the
+recording pipeline. Archives are deterministic: members
+are sorted, timestamps and permissions are fixed, so the same modules
+always produce the same bytes. The last member, MANIFEST.json, lists
+every module's files with their offsets, sizes, CRC and SHA256, so a
+consumer can read one module (or one file, with a ranged read) without
+touching the rest of the archive.
+
+Re-exports reuse the previous archive: a file whose SHA256 is unchanged
+has its compressed bytes copied across instead of being recompressed.
+
+Usage:
+    python archive_export.py create recording.zip --course 1
+    python archive_export.py create recording.zip C1M1 C1M2 --status published
+    python archive_export.py list recording.zip
+    python archive_export.py extract recording.zip C1M2 ./out
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+import tempfile
+import zipfile
+import zlib
+from pathlib import Path
+from typing import NamedTuple
+
+from module_scan import scan_module
+from object_store import STORE_ROOT, ObjectStore, StoreError
+from tracing import count, traced
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+WORKSPACE_ROOT = Path(os.environ.get("WORKSPACE_ROOT", "."))
+COURSES_ROOT = WORKSPACE_ROOT / "courses"
+PUBLISHED_ROOT = COURSES_ROOT / "google-pm"
+
+MANIFEST_NAME = "MANIFEST.json"
+MANIFEST_FORMAT = 1
+DEFAULT_LEVEL = 6
+
+# Fixed member metadata: 1980-01-01 00:00 (the earliest DOS date), rw-r--r--
+DOS_TIME = 0
+DOS_DATE = (0 << 9) | (1 << 5) | 1
+EXTERNAL_ATTR = 0o100644 << 16
+VERSION_MADE_BY = (3 << 8) | 20  # Unix, zip 2.0
+VERSION_NEEDED = 20
+UTF8_FLAG = 0x0800
+
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+END_RECORD = struct.Struct("<IHHHHIIH")
+ZIP_LIMIT = 0xFFFFFFFF  # No zip64: archives stay under 4GB and 65535 files
+
+MODULE_DIR = re.compile(r"c(\d+)/m(\d+)$")
+
+
+class ArchiveError(Exception):
+    """Raised for unreadable archives or exports beyond the zip limits."""
+
+
+class Member(NamedTuple):
+    """One file in the archive, as recorded in the manifest."""
+    name: str
+    offset: int  # Local header
+    data_offset: int  # Compressed bytes
+    compressed_size: int
+    size: int
+    crc32: int
+    method: int  # 0 = stored, 8 = deflated
+    sha256: str
+
+
+# =============================================================================
+# SELECTION
+# =============================================================================
+
+def published_modules(root: Path = PUBLISHED_ROOT,
+                      store_root: Path = STORE_ROOT) -> dict[str, Path]:
+    """
+    Module code -> published folder, in course/module order.
+
+    Modules published into the object store map to their store manifest
+    instead (see module_files); a plain folder takes precedence, as it
+    does for the search index.
+    """
+    found = {}
+    store = ObjectStore(store_root)
+    if store.manifests.is_dir():
+        for path in store.manifests.glob("*.json"):
+            if re.fullmatch(r"C\d+M\d+", path.stem.upper()):
+                found[path.stem.upper()] = path
+    for course_dir in root.glob("c*"):
+        for module_dir in course_dir.glob("m*"):
+            match = MODULE_DIR.search(module_dir.relative_to(root).as_posix())
+            if match and module_dir.is_dir():
+                found[f"C{match.group(1)}M{match.group(2)}"] = module_dir
+    return dict(sorted(found.items(), key=lambda item: tuple(
+        int(n) for n in re.findall(r"\d+", item[0]))))
+
+
+def is_stored(source: Path) -> bool:
+    """True if source is an object store manifest rather than a folder."""
+    return source.suffix == ".json" and source.parent.name == "manifests"
+
+
+def module_prefix(code: str, source: Path) -> str:
+    """
+    Archive path of a module, relative to courses/.
+
+    Stored modules get the folder a plain publish would have used, so
+    consumers see one layout whichever way a module was published.
+    """
+    if is_stored(source):
+        course, module = re.findall(r"\d+", code)
+        return (PUBLISHED_ROOT / f"c{course}" / f"m{module}").relative_to(COURSES_ROOT).as_posix()
+    return source.relative_to(COURSES_ROOT).as_posix()
+
+
+def module_files(code: str, source: Path) -> list[tuple[str, bytes]]:
+    """(path relative to the module, contents) of each published file, sorted."""
+    if is_stored(source):
+        files = ObjectStore(source.parent.parent).read_module(code)
+        return sorted(files.items())
+    return [('/'.join(f.parts), f.path.read_bytes())
+            for f in sorted(scan_module(source).files, key=lambda f: f.parts)
+            if not f.name.startswith('.')]
+
+
+def module_status(code: str, source: Path) -> str | None:
+    """status field of a published module.yaml."""
+    from yaml_compat import require_yaml, safe_load
+    try:
+        if is_stored(source):
+            text = ObjectStore(source.parent.parent).read_file(code, "module.yaml")
+            if text is None:
+                return None
+        else:
+            text = (source / "module.yaml").read_bytes()
+        data = safe_load(text.decode('utf-8'))
+    except (OSError, UnicodeDecodeError, StoreError, require_yaml().YAMLError):
+        return None
+    return data.get("status") if isinstance(data, dict) else None
+
+
+def select_modules(codes: list[str] | None = None, course: int | None = None,
+                   status: str | None = None,
+                   root: Path = PUBLISHED_ROOT,
+                   store_root: Path = STORE_ROOT) -> dict[str, Path]:
+    """Published modules matching every given filter."""
+    modules = published_modules(root, store_root)
+    if codes:
+        wanted = {c.upper() for c in codes}
+        modules = {c: p for c, p in modules.items() if c in wanted}
+    if course is not None:
+        modules = {c: p for c, p in modules.items() if c.startswith(f"C{course}M")}
+    if status:
+        modules = {c: p for c, p in modules.items() if module_status(c, p) == status}
+    return modules
+
+
+# =============================================================================
+# WRITING
+# =============================================================================
+
+def load_manifest(archive: Path) -> dict | None:
+    """MANIFEST.json of an archive, or None if missing or unreadable."""
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            manifest = json.loads(zf.read(MANIFEST_NAME))
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        return None
+    return manifest if manifest.get("format") == MANIFEST_FORMAT else None
+
+
+def compress(data: bytes, level: int) -> tuple[int, bytes]:
+    """(method, bytes) for a member: raw deflate, or stored at level 0."""
+    if level == 0:
+        return 0, data
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return 8, compressor.compress(data) + compressor.flush()
+
+
+def module_digest(members: list[Member]) -> str:
+    """SHA256 over a module's member names and content hashes."""
+    hasher = hashlib.sha256()
+    for member in members:
+        hasher.update(f"{member.name}\0{member.sha256}\n".encode('utf-8'))
+    return hasher.hexdigest()
+
+
+class ArchiveWriter:
+    """Writes members one at a time, then the manifest and central directory."""
+
+    def __init__(self, out, level: int = DEFAULT_LEVEL,
+                 previous: Path | None = None):
+        self.out = out
+        self.level = level
+        self.members: list[Member] = []
+        self.reused = self.compressed = 0
+
+        # Members of the previous archive, by name, for raw copies. Only an
+        # archive written at the same level can be reused byte for byte.
+        self.previous_file = None
+        self.previous: dict[str, Member] = {}
+        manifest = load_manifest(previous) if previous else None
+        if manifest and manifest.get("level") == level:
+            self.previous_file = open(previous, 'rb')
+            for module in manifest["modules"].values():
+                for entry in module["members"]:
+                    member = Member(**entry)
+                    self.previous[member.name] = member
+
+    def close(self) -> None:
+        if self.previous_file:
+            self.previous_file.close()
+
+    def _write_member(self, name: str, method: int, crc: int, size: int,
+                      payload: bytes, sha256: str) -> Member:
+        encoded = name.encode('utf-8')
+        offset = self.out.tell()
+        if offset + LOCAL_HEADER.size + len(encoded) + len(payload) > ZIP_LIMIT:
+            raise ArchiveError("archive would exceed 4GB; export fewer modules")
+        self.out.write(LOCAL_HEADER.pack(0x04034b50, VERSION_NEEDED, UTF8_FLAG, method,
+                                         DOS_TIME, DOS_DATE, crc, len(payload), size,
+                                         len(encoded), 0))
+        self.out.write(encoded)
+        member = Member(name, offset, self.out.tell(), len(payload), size, crc, method, sha256)
+        self.out.write(payload)
+        self.members.append(member)
+        return member
+
+    def add(self, name: str, data: bytes) -> Member:
+        """Add a file, copying its compressed bytes from the previous archive if unchanged."""
+        sha256 = hashlib.sha256(data).hexdigest()
+        old = self.previous.get(name)
+        if old and old.sha256 == sha256 and old.size == len(data):
+            self.previous_file.seek(old.data_offset)
+            payload = self.previous_file.read(old.compressed_size)
+            if len(payload) == old.compressed_size:
+                self.reused += 1
+                return self._write_member(name, old.method, old.crc32, old.size,
+                                          payload, sha256)
+
+        method, payload = compress(data, self.level)
+        self.compressed += 1
+        count(bytes_read=len(data))
+        return self._write_member(name, method, zlib.crc32(data), len(data), payload, sha256)
+
+    def finish(self, modules: dict[str, tuple[str, list[Member]]]) -> dict:
+        """
+        Write MANIFEST.json (stored) and the central directory.
+
+        modules maps code -> (folder path in the archive, members).
+        Returns the manifest.
+        """
+        manifest = {
+            "format": MANIFEST_FORMAT,
+            "level": self.level,
+            "modules": {
+                code: {"path": path,
+                       "digest": module_digest(members),
+                       "members": [m._asdict() for m in members]}
+                for code, (path, members) in modules.items()
+            },
+        }
+        data = json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8')
+        self._write_member(MANIFEST_NAME, 0, zlib.crc32(data), len(data), data,
+                           hashlib.sha256(data).hexdigest())
+
+        if len(self.members) > 0xFFFF:
+            raise ArchiveError("more than 65535 files; export fewer modules")
+        directory_offset = self.out.tell()
+        for m in self.members:
+            encoded = m.name.encode('utf-8')
+            self.out.write(CENTRAL_HEADER.pack(
+                0x02014b50, VERSION_MADE_BY, VERSION_NEEDED, UTF8_FLAG, m.method,
+                DOS_TIME, DOS_DATE, m.crc32, m.compressed_size, m.size, len(encoded),
+                0, 0, 0, 0, EXTERNAL_ATTR, m.offset))
+            self.out.write(encoded)
+        directory_size = self.out.tell() - directory_offset
+        if directory_offset + directory_size > ZIP_LIMIT:
+            raise ArchiveError("archive would exceed 4GB; export fewer modules")
+        self.out.write(END_RECORD.pack(0x06054b50, 0, 0, len(self.members), len(self.members),
+                                       directory_size, directory_offset, 0))
+        return manifest
+
+
+class ExportResult(NamedTuple):
+    modules: int
+    files: int
+    reused: int
+    compressed: int
+    size: int
+
+
+@traced("archive.create")
+def create_archive(archive: Path, modules: dict[str, Path],
+                   level: int = DEFAULT_LEVEL,
+                   previous: Path | None = None,
+                   reuse: bool = True) -> ExportResult:
+    """
+    Write modules into archive, replacing it atomically.
+
+    modules maps codes to published folders or store manifests (see
+    published_modules). Member names are paths relative to courses/.
+    Unless reuse is False,
+    unchanged members are copied from previous, which defaults to the
+    existing archive at the same path.
+    """
+    if previous is None and archive.exists():
+        previous = archive
+    archive.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=archive.parent, prefix=f".{archive.name}-")
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            writer = ArchiveWriter(out, level, previous if reuse else None)
+            try:
+                written: dict[str, tuple[str, list[Member]]] = {}
+                for code, source in modules.items():
+                    prefix = module_prefix(code, source)
+                    written[code] = (prefix, [
+                        writer.add(f"{prefix}/{name}", data)
+                        for name, data in module_files(code, source)
+                    ])
+                writer.finish(written)
+            finally:
+                writer.close()
+            size = out.tell()
+        os.replace(tmp, archive)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return ExportResult(len(modules), writer.reused + writer.compressed,
+                        writer.reused, writer.compressed, size)
+
+
+# =============================================================================
+# READING
+# =============================================================================
+
+def read_members(archive: Path, members: list[dict]) -> dict[str, bytes]:
+    """
+    File contents of manifest members, read by offset and verified.
+
+    Only the given members' bytes are read, whatever the archive's size.
+    """
+    contents = {}
+    with open(archive, 'rb') as f:
+        for entry in members:
+            member = Member(**entry)
+            f.seek(member.data_offset)
+            payload = f.read(member.compressed_size)
+            data = zlib.decompress(payload, -15) if member.method == 8 else payload
+            if hashlib.sha256(data).hexdigest() != member.sha256:
+                raise ArchiveError(f"{member.name}: content hash mismatch")
+            contents[member.name] = data
+    return contents
+
+
+def extract_module(archive: Path, code: str, out_dir: Path) -> list[Path]:
+    """Write one module's files under out_dir; returns the paths written."""
+    manifest = load_manifest(archive)
+    if manifest is None:
+        raise ArchiveError(f"{archive} has no readable {MANIFEST_NAME}")
+    module = manifest["modules"].get(code.upper())
+    if module is None:
+        raise ArchiveError(f"{code.upper()} is not in {archive}")
+
+    written = []
+    prefix = module["path"] + "/"
+    for name, data in read_members(archive, module["members"]).items():
+        relative = name[len(prefix):]
+        if not name.startswith(prefix) or ".." in relative.split("/"):
+            raise ArchiveError(f"{name}: member outside {module['path']}")
+        target = out_dir / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        written.append(target)
+    return written
+
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Export published modules into an indexed zip archive",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python archive_export.py create recording.zip --course 1
+  python archive_export.py create recording.zip C1M1 C1M2 --status published
+  python archive_export.py list recording.zip
+  python archive_export.py extract recording.zip C1M2 ./out
+        """
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    create = sub.add_parser("create", help="Write (or rewrite) an archive")
+    create.add_argument("archive", type=Path, help="Output .zip file")
+    create.add_argument("codes", nargs="*", help="Module codes (default: all published)")
+    create.add_argument("--course", type=int, help="Only this course")
+    create.add_argument("--status", help="Only modules whose module.yaml has this status")
+    create.add_argument("--level", type=int, default=DEFAULT_LEVEL, choices=range(10),
+                        metavar="0-9", help=f"Deflate level, 0 = store (default: {DEFAULT_LEVEL})")
+    create.add_argument("--previous", type=Path,
+                        help="Archive to reuse unchanged members from (default: the output)")
+    create.add_argument("--no-reuse", action="store_true", help="Recompress every file")
+
+    listing = sub.add_parser("list", help="List the modules in an archive")
+    listing.add_argument("archive", type=Path)
+    listing.add_argument("--json", action="store_true", help="Print the whole manifest")
+
+    extract = sub.add_parser("extract", help="Extract one module")
+    extract.add_argument("archive", type=Path)
+    extract.add_argument("module", help="Module code (e.g., C1M1)")
+    extract.add_argument("out_dir", type=Path, help="Output folder")
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "create":
+            modules = select_modules(args.codes, args.course, args.status)
+            missing = {c.upper() for c in args.codes} - set(modules) if args.codes else set()
+            if missing and not (args.course or args.status):
+                print(f"Error: Not published: {', '.join(sorted(missing))}")
+                return 1
+            if not modules:
+                print(f"Error: No published modules match under {PUBLISHED_ROOT}")
+                return 1
+            result = create_archive(args.archive, modules, args.level,
+                                    args.previous, reuse=not args.no_reuse)
+            print(f"[OK] {args.archive}: {result.modules} module(s), {result.files} file(s), "
+                  f"{result.size / 1024:,.0f} KB")
+            print(f"     {result.reused} file(s) reused from the previous archive, "
+                  f"{result.compressed} compressed")
+            return 0
+
+        manifest = load_manifest(args.archive)
+        if manifest is None:
+            print(f"Error: {args.archive} has no readable {MANIFEST_NAME}")
+            return 1
+
+        if args.command == "list":
+            if args.json:
+                print(json.dumps(manifest, indent=2))
+                return 0
+            print(f"{'Module':<8} {'Files':>5} {'Size':>10}  Digest")
+            for code, module in manifest["modules"].items():
+                size = sum(m["size"] for m in module["members"])
+                print(f"{code:<8} {len(module['members']):>5} {size / 1024:>7,.0f} KB  "
+                      f"{module['digest'][:16]}")
+            return 0
+
+        written = extract_module(args.archive, args.module, args.out_dir)
+        print(f"[OK] Extracted {len(written)} file(s) to {args.out_dir}")
+        return 0
+
+    except (ArchiveError, StoreError) as e:
+        print(f"Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
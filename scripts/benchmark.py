@@ -0,0 +1,748 @@
+#!/usr/bin/env python3
+"""
+Synthetic-Catalog Benchmarks
+
+Generates throwaway course trees in the production layout
+
+    COURSE_BASE_PATH/{year}/Course X/Module Y/<Month Year> ReWork/
+
+with realistic module.yaml, brief, speaker notes and 100-500KB
+presentations, then times each script's main entry point against them at
+several catalog sizes. Results are written as JSON so runs from different
+commits can be compared.
+
+Usage:
+    python benchmark.py                          # 10, 100 and 1000 modules
+    python benchmark.py --sizes 10,100 --output bench.json
+    python benchmark.py --sizes 100 --compare bench.json
+    python benchmark.py --stages startup,validate_module
+    python benchmark.py --sizes 200 --stages git     # Git backends compared
+    python benchmark.py --stages timing              # NumPy vs pure-Python sweeps
+    python benchmark.py --stages links               # Link checker vs a local server
+    python benchmark.py --sizes 50 --stages queue    # Concurrent publish-queue clients
+    python benchmark.py --stages diff                # Rework diffs against revised copies
+    python benchmark.py --sizes 100 --stages dupes   # MinHash/LSH near-duplicate search
+    python benchmark.py --stages search              # Full-text index build and queries
+    python benchmark.py --stages claims              # Claims registry refresh and queries
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from module_scan import scan_module
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+KIT_ROOT = SCRIPTS_DIR.parent
+
+DEFAULT_SIZES = [10, 100, 1000]
+MODULES_PER_COURSE = 20
+SYNTHETIC_YEAR = "2026"  # publish_module only searches 2026 and 2025
+REWORK_NAME = "March 2026 ReWork"
+
+# Presentation size range (bytes); stays under validate_module.MAX_FILE_SIZE
+PRESENTATION_MIN = 100 * 1024
+PRESENTATION_MAX = 480 * 1024
+
+# `python cdk.py <args>` wall-time budget, in milliseconds
+STARTUP_BUDGET_MS = 150
+
+STAGES = ["startup", "init", "validate_brief", "validate_module", "publish", "git", "queue",
+          "diff", "dupes", "search", "claims", "timing", "links"]
+
+# Concurrent `publish_queue.py submit` clients in the queue stage
+QUEUE_SUBMITTERS = 8
+
+# Stand-in server endpoints for the links stage: path -> link should be ok
+LINK_ENDPOINTS = {
+    "/ok": True,
+    "/slow": True,
+    "/redirect": True,
+    "/moved": True,
+    "/no-head": True,
+    "/loop": False,
+    "/fail": False,
+    "/missing": False,
+}
+SLOW_SECONDS = 0.05
+
+STATUSES = ["draft", "in_progress", "review", "published"]
+WORDS = ("project stakeholder scope schedule budget risk quality team charter "
+         "milestone agile scrum sprint backlog dependency estimate velocity "
+         "retrospective communication plan deliverable baseline variance").split()
+
+
+# =============================================================================
+# SYNTHETIC TREE
+# =============================================================================
+
+def module_codes(count: int) -> list[tuple[int, int]]:
+    """(course, module) pairs for count modules, MODULES_PER_COURSE per course."""
+    return [(i // MODULES_PER_COURSE + 1, i % MODULES_PER_COURSE + 1) for i in range(count)]
+
+
+def make_presentation(rng: random.Random, title: str, target_size: int) -> str:
+    """Template head and navigation around generated slides up to target_size."""
+    template = (KIT_ROOT / "templates" / "presentation-template.html").read_text(encoding='utf-8')
+    head, _, rest = template.partition('<div class="slide active title-slide">')
+    _, _, tail = rest.partition('<!-- ========================================\n         JAVASCRIPT')
+    tail = '<!-- ========================================\n         JAVASCRIPT' + tail
+
+    slides = []
+    size = len(head) + len(tail)
+    number = 1
+    while size < target_size:
+        bullets = "\n".join(
+            f"                <li>{' '.join(rng.choice(WORDS) for _ in range(14))}</li>"
+            for _ in range(6)
+        )
+        slide = f"""    <div class="slide{' active title-slide' if number == 1 else ''}">
+        <div class="slide-header">
+            <h1>{title} - Part {number}</h1>
+        </div>
+        <div class="slide-content">
+            <ul>
+{bullets}
+            </ul>
+        </div>
+        <div class="slide-footer">
+            <p>{title}</p>
+            <p class="slide-number">{number}</p>
+        </div>
+    </div>
+
+"""
+        slides.append(slide)
+        size += len(slide)
+        number += 1
+
+    return head + "".join(slides) + tail
+
+
+def build_catalog(base: Path, count: int, seed: int = 0) -> list[tuple[str, Path]]:
+    """
+    Create count synthetic modules under base.
+
+    Returns (module code, rework folder) pairs.
+    """
+    rng = random.Random(seed)
+    brief = (KIT_ROOT / "examples" / "sample-brief.md").read_text(encoding='utf-8')
+    notes = (KIT_ROOT / "examples" / "sample-speaker-notes.md").read_text(encoding='utf-8')
+    modules = []
+
+    for course, module in module_codes(count):
+        code = f"C{course}M{module}"
+        title = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {module}"
+        folder = base / SYNTHETIC_YEAR / f"Course {course}" / f"Module {module}" / REWORK_NAME
+        folder.mkdir(parents=True, exist_ok=True)
+
+        (folder / "module.yaml").write_text(f"""schema_version: "1.0"
+code: "{code}"
+title: "{title}"
+status: "{rng.choice(STATUSES)}"
+score: {rng.randint(0, 4)}
+
+deliverables:
+  presentation: "presentation.html"
+  speaker_notes: "speaker_notes.md"
+  brief: "02_Presentation_Brief.md"
+""", encoding='utf-8')
+        (folder / "02_Presentation_Brief.md").write_text(brief, encoding='utf-8')
+        (folder / "speaker_notes.md").write_text(notes, encoding='utf-8')
+        target = rng.randint(PRESENTATION_MIN, PRESENTATION_MAX)
+        (folder / "presentation.html").write_text(
+            make_presentation(rng, title, target), encoding='utf-8'
+        )
+        modules.append((code, folder))
+
+    return modules
+
+
+def init_git_repo(path: Path) -> None:
+    """Create an empty throwaway repository for publish benchmarks."""
+    path.mkdir(parents=True, exist_ok=True)
+    for cmd in (["git", "init", "-q"],
+                ["git", "config", "user.email", "bench@example.invalid"],
+                ["git", "config", "user.name", "benchmark"],
+                ["git", "commit", "-q", "--allow-empty", "-m", "init"]):
+        subprocess.run(cmd, cwd=path, check=True, capture_output=True)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Keep-alive server with slow, redirecting and failing LINK_ENDPOINTS."""
+    protocol_version = "HTTP/1.1"
+
+    def respond(self, status: int, location: str | None = None, body: bool = True) -> None:
+        self.send_response(status)
+        if location:
+            self.send_header("Location", location)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        if body:
+            self.wfile.write(b"ok")
+
+    def route(self, body: bool) -> None:
+        path, _, query = self.path.partition("?")
+        query = f"?{query}" if query else ""
+        if path == "/slow":
+            time.sleep(SLOW_SECONDS)
+        if path in ("/ok", "/slow"):
+            self.respond(200, body=body)
+        elif path == "/redirect":
+            self.respond(302, f"/ok{query}", body)
+        elif path == "/moved":
+            self.respond(301, f"http://{self.headers['Host']}/redirect{query}", body)
+        elif path == "/loop":
+            self.respond(302, self.path, body)
+        elif path == "/no-head":
+            self.respond(405 if not body else 200, body=body)
+        elif path == "/fail":
+            self.respond(500, body=body)
+        else:
+            self.respond(404, body=body)
+
+    def do_HEAD(self):
+        self.route(body=False)
+
+    def do_GET(self):
+        self.route(body=True)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# =============================================================================
+# STAGES
+# =============================================================================
+
+def timed(func) -> float:
+    """Run func with stdout discarded; return elapsed seconds."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+    return time.perf_counter() - start
+
+
+def bench_startup(work: Path, modules: list[tuple[str, Path]]) -> dict:
+    """Wall time of `cdk --help` and `cdk validate-module --help`."""
+    results = {}
+    for label, args in (("cdk_help", ["--help"]),
+                        ("validate_module_help", ["validate-module", "--help"])):
+        runs = []
+        for _ in range(5):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, str(SCRIPTS_DIR / "cdk.py"), *args],
+                           capture_output=True, check=True)
+            runs.append(time.perf_counter() - start)
+        results[f"{label}_ms"] = round(min(runs) * 1000, 1)
+
+    worst = max(results.values())
+    return {
+        "seconds": worst / 1000,
+        "budget_ms": STARTUP_BUDGET_MS,
+        "within_budget": worst <= STARTUP_BUDGET_MS,
+        **results,
+    }
+
+
+def bench_init(work: Path, modules: list[tuple[str, Path]]) -> dict:
+    """project_init.initialize_project for every module (no editor launch)."""
+    import project_init
+
+    base = work / "init"
+    for _, folder in modules:
+        # Same Course/Module names as the catalog, without the year level
+        (base / folder.parent.parent.name / folder.parent.name).mkdir(parents=True, exist_ok=True)
+
+    project_init.BASE_COURSE_PATH = base
+    project_init.STARTER_KIT_PATH = KIT_ROOT / "templates"
+
+    def run():
+        for code, _ in modules:
+            course, module = code[1:].split('M')
+            project_init.initialize_project(int(course), int(module), code,
+                                            force=True, no_launch=True)
+
+    return {"seconds": timed(run)}
+
+
+def bench_validate_brief(work: Path, modules: list[tuple[str, Path]]) -> dict:
+    """validate_brief.BriefValidator on every module's brief."""
+    from validate_brief import BriefValidator
+
+    def run():
+        for _, folder in modules:
+            BriefValidator(str(folder / "02_Presentation_Brief.md")).validate()
+
+    return {"seconds": timed(run)}
+
+
+def bench_validate_module(work: Path, modules: list[tuple[str, Path]]) -> dict:
+    """validate_module.validate_module on every module folder."""
+    import validate_module
+
+    def run():
+        for _, folder in modules:
+            validate_module.validate_module(folder)
+
+    return {"seconds": timed(run)}
+
+
+def bench_publish(work: Path, modules: list[tuple[str, Path]]) -> dict:
+    """publish_module.publish_module for every module into a fresh git repo."""
+    import publish_module
+
+    workspace = work / "workspace"
+    init_git_repo(workspace)
+    publish_module.WORKSPACE_ROOT = workspace
+    publish_module.COURSES_ROOT = workspace / "courses"
+    publish_module.ONEDRIVE_BASE = work / "base"
+
+    failures = []
+
+    def run():
+        for code, _ in modules:
+            if publish_module.publish_module(code) != 0:
+                failures.append(code)
+
+    return {"seconds": timed(run), "failures": len(failures)}
+
+
+def bench_git(work: Path, modules: list[tuple[str, Path]]) -> dict:
+    """
+    Commit every module into a fresh repo with each git_backend, twice.
+
+    The first pass publishes everything; the second after a one-line edit to
+    each module's speaker notes, as when republishing a batch of updates.
+    Files are copied up front, so only the git work is timed. seconds is the
+    fast-import total; the subprocess backend is reported alongside.
+    """
+    from git_backend import FastImportGit, SubprocessGit
+
+    results = {}
+    trees = set()
+    for backend in (SubprocessGit, FastImportGit):
+        name = backend.name.replace('-', '_')
+        repo = work / f"git-{backend.name}"
+        init_git_repo(repo)
+        folders = []
+        for code, folder in modules:
+            dest = repo / "courses" / code.lower()
+            dest.mkdir(parents=True)
+            for entry in scan_module(folder, recursive=False).files:
+                shutil.copy2(entry.path, dest / entry.name)
+            folders.append((code, dest))
+
+        def run(action):
+            with backend(repo) as git:
+                for code, dest in folders:
+                    ok, result = git.commit_folder(dest, f"[courses] {action} {code}")
+                    if not ok:
+                        raise RuntimeError(result)
+
+        results[f"{name}_publish_seconds"] = round(timed(lambda: run("Publish")), 4)
+        for _, dest in folders:
+            with open(dest / "speaker_notes.md", 'a', encoding='utf-8') as f:
+                f.write("\nRevised.\n")
+        results[f"{name}_update_seconds"] = round(timed(lambda: run("Update")), 4)
+        results[f"{name}_seconds"] = round(results[f"{name}_publish_seconds"]
+                                           + results[f"{name}_update_seconds"], 4)
+        trees.add(subprocess.run(["git", "rev-parse", "HEAD^{tree}"], cwd=repo,
+                                 capture_output=True, text=True).stdout.strip())
+
+    return {
+        "seconds": results["fast_import_seconds"],
+        **results,
+        "update_speedup": round(results["subprocess_update_seconds"]
+                                / results["fast_import_update_seconds"], 1),
+        "trees_match": len(trees) == 1,
+    }
+
+
+def bench_queue(work: Path, modules: list[tuple[str, Path]]) -> dict:
+    """
+    QUEUE_SUBMITTERS processes each `publish_queue.py submit --drain --wait`
+    every module at once, into a fresh repo.
+
+    One of them becomes the worker; duplicate submissions should coalesce
+    into far fewer publish runs than jobs, and every job should finish.
+    """
+    import sqlite3
+
+    workspace = work / "queue-workspace"
+    init_git_repo(workspace)
+    db = work / "publish-queue.db"
+    env = {**os.environ, "WORKSPACE_ROOT": str(workspace),
+           "COURSE_BASE_PATH": str(work / "base"), "PUBLISH_QUEUE_DB": str(db)}
+    command = [sys.executable, str(SCRIPTS_DIR / "publish_queue.py"), "submit",
+               "--drain", "--wait", *(code for code, _ in modules)]
+
+    start = time.perf_counter()
+    clients = [subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
+               for _ in range(QUEUE_SUBMITTERS)]
+    exit_codes = [client.wait() for client in clients]
+    seconds = time.perf_counter() - start
+
+    conn = sqlite3.connect(str(db))
+    jobs, done, runs, batches = conn.execute(
+        "SELECT COUNT(*), SUM(status = 'done'), COUNT(DISTINCT run_id), COUNT(DISTINCT batch) "
+        "FROM jobs").fetchone()
+    conn.close()
+    dirty = subprocess.run(["git", "status", "--porcelain", "--", "courses"], cwd=workspace,
+                           capture_output=True, text=True).stdout.strip()
+    return {
+        "seconds": seconds,
+        "jobs": jobs,
+        "publish_runs": runs,
+        "batches": batches,
+        "all_done": done == jobs and not any(exit_codes),
+        "index_clean": not dirty,
+    }
+
+
+def bench_diff(work: Path, modules: list[tuple[str, Path]]) -> dict:
+    """
+    rework_diff.diff_reworks of every module against a revised copy.
+
+    The copy moves the first slide to the end, edits the second, adds one
+    and appends a brief section, so every matching pass has work to do.
+    """
+    import rework_diff
+    from publish_module import SLIDE_START
+
+    pairs = []
+    for code, folder in modules:
+        revised = work / "reworks" / code
+        shutil.copytree(folder, revised)
+        html = (revised / "presentation.html").read_text(encoding='utf-8')
+        starts = [m.start() for m in SLIDE_START.finditer(html)]
+        slides = [html[a:b] for a, b in zip(starts, starts[1:] + [starts[-1]])]
+        slides = slides[1:] + slides[:1]
+        slides[0] += "<p>Revised.</p>\n"
+        slides.insert(3, '<div class="slide"><h1>New slide</h1><p>Added.</p></div>\n')
+        (revised / "presentation.html").write_text(
+            html[:starts[0]] + "".join(slides) + html[starts[-1]:], encoding='utf-8')
+        with open(revised / "02_Presentation_Brief.md", 'a', encoding='utf-8') as f:
+            f.write("\n## Revision Notes\n\nAdded for this rework.\n")
+        pairs.append((folder, revised))
+
+    diffs = []
+    seconds = timed(lambda: diffs.extend(rework_diff.diff_reworks(old, new) for old, new in pairs))
+    presentations = [d for result in diffs for d in result if d.document == "presentation"]
+    return {
+        "seconds": seconds,
+        "all_detected": all(d.counts["added"] == 1 and d.counts["edited"] >= 1
+                            and d.counts["moved"] >= 1 for d in presentations),
+    }
+
+
+def bench_dupes(work: Path, modules: list[tuple[str, Path]]) -> dict:
+    """
+    near_duplicates over every module's slides and notes, cold then cached.
+
+    Every tenth module gets a copy of another module's slide with one word
+    changed; each copy should be found.
+    """
+    import near_duplicates
+    from publish_module import SLIDE_START
+
+    folders = []
+    planted = 0
+    for n, (code, folder) in enumerate(modules):
+        copy = work / "dupes" / code
+        shutil.copytree(folder, copy)
+        folders.append(copy)
+        if n % 10 == 9:
+            source = (modules[n - 5][1] / "presentation.html").read_text(encoding='utf-8')
+            starts = [m.start() for m in SLIDE_START.finditer(source)]
+            words = source[starts[2]:starts[3]].split(" ")
+            words[len(words) // 2] = "revised"
+            html = (copy / "presentation.html").read_text(encoding='utf-8')
+            at = SLIDE_START.search(html, 1).start()
+            (copy / "presentation.html").write_text(html[:at] + " ".join(words) + html[at:],
+                                                    encoding='utf-8')
+            planted += 1
+
+    results = {}
+    groups = []
+    for run in ("cold", "cached"):
+        cache = near_duplicates.SignatureCache(work / "minhash")
+        groups = []
+        results[f"{run}_seconds"] = round(timed(lambda: groups.extend(near_duplicates.find_groups(
+            near_duplicates.collect_units(folders, list(near_duplicates.KINDS), cache)))), 4)
+    found = sum(1 for g in groups if g.kind == "slides" and len(g.members) == 2)
+    return {"seconds": results["cold_seconds"], **results,
+            "planted": planted, "all_found": found == planted}
+
+
+def bench_search(work: Path, modules: list[tuple[str, Path]]) -> dict:
+    """
+    search_index: index every module's files, then time a mix of queries.
+
+    seconds is the full index build; query_ms the median of the queries
+    (terms, a phrase, and field filters) against the finished index.
+    """
+    import search_index
+
+    index_dir = work / "search"
+
+    def build():
+        for code, folder in modules:
+            files = {e.name: e.path.read_bytes() for e in scan_module(folder, recursive=False).files}
+            search_index.index_module(code, files, index_dir=index_dir)
+
+    seconds = timed(build)
+    queries = [("project risk", {}), ('"project charter"', {}), ("stakeholder budget", {"course": 1}),
+               ("schedule quality", {"types": ["notes", "brief"]}), ("scope", {"module": 2})]
+    times = []
+    hits = 0
+    for _ in range(3):
+        for query, filters in queries:
+            start = time.perf_counter()
+            hits += len(search_index.search(query, index_dir=index_dir, **filters))
+            times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        "seconds": seconds,
+        "query_ms": round(times[len(times) // 2] * 1000, 2),
+        "max_query_ms": round(times[-1] * 1000, 2),
+        "index_bytes": sum(p.stat().st_size for p in index_dir.iterdir()),
+        "hits": hits,
+    }
+
+
+def bench_claims(work: Path, modules: list[tuple[str, Path]]) -> dict:
+    """
+    claims_registry refresh over every module, cold then unchanged, plus a
+    source/year query. The unchanged refresh should only stat files.
+    """
+    import claims_registry
+
+    conn = claims_registry.connect(work / "claims.db")
+    folders = [folder for _, folder in modules]
+    seconds = timed(lambda: claims_registry.refresh_registry(conn, folders, prune=True))
+    warm = timed(lambda: claims_registry.refresh_registry(conn, folders, prune=True))
+    rows = []
+    query = timed(lambda: rows.extend(claims_registry.query_claims(
+        conn, kinds=["percent"], before=2023, limit=None)))
+    findings = conn.execute("SELECT COUNT(*) FROM claims").fetchone()[0]
+    conn.close()
+    return {
+        "seconds": seconds,
+        "unchanged_seconds": round(warm, 4),
+        "query_ms": round(query * 1000, 2),
+        "findings": findings,
+    }
+
+
+def bench_timing(work: Path, modules: list[tuple[str, Path]]) -> dict:
+    """timing_model.sweep of a what-if grid over every module's brief, both ways."""
+    import timing_model
+
+    inputs, budgets = [], []
+    for _, folder in modules:
+        parsed = timing_model.parse_timing(
+            (folder / "02_Presentation_Brief.md").read_text(encoding='utf-8'))
+        if parsed:
+            inputs.append(parsed[0])
+            budgets.append(parsed[1])
+    axes = {"pace": timing_model.parse_values("1.5:4:0.25"),
+            "buffer": timing_model.parse_values("0:10:1"),
+            "activities": timing_model.parse_values("0:30:5")}
+
+    results = {"scenarios": len(timing_model.scenario_grid(axes))}
+    results["python_seconds"] = round(timed(
+        lambda: timing_model.sweep(inputs, budgets, axes, use_numpy=False)), 4)
+    if timing_model.load_numpy() is None:
+        return {"seconds": results["python_seconds"], **results}
+
+    results["numpy_seconds"] = round(timed(
+        lambda: timing_model.sweep(inputs, budgets, axes, use_numpy=True)), 4)
+    return {
+        "seconds": results["numpy_seconds"],
+        "speedup": round(results["python_seconds"] / results["numpy_seconds"], 1),
+        **results,
+    }
+
+
+def bench_links(work: Path, modules: list[tuple[str, Path]]) -> dict:
+    """link_check on one Sources slide per module, against a local stand-in server."""
+    import link_check
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    root = f"http://127.0.0.1:{server.server_address[1]}"
+    endpoints = list(LINK_ENDPOINTS)
+
+    # One endpoint per module, plus a citation every module shares
+    folder = work / "links"
+    folder.mkdir(parents=True, exist_ok=True)
+    files, expected = [], {f"{root}/ok?shared": True}
+    for i, (code, _) in enumerate(modules):
+        url = f"{root}{endpoints[i % len(endpoints)]}?module={code}"
+        expected[url] = LINK_ENDPOINTS[endpoints[i % len(endpoints)]]
+        path = folder / f"{code}.html"
+        path.write_text(f"""<div class="slide"><div class="slide-header"><h1>Sources</h1></div>
+<ul class="sources-list"><li><a href="{url}">{url}</a>.</li><li>{root}/ok?shared</li></ul></div>
+""", encoding='utf-8')
+        files.append(path)
+
+    cache = link_check.LinkCache(work / "links.json")
+    try:
+        start = time.perf_counter()
+        results = link_check.check_links(list(link_check.collect_links(files)), cache)
+        seconds = time.perf_counter() - start
+        cached_seconds = timed(lambda: link_check.check_links(
+            list(link_check.collect_links(files)), link_check.LinkCache(work / "links.json")))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return {
+        "seconds": seconds,
+        "cached_seconds": round(cached_seconds, 4),
+        "links": len(results),
+        "all_expected": {u: r.ok for u, r in results.items()} == expected,
+    }
+
+
+STAGE_FUNCTIONS = {
+    "startup": bench_startup,
+    "init": bench_init,
+    "validate_brief": bench_validate_brief,
+    "validate_module": bench_validate_module,
+    "publish": bench_publish,
+    "git": bench_git,
+    "queue": bench_queue,
+    "diff": bench_diff,
+    "dupes": bench_dupes,
+    "search": bench_search,
+    "claims": bench_claims,
+    "timing": bench_timing,
+    "links": bench_links,
+}
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+
+def kit_commit() -> str | None:
+    """Short commit of the kit checkout, if it is a git repository."""
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                            cwd=KIT_ROOT, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def run_benchmarks(sizes: list[int], stages: list[str], seed: int = 0) -> dict:
+    """Build one synthetic tree per size and time each stage against it."""
+    report = {
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "commit": kit_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [],
+    }
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix="cdk-bench-") as tmp:
+            work = Path(tmp)
+            start = time.perf_counter()
+            modules = build_catalog(work / "base", size, seed)
+            print(f"[{size} modules] generated in {time.perf_counter() - start:.1f}s")
+
+            for stage in stages:
+                if stage == "startup" and size != sizes[0]:
+                    continue  # Independent of catalog size
+                result = STAGE_FUNCTIONS[stage](work, modules)
+                result = {"stage": stage, "modules": size, **result}
+                result["seconds"] = round(result["seconds"], 4)
+                report["results"].append(result)
+                if stage == "startup":
+                    print(f"  {stage:<16} {result['seconds']:>9.3f}s  "
+                          f"(budget {STARTUP_BUDGET_MS}ms)")
+                    continue
+                result["per_module_ms"] = round(result["seconds"] * 1000 / size, 2)
+                print(f"  {stage:<16} {result['seconds']:>9.3f}s  "
+                      f"{result['per_module_ms']:>8.2f} ms/module")
+
+    return report
+
+
+def compare_reports(previous: dict, current: dict) -> None:
+    """Print per-stage ratios of current vs previous timings."""
+    old = {(r["stage"], r["modules"]): r["seconds"] for r in previous.get("results", [])}
+    print(f"\nCompared with {previous.get('commit') or 'previous run'}:")
+    for r in current["results"]:
+        before = old.get((r["stage"], r["modules"]))
+        if before:
+            ratio = r["seconds"] / before
+            flag = "  (slower)" if ratio > 1.1 else ""
+            print(f"  {r['stage']:<16} {r['modules']:>5}: {before:.3f}s -> "
+                  f"{r['seconds']:.3f}s ({ratio:.2f}x){flag}")
+
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Benchmark the kit's scripts against synthetic course trees",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python benchmark.py --sizes 10,100 --output bench.json
+  python benchmark.py --sizes 100 --compare bench.json
+  python benchmark.py --stages startup
+        """
+    )
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated module counts (default: 10,100,1000)")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"Comma-separated stages (default: {','.join(STAGES)})")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for content")
+    parser.add_argument("--output", type=Path, help="Write results JSON here")
+    parser.add_argument("--compare", type=Path, help="Previous results JSON to compare against")
+
+    args = parser.parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGE_FUNCTIONS]
+    if unknown:
+        print(f"Error: Unknown stage(s): {', '.join(unknown)} (valid: {', '.join(STAGES)})")
+        return 2
+
+    report = run_benchmarks(sizes, stages, args.seed)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding='utf-8')
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        compare_reports(json.loads(args.compare.read_text(encoding='utf-8')), report)
+
+    over_budget = [r for r in report["results"] if r.get("within_budget") is False]
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
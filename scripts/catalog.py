@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Module Catalog
+
+Keeps a SQLite catalog of every module folder (a folder holding a
+module.yaml) under COURSE_BASE_PATH: its module.yaml fields, validation
+result, content and source hashes, size and publish marker. Refreshes are
+incremental: a module is only re-read when its files' sizes or mtimes
+change.
+
+Usage:
+    python catalog.py refresh
+    python catalog.py query --status review --max-score 2
+    python catalog.py query --unpublished
+    python catalog.py query --published-before 2026-09-01 --json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from module_scan import ModuleSnapshot, rework_order, scan_module
+from state_paths import CACHE_DIR
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+COURSE_BASE_PATH = Path(os.environ.get("COURSE_BASE_PATH", "."))
+CATALOG_DB = Path(os.environ.get("CATALOG_DB", CACHE_DIR / "catalog.db"))
+
+# Bump when the table layout changes; older catalogs are rebuilt
+CATALOG_SCHEMA_VERSION = 4
+
+# Deepest level searched for module.yaml ({year}/Course/Module/ReWork = 4)
+MAX_DISCOVERY_DEPTH = 5
+
+MARKER_NAME = "_GIT_PUBLISHED.md"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS modules (
+    path             TEXT PRIMARY KEY,
+    code             TEXT,
+    course           INTEGER,
+    module           INTEGER,
+    rework_date      TEXT,
+    rework           TEXT,
+    title            TEXT,
+    status           TEXT,
+    score            INTEGER,
+    deliverables     TEXT,
+    exit_code        INTEGER,
+    errors           TEXT,
+    content_hash     TEXT,
+    source_hash      TEXT,
+    total_size       INTEGER,
+    file_count       INTEGER,
+    published_at     TEXT,
+    published_commit TEXT,
+    published_hash   TEXT,
+    published_source_hash TEXT,
+    session_minutes    INTEGER,
+    activity_minutes   INTEGER,
+    discussion_minutes INTEGER,
+    buffer_minutes     INTEGER,
+    slide_pace         REAL,
+    slide_budget       INTEGER,
+    slide_count        INTEGER,
+    brief_status       TEXT,
+    fingerprint      TEXT,
+    refreshed_at     TEXT,
+    latest           INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_modules_status ON modules(status, score);
+CREATE INDEX IF NOT EXISTS idx_modules_score ON modules(score);
+CREATE INDEX IF NOT EXISTS idx_modules_course ON modules(course, module);
+CREATE INDEX IF NOT EXISTS idx_modules_code ON modules(code);
+CREATE INDEX IF NOT EXISTS idx_modules_published ON modules(published_at);
+"""
+
+
+# =============================================================================
+# DATABASE
+# =============================================================================
+
+def connect(db_path: Path = CATALOG_DB) -> sqlite3.Connection:
+    """Open (and create or upgrade) the catalog database."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version != CATALOG_SCHEMA_VERSION:
+        # Derived data only: rebuild from the source tree on next refresh
+        conn.execute("DROP TABLE IF EXISTS modules")
+        conn.execute(f"PRAGMA user_version = {CATALOG_SCHEMA_VERSION}")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def fingerprint_of(snapshot: ModuleSnapshot) -> str:
+    """Digest of every file's relative path, size and mtime."""
+    return hashlib.sha1(repr(snapshot.fingerprint()).encode('utf-8')).hexdigest()
+
+
+# =============================================================================
+# DISCOVERY AND INGEST
+# =============================================================================
+
+def discover_modules(base: Path, max_depth: int = MAX_DISCOVERY_DEPTH) -> list[Path]:
+    """Find folders containing module.yaml, without descending into them."""
+    found = []
+    pending = [(os.fspath(base), 0)]
+
+    while pending:
+        dir_path, depth = pending.pop()
+        subdirs = []
+        has_yaml = False
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if entry.name == "module.yaml" and entry.is_file():
+                        has_yaml = True
+                    elif (depth < max_depth and not entry.name.startswith('.')
+                          and entry.is_dir(follow_symlinks=False)):
+                        subdirs.append(entry.path)
+        except OSError:
+            continue
+
+        if has_yaml:
+            found.append(Path(dir_path))
+        else:
+            pending.extend((d, depth + 1) for d in subdirs)
+
+    return sorted(found)
+
+
+def deliverable_file(snapshot: ModuleSnapshot, deliverables, key: str,
+                     suffixes: list[str], name_hint: str = "") -> Path | None:
+    """A deliverable named in module.yaml, else the first matching top-level file."""
+    name = deliverables.get(key) if isinstance(deliverables, dict) else None
+    if isinstance(name, str) and snapshot.get(name):
+        return snapshot.get(name).path
+    candidates = sorted((f for f in snapshot.select(suffixes, top_level=True)
+                         if name_hint in f.name.lower()), key=lambda f: f.name)
+    return candidates[0].path if candidates else None
+
+
+def read_text(path: Path | None) -> str | None:
+    """File contents, or None if missing or unreadable."""
+    if path is None:
+        return None
+    try:
+        return path.read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def brief_fields(snapshot: ModuleSnapshot, deliverables) -> dict:
+    """Timing inputs, stated slide budget and lock state from the brief."""
+    from timing_model import parse_timing
+    from validate_brief import brief_status
+
+    text = read_text(deliverable_file(snapshot, deliverables, "brief", [".md"], "brief"))
+    timing = parse_timing(text) if text else None
+    inputs, slide_budget = timing if timing else ((None,) * 5, None)
+    return {
+        "session_minutes": inputs[0],
+        "activity_minutes": inputs[1],
+        "discussion_minutes": inputs[2],
+        "buffer_minutes": inputs[3],
+        "slide_pace": inputs[4],
+        "slide_budget": slide_budget,
+        "brief_status": brief_status(text) if text else None,
+    }
+
+
+def count_slides(snapshot: ModuleSnapshot, deliverables) -> int | None:
+    """Slides in the presentation deliverable, or None without one."""
+    from publish_module import SLIDE_START
+
+    text = read_text(deliverable_file(snapshot, deliverables, "presentation", [".html"]))
+    return len(SLIDE_START.findall(text)) if text is not None else None
+
+
+def build_row(module_path: Path, snapshot: ModuleSnapshot) -> dict:
+    """Read one module folder into a catalog row."""
+    # Imported here so `catalog query` never loads the validators or PyYAML
+    from publish_module import calculate_content_hash, calculate_source_hash, parse_marker
+    from validate_module import check_module
+
+    report = check_module(module_path, snapshot=snapshot)
+    data = report.data or {}
+
+    code = str(data.get("code") or "").upper()
+    match = re.match(r'C(\d+)M(\d+)', code)
+    year, month, _ = rework_order(module_path)
+
+    marker = parse_marker(module_path / MARKER_NAME) if snapshot.exists(MARKER_NAME) else {}
+    score = data.get("score")
+    deliverables = data.get("deliverables")
+
+    # Compare like with like: the marker's Source Hash covers what publish
+    # took from this folder, and --optimize is part of it
+    source_hash = calculate_source_hash(snapshot)
+    published_source = marker.get("Source Hash")
+    if published_source and published_source != source_hash:
+        optimized = calculate_source_hash(snapshot, optimize=True)
+        if optimized == published_source:
+            source_hash = optimized
+
+    return {
+        "path": str(module_path),
+        "code": code or None,
+        "course": int(match.group(1)) if match else None,
+        "module": int(match.group(2)) if match else None,
+        "rework_date": f"{year:04d}-{month:02d}" if year else None,
+        "rework": module_path.name,
+        "title": data.get("title"),
+        "status": data.get("status"),
+        "score": score if isinstance(score, int) else None,
+        "deliverables": json.dumps(deliverables) if isinstance(deliverables, dict) else None,
+        "exit_code": report.exit_code,
+        "errors": json.dumps(report.errors),
+        "content_hash": calculate_content_hash(module_path, snapshot),
+        "source_hash": source_hash,
+        "total_size": snapshot.total_size,
+        "file_count": len(snapshot.files),
+        "published_at": marker.get("Published"),
+        "published_commit": marker.get("Git Commit"),
+        "published_hash": marker.get("Content Hash"),
+        "published_source_hash": published_source,
+        **brief_fields(snapshot, deliverables),
+        "slide_count": count_slides(snapshot, deliverables),
+        "fingerprint": fingerprint_of(snapshot),
+        "refreshed_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def refresh_catalog(conn: sqlite3.Connection, base: Path = COURSE_BASE_PATH) -> dict[str, int]:
+    """
+    Bring the catalog in line with the source tree.
+
+    Returns counts of added, updated, unchanged and removed modules.
+    """
+    counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+    known = dict(conn.execute("SELECT path, fingerprint FROM modules").fetchall())
+    seen = set()
+
+    for module_path in discover_modules(base):
+        key = str(module_path)
+        seen.add(key)
+        snapshot = scan_module(module_path)
+        if known.get(key) == fingerprint_of(snapshot):
+            counts["unchanged"] += 1
+            continue
+
+        row = build_row(module_path, snapshot)
+        columns = ", ".join(row)
+        placeholders = ", ".join(f":{k}" for k in row)
+        conn.execute(f"INSERT OR REPLACE INTO modules ({columns}) VALUES ({placeholders})", row)
+        counts["updated" if key in known else "added"] += 1
+
+    removed = [(p,) for p in known if p not in seen]
+    conn.executemany("DELETE FROM modules WHERE path = ?", removed)
+    counts["removed"] = len(removed)
+
+    mark_latest(conn)
+    conn.commit()
+    return counts
+
+
+def mark_latest(conn: sqlite3.Connection) -> None:
+    """Flag the newest rework folder of each module code (by rework_order)."""
+    newest: dict[str, Path] = {}
+    for code, path in conn.execute("SELECT code, path FROM modules WHERE code IS NOT NULL"):
+        folder = Path(path)
+        if code not in newest or rework_order(folder) > rework_order(newest[code]):
+            newest[code] = folder
+    conn.execute("UPDATE modules SET latest = 1")
+    conn.executemany("UPDATE modules SET latest = (path = ?) WHERE code = ?",
+                     [(str(folder), code) for code, folder in newest.items()])
+
+
+# =============================================================================
+# QUERIES
+# =============================================================================
+
+def query_catalog(conn: sqlite3.Connection,
+                  status: str | None = None,
+                  min_score: int | None = None,
+                  max_score: int | None = None,
+                  course: int | None = None,
+                  code: str | None = None,
+                  invalid: bool = False,
+                  unpublished: bool = False,
+                  published_since: str | None = None,
+                  published_before: str | None = None,
+                  all_reworks: bool = False) -> list[sqlite3.Row]:
+    """Filter catalog rows; every filter maps onto an indexed column."""
+    clauses = []
+    params: list = []
+
+    if not all_reworks:
+        clauses.append("latest = 1")
+    if status:
+        clauses.append("status = ?")
+        params.append(status)
+    if min_score is not None:
+        clauses.append("score >= ?")
+        params.append(min_score)
+    if max_score is not None:
+        clauses.append("score <= ?")
+        params.append(max_score)
+    if course is not None:
+        clauses.append("course = ?")
+        params.append(course)
+    if code:
+        clauses.append("code = ?")
+        params.append(code.upper())
+    if invalid:
+        clauses.append("exit_code != 0")
+    if unpublished:
+        # Never published, or the source changed after the last publish
+        clauses.append("(published_source_hash IS NULL OR published_source_hash != source_hash)")
+    if published_since:
+        clauses.append("published_at >= ?")
+        params.append(published_since)
+    if published_before:
+        clauses.append("published_at < ?")
+        params.append(published_before)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    sql = f"SELECT * FROM modules {where} ORDER BY course, module, rework_date, rework"
+    return conn.execute(sql, params).fetchall()
+
+
+def print_rows(rows: list[sqlite3.Row]) -> None:
+    """Print query results as a plain-text table."""
+    header = f"{'Code':<8} {'Status':<12} {'Score':>5} {'Valid':<6} {'Size':>7}  {'Published':<16}  Title"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        score = "-" if row["score"] is None else str(row["score"])
+        valid = "yes" if row["exit_code"] == 0 else f"no({row['exit_code']})"
+        print(f"{row['code'] or '?':<8} {row['status'] or '?':<12} {score:>5} {valid:<6} "
+              f"{(row['total_size'] or 0) // 1024:>5}KB  {row['published_at'] or 'never':<16}  "
+              f"{row['title'] or ''}")
+    print(f"\n{len(rows)} module(s)")
+
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Query the module catalog",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python catalog.py refresh
+  python catalog.py query --status review --max-score 2
+  python catalog.py query --unpublished --course 3
+  python catalog.py query --published-before 2026-09-01 --json
+        """
+    )
+    parser.add_argument("--db", type=Path, default=CATALOG_DB,
+                        help=f"Catalog database (default: {CATALOG_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    refresh = sub.add_parser("refresh", help="Re-read changed modules")
+    refresh.add_argument("--base", type=Path, default=COURSE_BASE_PATH,
+                         help="Course base path (default: COURSE_BASE_PATH)")
+
+    query = sub.add_parser("query", help="List modules matching filters")
+    query.add_argument("--status", help="Module status (e.g. review)")
+    query.add_argument("--min-score", type=int, help="Minimum quality score")
+    query.add_argument("--max-score", type=int, help="Maximum quality score")
+    query.add_argument("--course", type=int, help="Course number")
+    query.add_argument("--code", help="Module code (e.g. C1M1)")
+    query.add_argument("--invalid", action="store_true",
+                       help="Only modules failing validation")
+    query.add_argument("--unpublished", action="store_true",
+                       help="Never published or changed since last publish")
+    query.add_argument("--published-since", metavar="YYYY-MM-DD",
+                       help="Published on or after this date")
+    query.add_argument("--published-before", metavar="YYYY-MM-DD",
+                       help="Published before this date")
+    query.add_argument("--all-reworks", action="store_true",
+                       help="Include older rework folders, not just the latest")
+    query.add_argument("--json", action="store_true", help="Output as JSON")
+
+    args = parser.parse_args(argv)
+    conn = connect(args.db)
+
+    if args.command == "refresh":
+        counts = refresh_catalog(conn, args.base)
+        print(", ".join(f"{k}: {v}" for k, v in counts.items()))
+        return 0
+
+    rows = query_catalog(
+        conn,
+        status=args.status,
+        min_score=args.min_score,
+        max_score=args.max_score,
+        course=args.course,
+        code=args.code,
+        invalid=args.invalid,
+        unpublished=args.unpublished,
+        published_since=args.published_since,
+        published_before=args.published_before,
+        all_reworks=args.all_reworks,
+    )
+    if args.json:
+        print(json.dumps([dict(r) for r in rows], indent=2))
+    else:
+        print_rows(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Curriculum Dev Kit command line
+
+Single entry point for the kit's scripts. Each subcommand's implementation
+is imported only when that subcommand runs, so `cdk --help` and quick
+commands don't pay for PyYAML or the publishing machinery.
+
+Usage:
+    python cdk.py init -c 2 -m 3 -t "Module Title"
+    python cdk.py validate-brief path/to/brief.md
+    python cdk.py validate-module "/path/to/module"
+    python cdk.py publish C1M1 --dry-run
+    python cdk.py catalog query --status review --max-score 2
+    python cdk.py <command> --help
+"""
+
+import importlib
+import sys
+
+# Subcommand -> (module, entry function, one-line help).
+# Entry functions take (argv, prog) and return or raise an exit code.
+COMMANDS = {
+    "init": ("project_init", "main", "Scaffold a new module rework folder"),
+    "validate-brief": ("validate_brief", "main", "Validate a presentation brief"),
+    "validate-module": ("validate_module", "main", "Validate a module before publishing"),
+    "links": ("link_check", "main", "Check Sources-slide and brief links"),
+    "diff": ("rework_diff", "main", "Summarize changes between consecutive reworks"),
+    "dupes": ("near_duplicates", "main", "Find near-duplicate slides across modules"),
+    "search": ("search_index", "main", "Search published courses and research reports"),
+    "claims": ("claims_registry", "main", "Find statistics and attributed claims to fact-check"),
+    "watch": ("watch", "main", "Revalidate ReWork folders as files change"),
+    "publish": ("publish_module", "main", "Publish a module to the Git repository"),
+    "queue": ("publish_queue", "main", "Queue publishes from several people in one workspace"),
+    "catalog": ("catalog", "main", "Refresh or query the module catalog"),
+    "report": ("qa_report", "main", "Build the catalog QA dashboard"),
+    "archive": ("archive_export", "main", "Export published modules to an indexed zip"),
+    "store": ("object_store", "main", "Inspect or export the module object store"),
+    "timing": ("timing_model", "main", "Slide budgets and what-if timing sweeps"),
+    "context": ("context_budget", "main", "Estimate tokens and preview a context pack"),
+    "outline": ("pptx_outline", "main", "Print the per-slide outline of a .pptx"),
+    "optimize": ("html_optimize", "main", "Minify presentation HTML and report savings"),
+    "bench": ("benchmark", "main", "Benchmark the scripts on synthetic catalogs"),
+    "trace": ("tracing", "main", "Summarize --trace / CDK_TRACE timing files"),
+}
+
+
+def print_usage() -> None:
+    """Print top-level help without importing any subcommand."""
+    print("usage: cdk <command> [options]\n")
+    print("Curriculum Dev Kit command line\n")
+    print("commands:")
+    width = max(len(name) for name in COMMANDS)
+    for name, (_, _, help_text) in COMMANDS.items():
+        print(f"  {name:<{width}}  {help_text}")
+    print("\nRun 'cdk <command> --help' for command options.")
+
+
+def main(argv: list[str] | None = None) -> int:
+    # argparse is deliberately not used at this level: subcommands own their
+    # parsers, and building them here would mean importing every script.
+    argv = sys.argv[1:] if argv is None else argv
+
+    if not argv or argv[0] in ("-h", "--help"):
+        print_usage()
+        return 0
+
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"cdk: unknown command '{command}'\n", file=sys.stderr)
+        print_usage()
+        return 2
+
+    module_name, func_name, _ = COMMANDS[command]
+    entry = getattr(importlib.import_module(module_name), func_name)
+    result = entry(rest, prog=f"cdk {command}")
+    return result if isinstance(result, int) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
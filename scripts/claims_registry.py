@@ -0,0 +1,664 @@
+#!/usr/bin/env python3
+"""
+Claims Registry
+
+Finds the numbers and attributed claims that the QA checklist's
+"Statistics Verification" and "Claims Review" steps ask reviewers to
+check: percentages, currency amounts, years, and sentences citing a
+source ("according to PMI", "Gartner estimates", "(Standish Group,
+2020)"). Briefs, speaker notes, presentation HTML and NotebookLM/Gemini
+research reports are each read in one streaming pass, and every finding
+is stored in a SQLite registry (claims.db in state_paths.CACHE_DIR,
+CLAIMS_DB) with its file, line, slide and a hash of its sentence.
+
+Refreshes are incremental: a file is only re-read when its size or mtime
+changes, and its findings are only rewritten when its content hash does.
+Each finding carries the source and newest year cited in its sentence, so
+"claims citing PMI older than 2023" is one indexed lookup. Marking a
+finding verified records its sentence hash; editing the sentence makes
+it unverified again.
+
+Usage:
+    python claims_registry.py refresh
+    python claims_registry.py query --kind claim --source PMI --before 2023
+    python claims_registry.py query --kind percent --code C1M3 --unverified
+    python claims_registry.py verify 3f9a21c04be7 --note "Checked against 2024 report"
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+from catalog import discover_modules
+from module_scan import rework_order, scan_module
+from search_index import artifact_type
+from state_paths import CACHE_DIR
+from tracing import count, traced
+from yaml_compat import safe_load
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+COURSE_BASE_PATH = Path(os.environ.get("COURSE_BASE_PATH", "."))
+CLAIMS_DB = Path(os.environ.get("CLAIMS_DB", CACHE_DIR / "claims.db"))
+
+# Bump when extraction or the table layout changes; findings are rebuilt
+# (verifications are kept, they are keyed by sentence hash)
+CLAIMS_SCHEMA_VERSION = 1
+
+SCANNED_TYPES = ("brief", "notes", "presentation", "report")
+SCANNED_SUFFIXES = (".md", ".txt", ".html", ".htm")
+KINDS = ("percent", "currency", "year", "claim")
+
+DEFAULT_LIMIT = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path        TEXT PRIMARY KEY,
+    module_path TEXT NOT NULL,
+    code        TEXT,
+    course      INTEGER,
+    type        TEXT,
+    size        INTEGER,
+    mtime_ns    INTEGER,
+    sha1        TEXT,
+    findings    INTEGER,
+    scanned_at  TEXT,
+    latest      INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_files_module ON files(module_path);
+CREATE INDEX IF NOT EXISTS idx_files_code ON files(code);
+CREATE INDEX IF NOT EXISTS idx_files_course ON files(course);
+
+CREATE TABLE IF NOT EXISTS claims (
+    id       INTEGER PRIMARY KEY,
+    path     TEXT NOT NULL,
+    kind     TEXT NOT NULL,
+    value    TEXT NOT NULL,
+    number   REAL,
+    unit     TEXT,
+    year     INTEGER,
+    source   TEXT COLLATE NOCASE,
+    line     INTEGER,
+    slide    INTEGER,
+    sentence TEXT,
+    hash     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_claims_path ON claims(path);
+CREATE INDEX IF NOT EXISTS idx_claims_source ON claims(source, year);
+CREATE INDEX IF NOT EXISTS idx_claims_kind ON claims(kind, year);
+CREATE INDEX IF NOT EXISTS idx_claims_hash ON claims(hash);
+
+CREATE TABLE IF NOT EXISTS verified (
+    hash        TEXT PRIMARY KEY,
+    verified_at TEXT NOT NULL,
+    note        TEXT
+);
+"""
+
+# =============================================================================
+# PATTERNS
+# =============================================================================
+
+NUMBER = r'\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?'
+PERCENT = re.compile(rf'(?<![\w.$€£])({NUMBER})(?:\s?[-–]\s?({NUMBER}))?\s?(?:%|percent\b|per cent\b)',
+                     re.IGNORECASE)
+CURRENCY = re.compile(
+    rf'(US\$|[$€£¥])\s?({NUMBER})(?:\s?(k|m|bn|b|t|thousand|million|billion|trillion)\b)?'
+    rf'|(?<![\w.])({NUMBER})\s?(thousand|million|billion|trillion)?\s?(USD|EUR|GBP|dollars|euros|pounds)\b',
+    re.IGNORECASE)
+YEAR = re.compile(r'(?<![\w$€£.,-])((?:19[5-9]|20\d)\d)(?![\w%]|[.,]\d)')
+MONTH_BEFORE = re.compile(r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+(?:\d{1,2},?\s+)?$',
+                          re.IGNORECASE)
+SCALES = {"k": 1e3, "thousand": 1e3, "m": 1e6, "million": 1e6, "b": 1e9, "bn": 1e9,
+          "billion": 1e9, "t": 1e12, "trillion": 1e12}
+CURRENCY_UNITS = {"us$": "USD", "$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY",
+                  "dollars": "USD", "euros": "EUR", "pounds": "GBP"}
+
+# A capitalized name of up to seven words ("Standish Group", "Project
+# Management Institute", "McKinsey & Company", "U.S. Bureau of Labor Statistics")
+NAME = r"[A-Z][\w&.-]*(?:\s+(?:(?:of|for|and|on|the|&)\s+)*[A-Z][\w&.-]*){0,6}"
+ATTRIBUTIONS = [
+    re.compile(rf"\b[Aa]ccording to (?:the |a |an )?(?:(?:19|20)\d\d\s+)?(?P<source>{NAME})"),
+    re.compile(rf"(?<![\w-])(?P<source>{NAME})(?:['’]s)?(?:\s+\(?(?:19|20)\d\d\)?)?(?:\s+[\w-]+){{0,4}}?\s+"
+               r"(?:found|finds|reports?|reported|estimates?|estimated|shows?|showed|surveyed|"
+               r"concluded|predicts?|predicted|projects|forecasts?)\b"),
+    re.compile(rf"\((?:see |source: )?(?P<source>{NAME}),?\s+(?:19|20)\d\d[a-z]?\)"),
+    re.compile(rf"\b(?:[Ss]ources?|[Dd]ata|[Vv]ia):\s*(?P<source>{NAME})"),
+]
+# Capitalized words that start sentences rather than name a source
+NOT_SOURCES = {
+    "A", "An", "All", "And", "As", "But", "Each", "Every", "For", "Here", "If", "In", "It", "Its",
+    "Let", "Many", "Most", "My", "New", "No", "Now", "One", "Our", "Recent", "Research", "Say",
+    "She", "He", "So", "Some", "Studies", "Study", "That", "Their", "There", "These", "They",
+    "This", "Those", "Today", "We", "What", "When", "Why", "You", "Your", "Data", "Teams",
+    "People", "Projects", "Project", "Companies", "Organizations", "Surveys", "Survey",
+}
+
+# Sentences without a digit or one of these cannot hold a finding
+CUES = re.compile(r'\d|ccording|ound|inds|eport|stimate|show|urvey|onclude|redict|roject|orecast|:')
+SENTENCE_END = re.compile(r'(?<=[.!?])["”’)]?\s+(?=["“(\[]?[A-Z0-9])')
+MARKDOWN_LINK = re.compile(r'!?\[([^\]]*)\]\([^)]*\)')
+MARKDOWN_MARKUP = re.compile(r'\*\*|__|`|(?<!\w)[*_](?=\S)|(?<=\S)[*_](?!\w)')
+MARKDOWN_BLOCK = re.compile(r'^\s*(?:#{1,6}\s|[-*+]\s|\d+[.)]\s|>|\|)')
+SLIDE_HEADING = re.compile(r'^#{1,6}\s*slide\s+(\d+)', re.IGNORECASE)
+SPACE = re.compile(r'\s+')
+
+HTML_BLOCKS = {"p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "div", "section", "td", "th",
+               "tr", "br", "blockquote", "figcaption", "caption", "dt", "dd"}
+HTML_SKIPPED = {"script", "style", "svg"}
+
+
+class Finding(NamedTuple):
+    """One statistic, year or attributed claim in a file."""
+    kind: str
+    value: str
+    number: float | None
+    unit: str | None
+    year: int | None
+    source: str | None
+    line: int
+    slide: int | None
+    sentence: str
+    hash: str
+
+
+# =============================================================================
+# EXTRACTION
+# =============================================================================
+
+def to_number(text: str, scale: str | None = None) -> float | None:
+    try:
+        value = float(text.replace(",", ""))
+    except ValueError:
+        return None
+    return value * SCALES.get((scale or "").lower(), 1)
+
+
+def attributed_source(sentence: str) -> tuple[str, str] | None:
+    """(matched text, source name) of the first attribution in sentence."""
+    for n, pattern in enumerate(ATTRIBUTIONS):
+        for match in pattern.finditer(sentence):
+            words = match.group("source").split()
+            while words and words[0] in ("The", "the"):
+                words.pop(0)
+            while words and words[-1] in ("of", "for", "and", "on", "the", "&"):
+                words.pop()
+            # "According to" is explicit enough for "Project Management Institute"
+            if words and words[0] not in NOT_SOURCES or n == 0 and len(words) > 1:
+                return match.group(0).strip(), " ".join(words).rstrip(".")
+    return None
+
+
+def sentence_findings(sentence: str, line: int, slide: int | None) -> list[Finding]:
+    """Statistics, years and attribution of one sentence."""
+    if not CUES.search(sentence):
+        return []
+    numbers = []  # (start, end, kind, value, number, unit)
+    for m in PERCENT.finditer(sentence):
+        numbers.append((m.start(), m.end(), "percent", m.group(0), to_number(m.group(1)), "%"))
+    for m in CURRENCY.finditer(sentence):
+        if m.group(2):
+            number, scale, unit = m.group(2), m.group(3), m.group(1)
+        else:
+            number, scale, unit = m.group(4), m.group(5), m.group(6)
+        numbers.append((m.start(), m.end(), "currency", m.group(0), to_number(number, scale),
+                        CURRENCY_UNITS.get(unit.lower(), unit.upper())))
+    taken = [(start, end) for start, end, *_ in numbers]
+    years = []
+    for m in YEAR.finditer(sentence):
+        if any(start <= m.start() < end for start, end in taken):
+            continue
+        years.append(int(m.group(1)))
+        if not MONTH_BEFORE.search(sentence, 0, m.start()):
+            numbers.append((m.start(), m.end(), "year", m.group(1), float(m.group(1)), None))
+    attribution = attributed_source(sentence)
+    if not numbers and attribution is None:
+        return []
+
+    # Every finding carries the sentence's source and newest cited year
+    source = attribution[1] if attribution else None
+    year = max(years) if years else None
+    findings = []
+    for _, _, kind, value, number, unit in sorted(numbers):
+        findings.append(Finding(kind, value, number, unit, year, source, line, slide, sentence,
+                                claim_hash(kind, sentence)))
+    if attribution:
+        findings.append(Finding("claim", attribution[0], None, None, year, source, line, slide,
+                                sentence, claim_hash("claim", sentence)))
+    return findings
+
+
+def claim_hash(kind: str, sentence: str) -> str:
+    """Stable id of a finding: its kind and whitespace-normalized sentence."""
+    return hashlib.sha1(f"{kind}\0{SPACE.sub(' ', sentence).strip()}".encode('utf-8')).hexdigest()[:12]
+
+
+def block_findings(text: str, line: int, slide: int | None) -> list[Finding]:
+    """Findings of a paragraph, slide bullet or table cell."""
+    text = SPACE.sub(" ", text).strip()
+    if not text:
+        return []
+    findings = []
+    for sentence in SENTENCE_END.split(text):
+        findings.extend(sentence_findings(sentence, line, slide))
+    return findings
+
+
+class HTMLBlocks(HTMLParser):
+    """Streams visible text blocks of presentation HTML, tracking slides."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.findings: list[Finding] = []
+        self.slide = None
+        self.slides = 0
+        self.skipping = 0
+        self.parts: list[str] = []
+        self.line = 1
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HTML_SKIPPED:
+            self.skipping += 1
+        elif tag in HTML_BLOCKS:
+            self.flush()
+        if tag == "div" and "slide" in (dict(attrs).get("class") or "").split():
+            self.slides += 1
+            self.slide = self.slides
+
+    def handle_endtag(self, tag):
+        if tag in HTML_SKIPPED:
+            self.skipping = max(0, self.skipping - 1)
+        elif tag in HTML_BLOCKS:
+            self.flush()
+
+    def handle_data(self, data):
+        if self.skipping:
+            return
+        if not self.parts:
+            self.line = self.getpos()[0]
+        self.parts.append(data)
+
+    def flush(self):
+        if self.parts:
+            self.findings.extend(block_findings("".join(self.parts), self.line, self.slide))
+            self.parts = []
+
+    def close(self):
+        super().close()
+        self.flush()
+
+
+def markdown_findings(lines: Iterable[str]) -> Iterator[Finding]:
+    """Findings of Markdown or plain text, one paragraph or list item at a time."""
+    block: list[str] = []
+    start = 1
+    slide = None
+    for number, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("```") or MARKDOWN_BLOCK.match(line):
+            if block:
+                yield from block_findings(" ".join(block), start, slide)
+                block = []
+            heading = SLIDE_HEADING.match(stripped)
+            if heading:
+                slide = int(heading.group(1))
+            if not stripped or stripped.startswith("```"):
+                continue
+        if not block:
+            start = number
+        text = MARKDOWN_MARKUP.sub("", MARKDOWN_LINK.sub(r"\1", stripped.lstrip("#>|-*+ ")))
+        block.append(text.replace("|", " "))
+        if stripped.startswith("#"):
+            # Headings never run on into the next paragraph
+            yield from block_findings(block.pop(), start, slide)
+    if block:
+        yield from block_findings(" ".join(block), start, slide)
+
+
+@traced("claims.extract")
+def extract_file(path: Path) -> tuple[str, list[Finding]]:
+    """Content hash and findings of one file, in a single streaming pass."""
+    digest = hashlib.sha1()
+
+    def lines():
+        with open(path, 'rb') as f:
+            for raw in f:
+                digest.update(raw)
+                yield raw.decode('utf-8', 'replace')
+
+    if path.suffix.lower() in (".html", ".htm"):
+        parser = HTMLBlocks()
+        for line in lines():
+            parser.feed(line)
+        parser.close()
+        findings = parser.findings
+    else:
+        findings = list(markdown_findings(lines()))
+    count(findings=len(findings))
+    return digest.hexdigest(), findings
+
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+def connect(db_path: Path = CLAIMS_DB) -> sqlite3.Connection:
+    """Open (and create or upgrade) the registry database."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version != CLAIMS_SCHEMA_VERSION:
+        # Findings are derived data; verifications are not and are kept
+        conn.execute("DROP TABLE IF EXISTS files")
+        conn.execute("DROP TABLE IF EXISTS claims")
+        conn.execute(f"PRAGMA user_version = {CLAIMS_SCHEMA_VERSION}")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def module_code(folder: Path) -> str | None:
+    try:
+        data = safe_load((folder / "module.yaml").read_text(encoding='utf-8')) or {}
+    except Exception:
+        return None
+    return str(data.get("code") or "").upper() or None
+
+
+def scanned_files(folder: Path) -> list:
+    """Briefs, notes, presentations and research reports in a module folder."""
+    snapshot = scan_module(folder)
+    return [entry for entry in snapshot.select(SCANNED_SUFFIXES, skip_markers=True)
+            if artifact_type(entry.name) in SCANNED_TYPES]
+
+
+@traced("claims.refresh")
+def refresh_registry(conn: sqlite3.Connection, folders: list[Path],
+                     prune: bool = False) -> dict[str, int]:
+    """
+    Re-read changed files of the given module folders.
+
+    With prune=True (a whole-tree refresh), modules no longer present are
+    dropped too. Returns counts of scanned, changed, unchanged and removed
+    files.
+    """
+    counts = {"scanned": 0, "changed": 0, "unchanged": 0, "removed": 0}
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if prune:
+        present = {str(f) for f in folders}
+        gone = [row[0] for row in conn.execute("SELECT DISTINCT module_path FROM files")
+                if row[0] not in present]
+        for module_path in gone:
+            counts["removed"] += remove_files(conn, "module_path = ?", (module_path,))
+
+    for folder in folders:
+        known = {row["path"]: row for row in conn.execute(
+            "SELECT path, size, mtime_ns, sha1 FROM files WHERE module_path = ?", (str(folder),))}
+        code = module_code(folder)
+        course = re.match(r'C(\d+)M', code or "")
+        seen = set()
+        for entry in scanned_files(folder):
+            key = str(entry.path)
+            seen.add(key)
+            old = known.get(key)
+            if old is not None and (old["size"], old["mtime_ns"]) == (entry.size, entry.mtime_ns):
+                counts["unchanged"] += 1
+                continue
+
+            sha1, findings = extract_file(entry.path)
+            counts["scanned"] += 1
+            if old is None or old["sha1"] != sha1:
+                conn.execute("DELETE FROM claims WHERE path = ?", (key,))
+                conn.executemany(
+                    "INSERT INTO claims (path, kind, value, number, unit, year, source, line,"
+                    " slide, sentence, hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(key, *finding) for finding in findings])
+                counts["changed"] += 1
+            conn.execute(
+                "INSERT OR REPLACE INTO files (path, module_path, code, course, type, size,"
+                " mtime_ns, sha1, findings, scanned_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, str(folder), code, int(course.group(1)) if course else None,
+                 artifact_type(entry.name), entry.size, entry.mtime_ns, sha1, len(findings), now))
+        for key in set(known) - seen:
+            counts["removed"] += remove_files(conn, "path = ?", (key,))
+
+    mark_latest(conn)
+    conn.commit()
+    return counts
+
+
+def remove_files(conn: sqlite3.Connection, where: str, params: tuple) -> int:
+    paths = [(row[0],) for row in conn.execute(f"SELECT path FROM files WHERE {where}", params)]
+    conn.executemany("DELETE FROM claims WHERE path = ?", paths)
+    conn.executemany("DELETE FROM files WHERE path = ?", paths)
+    return len(paths)
+
+
+def mark_latest(conn: sqlite3.Connection) -> None:
+    """Flag files of the newest rework folder of each module code."""
+    newest: dict[str, Path] = {}
+    for code, module_path in conn.execute(
+            "SELECT DISTINCT code, module_path FROM files WHERE code IS NOT NULL"):
+        folder = Path(module_path)
+        if code not in newest or rework_order(folder) > rework_order(newest[code]):
+            newest[code] = folder
+    conn.execute("UPDATE files SET latest = 1")
+    conn.executemany("UPDATE files SET latest = (module_path = ?) WHERE code = ?",
+                     [(str(folder), code) for code, folder in newest.items()])
+
+
+# =============================================================================
+# QUERIES
+# =============================================================================
+
+def query_claims(conn: sqlite3.Connection,
+                 kinds: list[str] | None = None,
+                 source: str | None = None,
+                 before: int | None = None,
+                 since: int | None = None,
+                 undated: bool = False,
+                 code: str | None = None,
+                 course: int | None = None,
+                 types: list[str] | None = None,
+                 contains: str | None = None,
+                 unverified: bool = False,
+                 all_reworks: bool = False,
+                 limit: int | None = DEFAULT_LIMIT) -> list[sqlite3.Row]:
+    """
+    Filter findings.
+
+    source matches the start of the attributed name, case-insensitively
+    ("PMI" finds "PMI Pulse of the Profession"); before/since compare the
+    newest year cited in the finding's sentence.
+    """
+    clauses = []
+    params: list = []
+
+    if not all_reworks:
+        clauses.append("f.latest = 1")
+    if kinds:
+        clauses.append(f"c.kind IN ({', '.join('?' * len(kinds))})")
+        params.extend(kinds)
+    if source:
+        escaped = source.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        clauses.append("c.source LIKE ? ESCAPE '\\'")
+        params.append(f"{escaped}%")
+    if before is not None:
+        clauses.append("c.year < ?")
+        params.append(before)
+    if since is not None:
+        clauses.append("c.year >= ?")
+        params.append(since)
+    if undated:
+        clauses.append("c.year IS NULL")
+    if code:
+        clauses.append("f.code = ?")
+        params.append(code.upper())
+    if course is not None:
+        clauses.append("f.course = ?")
+        params.append(course)
+    if types:
+        clauses.append(f"f.type IN ({', '.join('?' * len(types))})")
+        params.extend(types)
+    if contains:
+        clauses.append("instr(lower(c.sentence), ?) > 0")
+        params.append(contains.lower())
+    if unverified:
+        clauses.append("v.hash IS NULL")
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    sql = f"""
+        SELECT c.*, f.code, f.type, v.verified_at, v.note
+        FROM claims c
+        JOIN files f ON f.path = c.path
+        LEFT JOIN verified v ON v.hash = c.hash
+        {where}
+        ORDER BY f.code, f.path, c.line, c.id
+    """
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return conn.execute(sql, params).fetchall()
+
+
+def verify(conn: sqlite3.Connection, hashes: list[str], note: str | None = None) -> list[str]:
+    """Mark findings verified by sentence hash (or unique prefix); returns unknown ones."""
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    unknown = []
+    for prefix in hashes:
+        matches = {row[0] for row in conn.execute(
+            "SELECT DISTINCT hash FROM claims WHERE hash >= ? AND hash < ?", (prefix, prefix + "~"))}
+        if len(matches) != 1:
+            unknown.append(prefix)
+            continue
+        conn.execute("INSERT OR REPLACE INTO verified (hash, verified_at, note) VALUES (?, ?, ?)",
+                     (matches.pop(), now, note))
+    conn.commit()
+    return unknown
+
+
+def print_rows(rows: list[sqlite3.Row]) -> None:
+    """Print findings as a plain-text table."""
+    header = f"{'Code':<8} {'Type':<12} {'Where':<12} {'Kind':<8} {'Value':<18} {'Source':<24} {'Year':<5} Hash"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        where = f"L{row['line']}" + (f" S{row['slide']}" if row["slide"] else "")
+        value = row["value"] if row["kind"] != "claim" else "(attribution)"
+        mark = " ✓" if row["verified_at"] else ""
+        print(f"{row['code'] or '?':<8} {row['type']:<12} {where:<12} {row['kind']:<8} "
+              f"{value[:18]:<18} {(row['source'] or '-')[:24]:<24} {row['year'] or '-'!s:<5} "
+              f"{row['hash']}{mark}")
+        print(f"         {row['sentence'][:110]}")
+    print(f"\n{len(rows)} finding(s)")
+
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Registry of statistics and attributed claims for fact-checking",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python claims_registry.py refresh
+  python claims_registry.py refresh "/path/to/Course 1/Module 3/March 2026 ReWork"
+  python claims_registry.py query --kind claim --source PMI --before 2023
+  python claims_registry.py query --kind percent --undated --type notes
+  python claims_registry.py query --code C1M3 --unverified --json
+  python claims_registry.py verify 3f9a21c04be7 --note "Checked against 2024 report"
+        """
+    )
+    parser.add_argument("--db", type=Path, default=CLAIMS_DB,
+                        help=f"Registry database (default: {CLAIMS_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    refresh = sub.add_parser("refresh", help="Re-read changed files")
+    refresh.add_argument("paths", nargs="*", type=Path,
+                         help="Module folders (default: every module under --base)")
+    refresh.add_argument("--base", type=Path, default=COURSE_BASE_PATH,
+                         help="Course base path (default: COURSE_BASE_PATH)")
+
+    query = sub.add_parser("query", help="List findings matching filters")
+    query.add_argument("--kind", action="append", choices=KINDS,
+                       help="Finding kind (repeatable)")
+    query.add_argument("--source", help="Attributed source, matched by prefix (e.g. PMI)")
+    query.add_argument("--before", type=int, metavar="YEAR",
+                       help="Newest cited year is before YEAR")
+    query.add_argument("--since", type=int, metavar="YEAR",
+                       help="Newest cited year is YEAR or later")
+    query.add_argument("--undated", action="store_true", help="No year in the sentence")
+    query.add_argument("--code", help="Module code (e.g. C1M1)")
+    query.add_argument("--course", type=int, help="Course number")
+    query.add_argument("--type", action="append", choices=SCANNED_TYPES,
+                       help="File type (repeatable)")
+    query.add_argument("--contains", help="Text in the sentence")
+    query.add_argument("--unverified", action="store_true", help="Not yet verified")
+    query.add_argument("--all-reworks", action="store_true",
+                       help="Include older rework folders, not just the latest")
+    query.add_argument("--limit", type=int, default=DEFAULT_LIMIT,
+                       help=f"Maximum findings, 0 for all (default: {DEFAULT_LIMIT})")
+    query.add_argument("--json", action="store_true", help="Output as JSON")
+
+    verify_cmd = sub.add_parser("verify", help="Mark findings verified")
+    verify_cmd.add_argument("hashes", nargs="+", help="Finding hashes (or unique prefixes)")
+    verify_cmd.add_argument("--note", help="What it was checked against")
+
+    args = parser.parse_args(argv)
+    conn = connect(args.db)
+
+    if args.command == "refresh":
+        missing = [p for p in args.paths if not p.is_dir()]
+        if missing:
+            print(f"Error: Folder not found: {missing[0]}")
+            return 3
+        folders = [p.resolve() for p in args.paths] or discover_modules(args.base.resolve())
+        counts = refresh_registry(conn, folders, prune=not args.paths)
+        total = conn.execute("SELECT COUNT(*) FROM claims").fetchone()[0]
+        print(", ".join(f"{k}: {v}" for k, v in counts.items()) + f"; {total} finding(s)")
+        return 0
+
+    if args.command == "verify":
+        unknown = verify(conn, args.hashes, args.note)
+        for prefix in unknown:
+            print(f"Error: No single finding matches {prefix}")
+        return 1 if unknown else 0
+
+    rows = query_claims(
+        conn,
+        kinds=args.kind,
+        source=args.source,
+        before=args.before,
+        since=args.since,
+        undated=args.undated,
+        code=args.code,
+        course=args.course,
+        types=args.type,
+        contains=args.contains,
+        unverified=args.unverified,
+        all_reworks=args.all_reworks,
+        limit=args.limit,
+    )
+    if args.json:
+        print(json.dumps([dict(r) for r in rows], indent=2))
+    else:
+        print_rows(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
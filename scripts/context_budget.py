@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Token-Budgeted Context Bundles
+
+Estimates how many tokens each file referenced by a context bundle would
+cost an assistant session, and packs the most useful excerpts into the
+bundle itself within a token budget:
+
+    1. Source presentation outline (see pptx_outline.py), trimmed by slide
+    2. Previous rework's brief, section by section in priority order
+    3. Headings of the Phase 1 topic outline template
+
+Token counts use a fast approximation (about one token per four characters
+of a word, one per punctuation mark) and are cached by file digest.
+
+Usage:
+    python context_budget.py file1.md deck.pptx     # Estimate files
+    python context_budget.py --budget 4000 --previous "/path/to/old ReWork"
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+from state_paths import CACHE_DIR
+from tracing import count, traced
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+TOKEN_CACHE = Path(os.environ.get("TOKEN_CACHE", CACHE_DIR / "tokens.json"))
+DEFAULT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", 6000))
+
+# Bump when estimate_tokens changes, so cached counts are recomputed
+TOKENIZER_VERSION = 1
+
+# Brief sections most useful when starting the next rework, in order.
+# Names match validate_brief's section checks.
+BRIEF_SECTION_PRIORITY = [
+    "Priority Rankings",
+    "Case Study",
+    "Voice and Tone",
+    "Bias Check",
+    "Research Sources",
+    "Module Identification",
+    "Timing Calculations",
+]
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+HEADING_PATTERN = re.compile(r"^(#{1,3})\s+(.+)$", re.MULTILINE)
+
+
+class Excerpt(NamedTuple):
+    """Text packed into a bundle, with its estimated token count."""
+    label: str
+    text: str
+    tokens: int
+
+
+class ContextPack(NamedTuple):
+    """What a bundle inlines and what its referenced files would cost."""
+    outline: str | None  # Possibly trimmed source outline
+    excerpts: list[Excerpt]  # Other packed excerpts, in priority order
+    references: list[tuple[str, Path, int | None]]  # (label, path, tokens)
+    skipped: list[str]  # Excerpt labels that did not fit
+    budget: int
+    used: int
+
+
+# =============================================================================
+# TOKEN ESTIMATES
+# =============================================================================
+
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count: ~4 characters per word piece."""
+    return sum((len(t) + 3) // 4 for t in TOKEN_PATTERN.findall(text))
+
+
+class TokenCache:
+    """Digest -> token count, persisted as one JSON file; thread-safe."""
+
+    def __init__(self, path: Path = TOKEN_CACHE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.dirty = False
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+            self.counts = data["counts"] if data.get("version") == TOKENIZER_VERSION else {}
+        except (OSError, ValueError, KeyError):
+            self.counts = {}
+
+    @traced("context.tokens")
+    def file_tokens(self, path: Path) -> int | None:
+        """
+        Estimated tokens of a file as an assistant would read it.
+
+        .pptx files count their extracted outline text; other binary
+        formats (e.g. .pdf) return None.
+        """
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        count(files=1, bytes_read=len(data))
+        digest = hashlib.sha256(data).hexdigest()
+
+        with self.lock:
+            if digest in self.counts:
+                return self.counts[digest]
+
+        if path.suffix.lower() == ".pptx":
+            from pptx_outline import format_outline, load_slides
+            try:
+                tokens = estimate_tokens(format_outline(load_slides(path)))
+            except Exception:
+                return None
+        else:
+            try:
+                tokens = estimate_tokens(data.decode('utf-8'))
+            except UnicodeDecodeError:
+                return None
+
+        with self.lock:
+            self.counts[digest] = tokens
+            self.dirty = True
+        return tokens
+
+    def save(self) -> None:
+        """Write the cache atomically if anything was added."""
+        with self.lock:
+            if not self.dirty:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".tokens-")
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump({"version": TOKENIZER_VERSION, "counts": self.counts}, f)
+                os.replace(tmp, self.path)
+                self.dirty = False
+            except OSError:
+                pass  # Cache is an optimization only
+
+
+_default_cache: TokenCache | None = None
+
+
+def default_cache() -> TokenCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TokenCache()
+    return _default_cache
+
+
+# =============================================================================
+# EXCERPTS
+# =============================================================================
+
+def split_sections(text: str) -> list[tuple[str, str]]:
+    """Level-2 Markdown sections as (heading, body without the heading line)."""
+    matches = [m for m in HEADING_PATTERN.finditer(text) if len(m.group(1)) == 2]
+    sections = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        sections.append((match.group(2).strip(), text[match.end():end].strip()))
+    return sections
+
+
+def section_rank(heading: str) -> int:
+    for rank, name in enumerate(BRIEF_SECTION_PRIORITY):
+        if heading.lower().startswith(name.lower()):
+            return rank
+    return len(BRIEF_SECTION_PRIORITY)
+
+
+def find_brief(folder: Path) -> Path | None:
+    """The presentation brief in a rework folder, if any."""
+    briefs = sorted(p for p in folder.glob("*.md") if "brief" in p.name.lower())
+    return briefs[0] if briefs else None
+
+
+def brief_excerpts(brief_path: Path) -> list[Excerpt]:
+    """Sections of a brief, most useful first."""
+    text = brief_path.read_text(encoding='utf-8')
+    sections = sorted(split_sections(text), key=lambda s: section_rank(s[0]))
+    return [Excerpt(f"Previous brief: {heading}", body, estimate_tokens(body))
+            for heading, body in sections]
+
+
+def template_headings(template_path: Path) -> Excerpt | None:
+    """The heading lines of a template, as a compact skeleton."""
+    try:
+        text = template_path.read_text(encoding='utf-8')
+    except OSError:
+        return None
+    skeleton = "\n".join(f"{'  ' * (len(m.group(1)) - 1)}- {m.group(2).strip()}"
+                         for m in HEADING_PATTERN.finditer(text))
+    return Excerpt(f"Template headings: {template_path.name}", skeleton,
+                   estimate_tokens(skeleton))
+
+
+def trim_outline(outline: str, budget: int) -> tuple[str | None, int]:
+    """Keep whole slides of an outline while they fit; returns (text, tokens)."""
+    slides = [s for s in re.split(r"(?m)^(?=### Slide )", outline) if s.strip()]
+    kept, used = [], 0
+    for slide in slides:
+        tokens = estimate_tokens(slide)
+        if used + tokens > budget:
+            break
+        kept.append(slide)
+        used += tokens
+    if not kept:
+        return None, 0
+    if len(kept) < len(slides):
+        kept.append(f"*... {len(slides) - len(kept)} more slide(s) omitted for the token budget*\n")
+    return "".join(kept), used
+
+
+@traced("context.pack")
+def build_context_pack(references: list[tuple[str, Path | None]],
+                       outline: str | None = None,
+                       previous_rework: Path | None = None,
+                       template: Path | None = None,
+                       budget: int = DEFAULT_TOKEN_BUDGET,
+                       cache: TokenCache | None = None) -> ContextPack:
+    """
+    Pack excerpts into budget tokens, greedily in priority order.
+
+    references are (label, path) pairs of files the bundle points at; each
+    gets a token estimate for the report. The outline may take at most half
+    the budget so brief and template excerpts still fit.
+    """
+    cache = cache or default_cache()
+    estimates = [(label, path, cache.file_tokens(path) if path else None)
+                 for label, path in references if path]
+
+    used = 0
+    if outline:
+        outline, used = trim_outline(outline, budget // 2)
+
+    # Ranked brief sections, then the template skeleton, then other sections
+    candidates = []
+    brief = find_brief(previous_rework) if previous_rework else None
+    if brief:
+        candidates.extend(brief_excerpts(brief))
+        estimates.append(("Previous brief", brief, cache.file_tokens(brief)))
+    skeleton = template_headings(template) if template else None
+    if skeleton:
+        ranked = sum(1 for e in candidates if section_rank(e.label.split(": ", 1)[1])
+                     < len(BRIEF_SECTION_PRIORITY))
+        candidates.insert(ranked, skeleton)
+
+    packed, skipped = [], []
+    for excerpt in candidates:
+        if used + excerpt.tokens <= budget:
+            packed.append(excerpt)
+            used += excerpt.tokens
+        else:
+            skipped.append(excerpt.label)
+
+    cache.save()
+    return ContextPack(outline, packed, estimates, skipped, budget, used)
+
+
+def format_pack(pack: ContextPack) -> str:
+    """Markdown for the excerpts and the budget report (outline excluded)."""
+    lines = []
+    if pack.excerpts:
+        lines += ["## Packed Excerpts", ""]
+        for excerpt in pack.excerpts:
+            # Demote headings so excerpts nest under this section
+            text = re.sub(r"(?m)^(#{1,5}) ", r"#\1 ", excerpt.text)
+            lines += [f"### {excerpt.label} (~{excerpt.tokens:,} tokens)", "", text, ""]
+        lines += ["---", ""]
+
+    lines += ["## Context Budget", "",
+              "| Referenced file | Est. tokens |",
+              "|-----------------|-------------|"]
+    for label, path, tokens in pack.references:
+        lines.append(f"| {label} ({path.name}) | "
+                     f"{f'{tokens:,}' if tokens is not None else 'not estimated'} |")
+    total = sum(t for _, _, t in pack.references if t)
+    lines += ["",
+              f"**Referenced files:** ~{total:,} tokens if read in full",
+              f"**Packed into this bundle:** ~{pack.used:,} of {pack.budget:,} tokens"]
+    if pack.skipped:
+        lines.append(f"**Left out for budget:** {', '.join(pack.skipped)}")
+    return "\n".join(lines) + "\n"
+
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Estimate token counts and preview a budgeted context pack",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python context_budget.py source.pptx 02_Presentation_Brief.md
+  python context_budget.py --budget 4000 --previous "/path/to/March 2026 ReWork"
+        """
+    )
+    parser.add_argument("files", nargs="*", type=Path, help="Files to estimate")
+    parser.add_argument("--previous", type=Path, help="Previous rework folder to excerpt")
+    parser.add_argument("--template", type=Path, help="Template whose headings to include")
+    parser.add_argument("--budget", type=int, default=DEFAULT_TOKEN_BUDGET,
+                        help=f"Token budget (default: {DEFAULT_TOKEN_BUDGET})")
+
+    args = parser.parse_args(argv)
+    missing = [p for p in args.files if not p.exists()]
+    if missing:
+        print(f"Error: File not found: {missing[0]}")
+        return 3
+
+    pack = build_context_pack([(p.stem, p) for p in args.files], None,
+                              args.previous, args.template, args.budget)
+    print(format_pack(pack), end="")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Git Backends for Publishing
+
+Commits a published module folder to the workspace repository. Two
+implementations share one interface:
+
+- SubprocessGit:  `git add`, `git diff --cached --quiet`, `git commit` and
+                  `git rev-parse HEAD` per commit (the original behavior,
+                  runs commit hooks)
+- FastImportGit:  one `git fast-import` and one `git cat-file --batch`
+                  process for a whole session, however many modules are
+                  committed. Blob ids are computed in Python, so unchanged
+                  folders are detected without writing anything. The index
+                  is brought in line with one `git add` at close.
+
+Work that must only happen once a commit is on the branch (publish markers,
+index updates) is registered with after_close(): SubprocessGit runs it at
+once, FastImportGit after close() has moved the branch, and never if the
+import fails.
+
+FastImportGit commits what `git add` would stage: gitignored untracked
+files are left out, and with core.fileMode=false executable bits are
+taken from the committed tree rather than the disk. commit_paths() stages
+exactly the listed files, as `git update-index --add --remove` does, so
+callers that know what they changed (the object store) skip the folder
+scan. It does not run commit
+hooks or clean/smudge filters, so it is only chosen automatically for
+batch sessions in repositories without core.autocrlf or a .gitattributes
+file. GIT_BACKEND=subprocess or GIT_BACKEND=fast-import forces a backend.
+
+Usage:
+    from git_backend import open_backend
+
+    with open_backend(workspace, batch=True) as git:
+        for folder in folders:
+            ok, result = git.commit_folder(folder, f"[courses] Publish {code}")
+        ok, result = git.commit_paths([manifest, *objects], "[courses] Update C1M1")
+"""
+
+import hashlib
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Callable
+
+from module_scan import scan_module
+from tracing import count, traced
+
+GIT_BACKEND = os.environ.get("GIT_BACKEND", "auto")
+
+
+class GitError(Exception):
+    """Raised when a git helper process fails or returns unexpected output."""
+
+
+def run_git(repo: Path, *args: str, check: bool = True) -> str:
+    """Run one git command and return its stripped stdout."""
+    result = subprocess.run(["git", *args], cwd=repo, capture_output=True, text=True)
+    if check and result.returncode != 0:
+        raise GitError(result.stderr.strip() or f"git {args[0]} failed")
+    return result.stdout.strip()
+
+
+def blob_id(data: bytes) -> str:
+    """Object id git assigns to a blob with these contents (SHA-1 repos)."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def quote_path(path: str) -> bytes:
+    """C-style quoted path for fast-import commands."""
+    escaped = path.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return f'"{escaped}"'.encode('utf-8', 'surrogateescape')
+
+
+def commit_on_branch(repo: Path, commit: str) -> bool:
+    """True if commit (full or abbreviated id) is HEAD or one of its ancestors."""
+    result = subprocess.run(["git", "merge-base", "--is-ancestor", commit, "HEAD"],
+                            cwd=repo, capture_output=True)
+    return result.returncode == 0
+
+
+def path_committed(repo: Path, path: Path) -> bool:
+    """True if path is tracked and has no staged, unstaged or untracked changes."""
+    tracked = run_git(repo, "ls-files", "--", str(path), check=False)
+    status = run_git(repo, "status", "--porcelain", "--untracked-files=all", "--", str(path),
+                     check=False)
+    return bool(tracked) and not status
+
+
+# =============================================================================
+# SUBPROCESS BACKEND
+# =============================================================================
+
+class SubprocessGit:
+    """One git process per operation, exactly as publish always did."""
+    name = "subprocess"
+
+    def __init__(self, repo: Path):
+        self.repo = Path(repo)
+
+    def __enter__(self) -> "SubprocessGit":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+    def close(self) -> None:
+        pass
+
+    def after_close(self, callback: Callable[[], None]) -> None:
+        """Commits land immediately, so run callback now."""
+        callback()
+
+    def commit_folder(self, folder: Path, message: str) -> tuple[bool, str]:
+        """Stage folder and commit; returns (success, short hash or message)."""
+        try:
+            # Add files
+            subprocess.run(["git", "add", str(folder)],
+                           cwd=self.repo, check=True, capture_output=True)
+        except subprocess.CalledProcessError as e:
+            return False, f"Git error: {e.stderr.decode() if e.stderr else str(e)}"
+        return self._commit_index(message)
+
+    def commit_paths(self, paths: list[Path], message: str) -> tuple[bool, str]:
+        """Stage exactly paths (missing ones as deletions) and commit."""
+        repo = self.repo.resolve()
+        names = "".join(Path(p).resolve().relative_to(repo).as_posix() + "\0" for p in paths)
+        try:
+            subprocess.run(["git", "update-index", "--add", "--remove", "-z", "--stdin"],
+                           cwd=self.repo, input=names.encode('utf-8', 'surrogateescape'),
+                           check=True, capture_output=True)
+        except subprocess.CalledProcessError as e:
+            return False, f"Git error: {e.stderr.decode() if e.stderr else str(e)}"
+        return self._commit_index(message)
+
+    def _commit_index(self, message: str) -> tuple[bool, str]:
+        try:
+            # Check if there are changes to commit
+            result = subprocess.run(["git", "diff", "--cached", "--quiet"],
+                                    cwd=self.repo, capture_output=True)
+            if result.returncode == 0:
+                return True, "No changes to commit"
+
+            subprocess.run(["git", "commit", "-m", message],
+                           cwd=self.repo, check=True, capture_output=True)
+
+            result = subprocess.run(["git", "rev-parse", "HEAD"],
+                                    cwd=self.repo, check=True, capture_output=True, text=True)
+            return True, result.stdout.strip()[:12]
+
+        except subprocess.CalledProcessError as e:
+            return False, f"Git error: {e.stderr.decode() if e.stderr else str(e)}"
+
+
+# =============================================================================
+# FAST-IMPORT BACKEND
+# =============================================================================
+
+class FastImportGit:
+    """
+    Long-lived fast-import session on the current branch.
+
+    Each commit_folder() replaces the folder's subtree in a new commit on
+    top of the previous one. Refs and the index are updated at close().
+    """
+    name = "fast-import"
+
+    def __init__(self, repo: Path):
+        self.repo = Path(repo).resolve()
+        if run_git(self.repo, "rev-parse", "--show-object-format") != "sha1":
+            raise GitError("fast-import backend needs a SHA-1 repository")
+        self.ref = run_git(self.repo, "symbolic-ref", "-q", "HEAD", check=False)
+        if not self.ref:
+            raise GitError("fast-import backend needs a checked-out branch")
+        self.parent = run_git(self.repo, "rev-parse", "-q", "--verify", "HEAD", check=False) or None
+        self.committer = run_git(self.repo, "var", "GIT_COMMITTER_IDENT").rsplit(" ", 2)[0]
+        # As for `git add`: without it, modes come from the committed tree
+        self.file_mode = run_git(self.repo, "config", "--bool", "core.fileMode",
+                                 check=False) != "false"
+
+        self.cat = subprocess.Popen(["git", "cat-file", "--batch"], cwd=self.repo,
+                                    stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.importer = subprocess.Popen(
+            ["git", "fast-import", "--quiet", "--done"], cwd=self.repo,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        self.mark = 0
+        self.last_commit = self.parent
+        self.latest = self.parent  # Newest commit cat-file can read
+        # Folder -> files as committed in this session (not yet visible to cat-file)
+        self.committed: dict[str, dict[str, tuple[str, str]]] = {}
+        # Same for commit_paths(): path -> (mode, id), None once deleted
+        self.committed_paths: dict[str, tuple[str, str] | None] = {}
+        self.touched: list[str] = []
+        self.touched_paths: list[str] = []
+        self.deferred: list[Callable[[], None]] = []
+        self.landed = False  # Branch updated by close()
+        self.closed = False
+
+    def __enter__(self) -> "FastImportGit":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+    # -- reading the current tree ---------------------------------------------
+
+    def _read_object(self, spec: str) -> tuple[str, bytes] | None:
+        """(type, contents) of spec via cat-file --batch, or None if missing."""
+        self.cat.stdin.write(spec.encode('utf-8', 'surrogateescape') + b"\n")
+        self.cat.stdin.flush()
+        header = self.cat.stdout.readline().split()
+        if len(header) != 3:
+            return None
+        data = self.cat.stdout.read(int(header[2]) + 1)[:-1]
+        return header[1].decode(), data
+
+    def _tree_entries(self, tree: str) -> dict[str, tuple[str, str]]:
+        """Direct entries of a tree: name -> (mode, id); empty if not a tree."""
+        obj = self._read_object(tree)
+        if obj is None or obj[0] != "tree":
+            return {}
+        data = obj[1]
+        entries = {}
+        pos = 0
+        while pos < len(data):
+            space = data.index(b" ", pos)
+            nul = data.index(b"\0", space)
+            mode = data[pos:space].decode()
+            name = data[space + 1:nul].decode('utf-8', 'surrogateescape')
+            entries[name] = (mode, data[nul + 1:nul + 21].hex())
+            pos = nul + 21
+        return entries
+
+    def _tree_files(self, tree: str, prefix: str, out: dict) -> None:
+        for name, (mode, sha) in self._tree_entries(tree).items():
+            path = f"{prefix}/{name}"
+            if mode == "40000":
+                self._tree_files(sha, path, out)
+            else:
+                out[path] = (mode, sha)
+
+    def head_files(self, rel: str) -> dict[str, tuple[str, str]]:
+        """Files under rel in the session's latest commit: path -> (mode, id)."""
+        if rel in self.committed:
+            return self.committed[rel]
+        if (any(other.startswith(rel + "/") or rel.startswith(other + "/")
+                for other in self.committed)
+                or any(path.startswith(rel + "/") for path in self.committed_paths)):
+            self._checkpoint()
+        files: dict[str, tuple[str, str]] = {}
+        if self.latest:
+            self._tree_files(f"{self.latest}:{rel}", rel, files)
+        return files
+
+    def head_entries(self, paths: list[str]) -> dict[str, tuple[str, str]]:
+        """(mode, id) of each of paths in the session's latest commit, if present."""
+        found: dict[str, tuple[str, str]] = {}
+        by_parent: dict[str, list[str]] = {}
+        for path in paths:
+            if path in self.committed_paths:
+                if self.committed_paths[path]:
+                    found[path] = self.committed_paths[path]
+                continue
+            folder = next((rel for rel in self.committed if path.startswith(rel + "/")), None)
+            if folder is not None:
+                if path in self.committed[folder]:
+                    found[path] = self.committed[folder][path]
+                continue
+            by_parent.setdefault(path.rpartition("/")[0], []).append(path)
+
+        if self.latest:
+            # One tree read per parent folder (one per object shard for the store)
+            for parent, names in by_parent.items():
+                entries = self._tree_entries(f"{self.latest}:{parent}")
+                for path in names:
+                    entry = entries.get(path.rpartition("/")[2])
+                    if entry and entry[0] != "40000":
+                        found[path] = entry
+        return found
+
+    def ignored_files(self, rel: str) -> set[str]:
+        """Untracked files under rel that .gitignore rules exclude (git add skips them)."""
+        out = run_git(self.repo, "ls-files", "-z", "--others", "--ignored", "--exclude-standard",
+                      "--", rel)
+        return set(out.split("\0")) - {""}
+
+    def _checkpoint(self) -> None:
+        """Flush fast-import so cat-file can read this session's commits."""
+        # Commands run in order, so the get-mark reply means the checkpoint is done
+        self._send(f"checkpoint\n\nget-mark :{self.mark}\n".encode())
+        self.importer.stdin.flush()
+        self.importer.stdout.readline()
+        self.latest = self.last_commit
+        self.committed.clear()
+        self.committed_paths.clear()
+
+    # -- writing --------------------------------------------------------------
+
+    def _send(self, data: bytes) -> None:
+        self.importer.stdin.write(data)
+
+    def after_close(self, callback: Callable[[], None]) -> None:
+        """Run callback once close() has moved the branch; dropped if it fails."""
+        self.deferred.append(callback)
+
+    @traced("git.commit")
+    def commit_folder(self, folder: Path, message: str) -> tuple[bool, str]:
+        """Commit folder's current contents; returns (success, short hash or message)."""
+        try:
+            rel = Path(folder).resolve().relative_to(self.repo).as_posix()
+            current = self.head_files(rel)
+            ignored = self.ignored_files(rel)
+            wanted: dict[str, tuple[str, str]] = {}
+            contents: dict[str, bytes] = {}
+            for entry in scan_module(Path(folder)).files:
+                path = f"{rel}/{'/'.join(entry.parts)}"
+                if path in ignored:
+                    continue
+                data = entry.path.read_bytes()
+                count(files=1, bytes_read=len(data))
+                if self.file_mode:
+                    mode = "100755" if os.access(entry.path, os.X_OK) else "100644"
+                else:
+                    mode = current.get(path, ("100644",))[0]
+                wanted[path] = (mode, blob_id(data))
+                contents[path] = data
+
+            if wanted == current:
+                return True, "No changes to commit"
+
+            commit = self._write_commit(message, current, wanted, contents)
+            self.committed[rel] = wanted
+            self.touched.append(rel)
+            return True, commit[:12]
+
+        except (OSError, GitError) as e:
+            return False, f"Git error: {e}"
+
+    @traced("git.commit")
+    def commit_paths(self, paths: list[Path], message: str) -> tuple[bool, str]:
+        """Commit exactly paths, missing ones as deletions; see SubprocessGit.commit_paths."""
+        try:
+            names = {Path(p).resolve().relative_to(self.repo).as_posix(): Path(p) for p in paths}
+            current = self.head_entries(list(names))
+            wanted: dict[str, tuple[str, str]] = {}
+            contents: dict[str, bytes] = {}
+            for path, disk in names.items():
+                try:
+                    data = disk.read_bytes()
+                except FileNotFoundError:
+                    continue
+                count(files=1, bytes_read=len(data))
+                if self.file_mode:
+                    mode = "100755" if os.access(disk, os.X_OK) else "100644"
+                else:
+                    mode = current.get(path, ("100644",))[0]
+                wanted[path] = (mode, blob_id(data))
+                contents[path] = data
+
+            if wanted == current:
+                return True, "No changes to commit"
+
+            commit = self._write_commit(message, current, wanted, contents)
+            for path in names:
+                self.committed_paths[path] = wanted.get(path)
+            self.touched_paths.extend(names)
+            return True, commit[:12]
+
+        except (OSError, GitError) as e:
+            return False, f"Git error: {e}"
+
+    def _write_commit(self, message: str, current: dict[str, tuple[str, str]],
+                      wanted: dict[str, tuple[str, str]], contents: dict[str, bytes]) -> str:
+        """Commit the change from current to wanted on the branch; returns its id."""
+        self.mark += 1
+        stamp = f"{int(time.time())} {time.strftime('%z')}"
+        body = message.encode('utf-8')
+        out = [
+            f"commit {self.ref}\nmark :{self.mark}\n".encode(),
+            f"committer {self.committer} {stamp}\n".encode('utf-8'),
+            b"data %d\n" % len(body), body, b"\n",
+        ]
+        if self.mark > 1:
+            out.append(f"from :{self.mark - 1}\n".encode())
+        elif self.parent:
+            out.append(f"from {self.parent}\n".encode())
+        for path in current.keys() - wanted.keys():
+            out.append(b"D " + quote_path(path) + b"\n")
+        for path, (mode, sha) in wanted.items():
+            if current.get(path) != (mode, sha):
+                data = contents[path]
+                out.append(f"M {mode} inline ".encode() + quote_path(path) + b"\n")
+                out.append(b"data %d\n" % len(data))
+                out.append(data)
+                out.append(b"\n")
+        out.append(b"\n")
+        out.append(f"get-mark :{self.mark}\n".encode())
+        self._send(b"".join(out))
+        self.importer.stdin.flush()
+
+        commit = self.importer.stdout.readline().decode().strip()
+        if len(commit) != 40:
+            raise GitError(self.importer.stderr.read().decode() or "fast-import stopped")
+        self.last_commit = commit
+        return commit
+
+    def close(self) -> None:
+        """
+        Finish the import (updating the branch), run after_close() work,
+        then sync the index.
+
+        Raises GitError if the branch could not be updated (nothing from
+        the session landed; landed stays False) or the index could not be
+        synced (the commits did land).
+        """
+        if self.closed:
+            return
+        self.closed = True
+        deferred, self.deferred = self.deferred, []
+        if self.cat.poll() is None:
+            self.cat.stdin.close()
+            self.cat.wait()
+        try:
+            self._send(b"done\n")
+        except OSError:
+            pass  # Already exited; its status is checked below
+        _, err = self.importer.communicate()
+        if self.importer.returncode != 0:
+            raise GitError(err.decode().strip() or "git fast-import failed")
+        self.landed = True
+
+        for callback in deferred:
+            callback()
+
+        for command, touched in (
+            (["add", "--all", "--pathspec-from-file=-", "--pathspec-file-nul"], self.touched),
+            (["update-index", "--add", "--remove", "-z", "--stdin"], self.touched_paths),
+        ):
+            if not touched:
+                continue
+            paths = "\0".join(touched) + "\0"
+            result = subprocess.run(
+                ["git", *command], cwd=self.repo,
+                input=paths.encode('utf-8', 'surrogateescape'), capture_output=True,
+            )
+            if result.returncode != 0:
+                raise GitError(result.stderr.decode().strip())
+        self.touched = []
+        self.touched_paths = []
+
+
+# =============================================================================
+# SELECTION
+# =============================================================================
+
+def fast_import_safe(repo: Path) -> bool:
+    """False when git would rewrite content on add (autocrlf, attributes)."""
+    if (Path(repo) / ".gitattributes").exists():
+        return False
+    autocrlf = run_git(repo, "config", "--get", "core.autocrlf", check=False).lower()
+    return autocrlf in ("", "false")
+
+
+def open_backend(repo: Path, batch: bool = False, kind: str | None = None):
+    """
+    Backend for committing into repo.
+
+    kind (default GIT_BACKEND) is "subprocess", "fast-import" or "auto";
+    auto uses fast-import only for batch sessions where it is safe, and
+    falls back to subprocess if fast-import cannot start.
+    """
+    kind = kind or GIT_BACKEND
+    if kind == "subprocess" or (kind == "auto" and not batch):
+        return SubprocessGit(repo)
+    if kind == "auto" and not fast_import_safe(repo):
+        return SubprocessGit(repo)
+    try:
+        return FastImportGit(repo)
+    except (OSError, GitError):
+        if kind == "fast-import":
+            raise
+        return SubprocessGit(repo)
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Presentation HTML Optimizer
+
+Shrinks self-contained presentation HTML before size checks and publishing:
+
+- HTML: drops comments and collapses whitespace runs in markup
+- CSS:  drops comments and whitespace, and removes design-system rules whose
+        class or id selectors match nothing in the document or its scripts
+- SVG:  drops comments, <metadata>, editor-only attributes and
+        whitespace between tags
+
+<pre>, <textarea> and <script> contents are left untouched, and whitespace
+is not collapsed at all when the stylesheet uses `white-space: pre*`.
+Output depends only on the input text, so content hashes stay stable.
+
+Usage:
+    python html_optimize.py presentation.html
+    python html_optimize.py *.html --write
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+from typing import NamedTuple
+
+# =============================================================================
+# PATTERNS
+# =============================================================================
+
+# Top-level HTML segments handled specially; everything else is markup/text
+SEGMENT_PATTERN = re.compile(
+    r'(?P<comment><!--.*?-->)'
+    r'|(?P<raw><(pre|textarea|script)\b[^>]*>.*?</\3\s*>)'
+    r'|(?P<style><style\b[^>]*>)(?P<css>.*?)(?P<style_end></style\s*>)'
+    r'|(?P<svg><svg\b.*?</svg\s*>)',
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Comments that must survive (conditional comments, "<!--!" keep markers)
+KEEP_COMMENT = re.compile(r'<!--\s*(\[if|!)', re.IGNORECASE)
+
+PRE_WHITESPACE = re.compile(r'white-space\s*:\s*(pre|break-spaces)', re.IGNORECASE)
+
+CSS_STRING = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'')
+CSS_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+CSS_SELECTOR_CLASS = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+CSS_SELECTOR_ID = re.compile(r'#(-?[_a-zA-Z][\w-]*)')
+CSS_ATTRIBUTE = re.compile(r'\[[^\]]*\]')
+# Innermost functional pseudo-class, e.g. :not(.hidden) or :nth-child(2n of .row)
+CSS_PSEUDO_ARGS = re.compile(r'::?[\w-]+\([^()]*\)')
+
+# At-rules whose body is a list of ordinary rules that can be pruned
+NESTED_AT_RULES = ("@media", "@supports", "@layer", "@container")
+
+SVG_EDITOR_ATTR = re.compile(r'\s+(?:inkscape|sodipodi|sketch|xmlns:(?:inkscape|sodipodi|sketch)|data-name)(?::[\w-]+)?="[^"]*"')
+SVG_METADATA = re.compile(r'<metadata\b.*?</metadata\s*>', re.IGNORECASE | re.DOTALL)
+SVG_TEXT = re.compile(r'(<(text|tspan|textPath)\b.*?</\2\s*>)', re.IGNORECASE | re.DOTALL)
+
+CLASS_ATTR = re.compile(r'\bclass\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]+)', re.IGNORECASE)
+ID_ATTR = re.compile(r'\bid\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]+)', re.IGNORECASE)
+SCRIPT_BODY = re.compile(r'<script\b[^>]*>(.*?)</script\s*>', re.IGNORECASE | re.DOTALL)
+IDENTIFIER = re.compile(r'[A-Za-z_][\w-]*')
+
+# A start/end tag (attribute values may contain '>'), or a whitespace run
+MARKUP_TOKEN = re.compile(
+    r'(?P<tag><[A-Za-z/!?][^>"\']*(?:(?:"[^"]*"|\'[^\']*\')[^>"\']*)*>)|\s+')
+TAG_TOKEN = re.compile(r'(?P<quoted>"[^"]*"|\'[^\']*\')|\s+')
+
+
+class OptimizeResult(NamedTuple):
+    """Optimized text plus before/after sizes in UTF-8 bytes."""
+    text: str
+    original_bytes: int
+    optimized_bytes: int
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - self.optimized_bytes
+
+    @property
+    def saved_percent(self) -> float:
+        return 100.0 * self.saved_bytes / self.original_bytes if self.original_bytes else 0.0
+
+
+# =============================================================================
+# CSS
+# =============================================================================
+
+def _used_names(html: str) -> tuple[set[str], set[str]]:
+    """
+    Collect class and id names that selectors may legitimately target.
+
+    Script identifiers and string contents count as used, since scripts add
+    classes at runtime (e.g. `classList.add('active')`).
+    """
+    classes: set[str] = set()
+    ids: set[str] = set()
+    for match in CLASS_ATTR.finditer(html):
+        classes.update(match.group(1).strip('"\'').split())
+    for match in ID_ATTR.finditer(html):
+        ids.add(match.group(1).strip('"\''))
+    for match in SCRIPT_BODY.finditer(html):
+        tokens = set(IDENTIFIER.findall(match.group(1)))
+        classes |= tokens
+        ids |= tokens
+    return classes, ids
+
+
+def _selector_used(selector: str, classes: set[str], ids: set[str]) -> bool:
+    """
+    False only if the selector names a class or id absent from the page.
+
+    Names inside :not(), :is(), :has() and other functional pseudo-classes
+    are not required (`.card:not(.hidden)` matches without any .hidden).
+    """
+    bare = CSS_ATTRIBUTE.sub('', selector)
+    stripped = 1
+    while stripped:
+        bare, stripped = CSS_PSEUDO_ARGS.subn('', bare)
+    return (all(c in classes for c in CSS_SELECTOR_CLASS.findall(bare))
+            and all(i in ids for i in CSS_SELECTOR_ID.findall(bare)))
+
+
+def _split_selectors(prelude: str) -> list[str]:
+    """Split a selector list on top-level commas (not those inside :is(...) etc.)."""
+    parts = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(prelude):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(prelude[start:i])
+            start = i + 1
+    parts.append(prelude[start:])
+    return parts
+
+
+def _prune_rules(css: str, classes: set[str], ids: set[str]) -> str:
+    """Drop selectors (and then rules) that cannot match the document."""
+    out = []
+    pos = 0
+    length = len(css)
+
+    while pos < length:
+        brace = css.find('{', pos)
+        semi = css.find(';', pos)
+        if brace == -1:
+            out.append(css[pos:])
+            break
+        if semi != -1 and semi < brace:
+            # Statement at-rule such as @charset or @import
+            out.append(css[pos:semi + 1])
+            pos = semi + 1
+            continue
+
+        # Find the matching closing brace
+        depth = 0
+        end = brace
+        while end < length:
+            if css[end] == '{':
+                depth += 1
+            elif css[end] == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+            end += 1
+
+        prelude = css[pos:brace].strip()
+        body = css[brace + 1:end]
+        pos = end + 1
+
+        if prelude.startswith('@'):
+            if prelude.lower().startswith(NESTED_AT_RULES):
+                body = _prune_rules(body, classes, ids)
+                if body.strip():
+                    out.append(f"{prelude}{{{body}}}")
+            else:
+                out.append(f"{prelude}{{{body}}}")  # @keyframes, @font-face, ...
+            continue
+
+        selectors = [s for s in _split_selectors(prelude) if _selector_used(s, classes, ids)]
+        if selectors:
+            out.append(f"{','.join(selectors)}{{{body}}}")
+
+    return ''.join(out)
+
+
+def minify_css(css: str, used: tuple[set[str], set[str]] | None = None) -> str:
+    """
+    Minify a stylesheet; with used=(classes, ids), also drop unused rules.
+
+    String literals are masked first so their contents are never altered.
+    """
+    strings: list[str] = []
+
+    def mask(match: re.Match) -> str:
+        strings.append(match.group(0))
+        return f"\x00{len(strings) - 1}\x01"
+
+    text = CSS_STRING.sub(mask, css)
+    text = CSS_COMMENT.sub('', text)
+    if used is not None:
+        text = _prune_rules(text, *used)
+
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    text = text.replace(';}', '}').strip()
+
+    return re.sub(r'\x00(\d+)\x01', lambda m: strings[int(m.group(1))], text)
+
+
+# =============================================================================
+# SVG AND MARKUP
+# =============================================================================
+
+def minify_svg(svg: str) -> str:
+    """Strip comments, metadata, editor attributes and inter-tag whitespace."""
+    svg = re.sub(r'<!--.*?-->', '', svg, flags=re.DOTALL)
+    svg = SVG_METADATA.sub('', svg)
+    svg = SVG_EDITOR_ATTR.sub('', svg)
+
+    # Whitespace inside <text> elements is rendered, so leave it alone
+    parts = SVG_TEXT.split(svg)
+    out = []
+    for i, part in enumerate(parts):
+        if i % 3 == 0:
+            part = re.sub(r'>\s+<', '><', re.sub(r'\s+', ' ', part))
+            out.append(re.sub(r'^\s+(?=<)|(?<=>)\s+$', '', part))
+        elif i % 3 == 1:
+            out.append(part)
+    return ''.join(out)
+
+
+def _whitespace(match: re.Match) -> str:
+    return '\n' if '\n' in match.group(0) else ' '
+
+
+def _collapse_whitespace(text: str) -> str:
+    """
+    Collapse whitespace runs, keeping a newline where one existed.
+
+    Quoted attribute values are left alone (title="a   b" shows as typed).
+    """
+    def replace(match: re.Match) -> str:
+        if match.group('tag') is None:
+            return _whitespace(match)
+        return TAG_TOKEN.sub(lambda m: m.group('quoted') or _whitespace(m), match.group('tag'))
+
+    return MARKUP_TOKEN.sub(replace, text)
+
+
+def optimize_html(html: str) -> OptimizeResult:
+    """Optimize a self-contained presentation HTML document."""
+    used = _used_names(html)
+    keep_whitespace = bool(PRE_WHITESPACE.search(html))
+    out = []
+    pos = 0
+
+    def markup(text: str) -> str:
+        return text if keep_whitespace else _collapse_whitespace(text)
+
+    # Markup around a dropped comment is merged before collapsing, so the
+    # output is a fixed point (optimizing it again changes nothing)
+    pending = []
+
+    for match in SEGMENT_PATTERN.finditer(html):
+        pending.append(html[pos:match.start()])
+        pos = match.end()
+
+        if match.group('comment') is not None and not KEEP_COMMENT.match(match.group('comment')):
+            continue
+
+        out.append(markup(''.join(pending)))
+        pending = []
+        if match.group('comment') is not None:
+            out.append(match.group('comment'))
+        elif match.group('raw') is not None:
+            out.append(match.group('raw'))
+        elif match.group('style') is not None:
+            out.append(match.group('style'))
+            out.append(minify_css(match.group('css'), used))
+            out.append(match.group('style_end'))
+        else:
+            out.append(minify_svg(match.group('svg')))
+
+    pending.append(html[pos:])
+    out.append(markup(''.join(pending)))
+    text = ''.join(out).strip() + '\n'
+    return OptimizeResult(text, len(html.encode('utf-8')), len(text.encode('utf-8')))
+
+
+def format_savings(name: str, result: OptimizeResult) -> str:
+    """One-line per-file savings report."""
+    return (f"{name}: {result.original_bytes // 1024}KB -> "
+            f"{result.optimized_bytes // 1024}KB (-{result.saved_percent:.0f}%)")
+
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Minify presentation HTML and report savings",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python html_optimize.py presentation.html          # Report only
+  python html_optimize.py presentation.html --write  # Rewrite in place
+        """
+    )
+    parser.add_argument("files", nargs="+", type=Path, help="HTML files")
+    parser.add_argument("--write", action="store_true",
+                        help="Replace each file with its optimized version")
+
+    args = parser.parse_args(argv)
+
+    total_before = total_after = 0
+    for path in args.files:
+        try:
+            result = optimize_html(path.read_text(encoding='utf-8'))
+        except OSError as e:
+            print(f"Error: Cannot read {path}: {e}")
+            return 3
+        total_before += result.original_bytes
+        total_after += result.optimized_bytes
+        print(format_savings(path.name, result))
+        if args.write:
+            path.write_text(result.text, encoding='utf-8')
+
+    if len(args.files) > 1:
+        print(f"Total: {total_before // 1024}KB -> {total_after // 1024}KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
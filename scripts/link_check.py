@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Link Checker
+
+Checks the URLs cited on a presentation's Sources slide and in its
+brief (the QA checklist's "Sources Slide" and "Link Validation" items).
+Links are checked concurrently on an asyncio loop, with at most
+LINK_PER_HOST requests in flight per host over reused keep-alive
+connections. Each link gets a HEAD request, then a GET if the server
+rejects HEAD; redirects are followed.
+
+Results are cached in links.json in state_paths.CACHE_DIR (LINK_CACHE)
+for LINK_CACHE_TTL seconds (a week by default; broken links are rechecked
+after an hour), so a catalog-wide run does not re-hit citations shared
+between modules.
+
+Usage:
+    python link_check.py "/path/to/module"
+    python link_check.py presentation.html 02_Presentation_Brief.md
+    python link_check.py --catalog --json
+"""
+
+import argparse
+import asyncio
+import html
+import http.client
+import json
+import os
+import re
+import ssl
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import urljoin, urlsplit
+
+from state_paths import CACHE_DIR
+from tracing import count, traced
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+LINK_CACHE = Path(os.environ.get("LINK_CACHE", CACHE_DIR / "links.json"))
+LINK_CACHE_TTL = int(os.environ.get("LINK_CACHE_TTL", 7 * 24 * 3600))
+FAILURE_TTL = 3600  # Broken links are rechecked sooner
+
+PER_HOST_LIMIT = int(os.environ.get("LINK_PER_HOST", 4))
+MAX_CONCURRENCY = 32
+REQUEST_TIMEOUT = float(os.environ.get("LINK_TIMEOUT", 10))
+MAX_REDIRECTS = 5
+USER_AGENT = "curriculum-dev-kit-linkcheck/1.0"
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+URL_PATTERN = re.compile(r"https?://[^\s<>\"'`]+", re.IGNORECASE)
+SOURCES_HEADING = re.compile(r"<h[1-3][^>]*>\s*(Sources|References)\b", re.IGNORECASE)
+
+
+class LinkResult(NamedTuple):
+    """Outcome of checking one URL."""
+    url: str
+    ok: bool
+    status: int | None  # Final HTTP status, None if no response
+    final_url: str  # After redirects
+    error: str | None
+    method: str  # Request that decided the result: HEAD or GET
+    checked_at: float
+    cached: bool = False
+
+
+# =============================================================================
+# URL EXTRACTION
+# =============================================================================
+
+def clean_url(url: str) -> str:
+    """Drop trailing punctuation that belongs to the surrounding text."""
+    url = url.rstrip(".,;:!?*_")
+    while url.endswith((")", "]")) and url.count(url[-1]) > url.count("(" if url[-1] == ")" else "["):
+        url = url[:-1].rstrip(".,;:!?*_")
+    return url
+
+
+def urls_in_text(text: str) -> list[str]:
+    """http(s) URLs in text, in order of first appearance."""
+    return list(dict.fromkeys(clean_url(html.unescape(m.group(0)))
+                              for m in URL_PATTERN.finditer(text)))
+
+
+def sources_slides(text: str) -> list[str]:
+    """HTML of the slides headed Sources/References or holding a sources list."""
+    from publish_module import SLIDE_START
+
+    starts = [m.start() for m in SLIDE_START.finditer(text)]
+    slides = [text[start:end] for start, end in zip(starts, starts[1:] + [len(text)])]
+    return [s for s in slides if "sources-list" in s or SOURCES_HEADING.search(s)]
+
+
+def file_links(path: Path) -> list[str]:
+    """URLs of an HTML file's Sources slide, or of a whole Markdown file."""
+    text = path.read_text(encoding='utf-8', errors='replace')
+    if path.suffix.lower() in (".html", ".htm"):
+        return urls_in_text("".join(sources_slides(text)))
+    return urls_in_text(text)
+
+
+def module_link_files(module_path: Path) -> list[Path]:
+    """Top-level presentations and briefs of a module folder."""
+    from module_scan import scan_module
+
+    snapshot = scan_module(module_path, recursive=False)
+    return [f.path for f in snapshot.select([".html", ".htm", ".md"], top_level=True)
+            if f.suffix.lower() != ".md" or "brief" in f.name.lower()]
+
+
+def collect_links(paths: list[Path]) -> dict[str, list[str]]:
+    """URL -> files citing it, for module folders and individual files."""
+    cited: dict[str, list[str]] = defaultdict(list)
+    for path in paths:
+        files = module_link_files(path) if path.is_dir() else [path]
+        for file in files:
+            for url in file_links(file):
+                cited[url].append(str(file))
+    return dict(cited)
+
+
+# =============================================================================
+# RESULT CACHE
+# =============================================================================
+
+class LinkCache:
+    """URL -> last result, persisted as one JSON file."""
+
+    def __init__(self, path: Path = LINK_CACHE, ttl: int = LINK_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.dirty = False
+        try:
+            self.results = json.loads(path.read_text(encoding='utf-8'))["results"]
+        except (OSError, ValueError, KeyError):
+            self.results = {}
+
+    def get(self, url: str, now: float) -> LinkResult | None:
+        """The cached result for url if it is still fresh."""
+        entry = self.results.get(url)
+        if entry is None:
+            return None
+        try:
+            result = LinkResult(url, **entry, cached=True)
+        except TypeError:
+            return None
+        max_age = self.ttl if result.ok else min(self.ttl, FAILURE_TTL)
+        return result if now - result.checked_at < max_age else None
+
+    def put(self, result: LinkResult) -> None:
+        entry = result._asdict()
+        del entry["url"], entry["cached"]
+        self.results[result.url] = entry
+        self.dirty = True
+
+    def save(self) -> None:
+        """Write the cache atomically if anything was added."""
+        if not self.dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".links-")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"results": self.results}, f)
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except OSError:
+            pass  # Cache is an optimization only
+
+
+# =============================================================================
+# CHECKING
+# =============================================================================
+
+class ConnectionPool:
+    """Idle keep-alive connections per (scheme, host, port); thread-safe."""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.idle: dict[tuple, list[http.client.HTTPConnection]] = defaultdict(list)
+        self.lock = threading.Lock()
+        self.context = ssl.create_default_context()
+
+    def connect(self, key: tuple) -> http.client.HTTPConnection:
+        """A new (not yet connected) connection for key."""
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout,
+                                               context=self.context)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def acquire(self, key: tuple) -> tuple[http.client.HTTPConnection, bool]:
+        """An idle connection for key if there is one, else a new one; and whether reused."""
+        with self.lock:
+            if self.idle[key]:
+                return self.idle[key].pop(), True
+        return self.connect(key), False
+
+    def release(self, key: tuple, conn: http.client.HTTPConnection) -> None:
+        with self.lock:
+            self.idle[key].append(conn)
+
+    def close(self) -> None:
+        with self.lock:
+            for conns in self.idle.values():
+                for conn in conns:
+                    conn.close()
+            self.idle.clear()
+
+
+def request_once(pool: ConnectionPool, method: str, url: str) -> tuple[int, str | None]:
+    """
+    Blocking request; returns (status, Location header).
+
+    HEAD connections go back to the pool. GET responses are not read, so
+    their connection is closed instead of downloading the body.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("not an http(s) URL")
+    key = (parts.scheme, parts.hostname, parts.port)
+    target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    headers = {"User-Agent": USER_AGENT, "Accept": "*/*"}
+
+    conn, reused = pool.acquire(key)
+    try:
+        conn.request(method, target, headers=headers)
+        response = conn.getresponse()
+    except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+        conn.close()
+        if not reused:
+            raise
+        # The server closed an idle keep-alive connection: retry on a new one
+        conn = pool.connect(key)
+        try:
+            conn.request(method, target, headers=headers)
+            response = conn.getresponse()
+        except Exception:
+            conn.close()
+            raise
+    except Exception:
+        conn.close()
+        raise
+
+    count(requests=1)
+    location = response.getheader("Location")
+    if method == "HEAD" and not response.will_close:
+        response.read()
+        pool.release(key, conn)
+    else:
+        response.close()
+        conn.close()
+    return response.status, location
+
+
+class LinkChecker:
+    """Checks many URLs concurrently with per-host limits."""
+
+    def __init__(self, per_host: int = PER_HOST_LIMIT,
+                 concurrency: int = MAX_CONCURRENCY,
+                 timeout: float = REQUEST_TIMEOUT):
+        self.per_host = per_host
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    async def check_all(self, urls: list[str]) -> list[LinkResult]:
+        self.pool = ConnectionPool(self.timeout)
+        self.executor = ThreadPoolExecutor(self.concurrency, thread_name_prefix="linkcheck")
+        self.hosts: dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.per_host))
+        try:
+            return await asyncio.gather(*(self.check(url) for url in urls))
+        finally:
+            self.executor.shutdown(wait=True)
+            self.pool.close()
+
+    async def fetch(self, method: str, url: str) -> tuple[int, str | None]:
+        """One request, holding the host's slot while it runs."""
+        host = (urlsplit(url).hostname or "").lower()
+        async with self.hosts[host]:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, request_once,
+                                              self.pool, method, url)
+
+    async def follow(self, method: str, url: str) -> tuple[int, str]:
+        """Request url, following redirects; returns (final status, final URL)."""
+        for _ in range(MAX_REDIRECTS + 1):
+            status, location = await self.fetch(method, url)
+            if status not in REDIRECT_STATUSES or not location:
+                return status, url
+            url = urljoin(url, location)
+        raise http.client.HTTPException(f"more than {MAX_REDIRECTS} redirects")
+
+    async def check(self, url: str) -> LinkResult:
+        method = "HEAD"
+        try:
+            status, final = await self.follow(method, url)
+            if status >= 400:
+                # Many servers reject or mishandle HEAD; GET is authoritative
+                method = "GET"
+                status, final = await self.follow(method, url)
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            return LinkResult(url, False, None, url, str(e) or type(e).__name__,
+                              method, time.time())
+        return LinkResult(url, 200 <= status < 400, status, final,
+                          None if status < 400 else f"HTTP {status}", method, time.time())
+
+
+@traced("links.check")
+def check_links(urls: list[str], cache: LinkCache | None = None,
+                refresh: bool = False, per_host: int = PER_HOST_LIMIT,
+                timeout: float = REQUEST_TIMEOUT) -> dict[str, LinkResult]:
+    """
+    Check urls, reusing fresh cached results unless refresh is set.
+
+    Returns url -> LinkResult in the order given.
+    """
+    cache = cache if cache is not None else LinkCache()
+    now = time.time()
+    results: dict[str, LinkResult] = {}
+    pending = []
+    for url in dict.fromkeys(urls):
+        cached = None if refresh else cache.get(url, now)
+        if cached:
+            results[url] = cached
+        else:
+            pending.append(url)
+
+    if pending:
+        checker = LinkChecker(per_host=per_host, timeout=timeout)
+        for result in asyncio.run(checker.check_all(pending)):
+            results[result.url] = result
+            cache.put(result)
+        cache.save()
+
+    count(links=len(results), cache_hits=len(results) - len(pending))
+    return {url: results[url] for url in dict.fromkeys(urls)}
+
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def log(message: str, status: str = "INFO") -> None:
+    """Print formatted log message."""
+    symbols = {"OK": "[OK]", "FAIL": "[FAIL]", "WARN": "[WARN]", "INFO": "->"}
+    print(f"{symbols.get(status, '->')} {message}")
+
+
+def print_results(results: dict[str, LinkResult], cited: dict[str, list[str]],
+                  verbose: bool = False) -> None:
+    """Broken and moved links with the files citing them, then a summary."""
+    broken = moved = cached = 0
+    for url, result in results.items():
+        cached += result.cached
+        where = ", ".join(Path(f).name for f in cited.get(url, []))
+        if not result.ok:
+            broken += 1
+            log(f"{url} - {result.error} ({result.method})  [{where}]", "FAIL")
+        elif result.final_url != url:
+            moved += 1
+            log(f"{url} -> {result.final_url}  [{where}]", "WARN")
+        elif verbose:
+            log(f"{url} ({result.status})", "OK")
+
+    print(f"\n{len(results)} link(s): {len(results) - broken} ok, {broken} broken, "
+          f"{moved} redirected ({cached} from cache)")
+
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Check Sources-slide and brief links",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exit codes:
+  0 = All links reachable
+  1 = One or more broken links
+  3 = File not found
+
+Examples:
+  python link_check.py "/path/to/module"
+  python link_check.py presentation.html 02_Presentation_Brief.md
+  python link_check.py --catalog --per-host 2
+  python link_check.py "/path/to/module" --refresh --json
+        """
+    )
+    parser.add_argument("paths", nargs="*", type=Path,
+                        help="Module folders, presentation HTML or Markdown files")
+    parser.add_argument("--catalog", action="store_true",
+                        help="Check every module in the catalog (newest rework of each)")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached results")
+    parser.add_argument("--per-host", type=int, default=PER_HOST_LIMIT,
+                        help=f"Concurrent requests per host (default: {PER_HOST_LIMIT})")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT,
+                        help=f"Seconds per request (default: {REQUEST_TIMEOUT:g})")
+    parser.add_argument("--verbose", "-v", action="store_true", help="List working links too")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+
+    args = parser.parse_args(argv)
+    paths = list(args.paths)
+    if args.catalog:
+        import catalog
+        conn = catalog.connect()
+        paths += [Path(row["path"]) for row in catalog.query_catalog(conn)]
+        conn.close()
+    if not paths:
+        parser.error("give module folders or files, or --catalog")
+
+    missing = [p for p in paths if not p.exists()]
+    if missing:
+        print(f"Error: Path not found: {missing[0]}")
+        return 3
+
+    cited = collect_links(paths)
+    results = check_links(list(cited), refresh=args.refresh,
+                          per_host=max(1, args.per_host), timeout=args.timeout)
+
+    if args.json:
+        print(json.dumps([{**r._asdict(), "cited_in": cited[url]}
+                          for url, r in results.items()], indent=2))
+    else:
+        print_results(results, cited, args.verbose)
+    return 0 if all(r.ok for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
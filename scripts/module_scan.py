@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Module Tree Scanner
+
+Walks a module folder once with os.scandir and keeps the stat result of
+every entry, so validation and publishing share a single snapshot instead
+of each step re-walking the tree and re-stating every file.
+
+rework_order() sorts "<Month> <Year> ReWork" folders by date.
+
+Usage:
+    from module_scan import scan_module
+
+    snapshot = scan_module(Path("/path/to/module"))
+    for entry in snapshot.files:
+        print(entry.rel_path, entry.size)
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+from tracing import count, traced
+
+# "<Month> <Year> ReWork" folder names, for ordering reworks by date
+REWORK_DATE = re.compile(r'([A-Za-z]{3,})\s+(\d{4})')
+MONTHS = ("jan", "feb", "mar", "apr", "may", "jun",
+          "jul", "aug", "sep", "oct", "nov", "dec")
+
+
+class ScannedFile(NamedTuple):
+    """A regular file found during a scan, with its cached stat data."""
+    path: Path
+    parts: tuple[str, ...]  # Path components relative to the scan root
+    size: int
+    mtime_ns: int
+
+    @property
+    def name(self) -> str:
+        return self.parts[-1]
+
+    @property
+    def suffix(self) -> str:
+        return os.path.splitext(self.parts[-1])[1]
+
+    @property
+    def rel_path(self) -> str:
+        """Relative path using the OS separator (matches Path.relative_to)."""
+        return os.path.join(*self.parts)
+
+    @property
+    def top_level(self) -> bool:
+        return len(self.parts) == 1
+
+
+class ModuleSnapshot:
+    """One walk of a module folder: files, directories, sizes and mtimes."""
+
+    def __init__(self, root: Path, files: list[ScannedFile], dirs: set[tuple[str, ...]]):
+        self.root = root
+        self.files = sorted(files, key=lambda f: f.parts)
+        self.dirs = dirs
+        self._by_parts = {f.parts: f for f in self.files}
+
+    @staticmethod
+    def _split(rel_path: str | Path) -> tuple[str, ...]:
+        return tuple(p for p in Path(rel_path).parts if p not in ("", "."))
+
+    def get(self, rel_path: str | Path) -> ScannedFile | None:
+        """Return the scanned file at rel_path, or None."""
+        return self._by_parts.get(self._split(rel_path))
+
+    def exists(self, rel_path: str | Path) -> bool:
+        """Equivalent of (root / rel_path).exists() without a syscall."""
+        parts = self._split(rel_path)
+        return parts in self._by_parts or parts in self.dirs or not parts
+
+    def select(self, suffixes: Iterable[str] | None = None,
+               top_level: bool = False,
+               skip_markers: bool = False) -> list[ScannedFile]:
+        """Filter files by lowercase suffix, depth, and '_' marker prefix."""
+        wanted = {s.lower() for s in suffixes} if suffixes is not None else None
+        return [
+            f for f in self.files
+            if (wanted is None or f.suffix.lower() in wanted)
+            and (not top_level or f.top_level)
+            and not (skip_markers and f.name.startswith('_'))
+        ]
+
+    @property
+    def subdirs(self) -> list[Path]:
+        """Top-level directories, sorted by name."""
+        return sorted((self.root / d[0] for d in self.dirs if len(d) == 1),
+                      key=lambda p: p.name)
+
+    @property
+    def is_empty(self) -> bool:
+        """True for a missing or empty folder (like `not any(iterdir())`)."""
+        return not self.files and not self.dirs
+
+    @property
+    def total_size(self) -> int:
+        return sum(f.size for f in self.files)
+
+    @property
+    def latest_mtime_ns(self) -> int:
+        return max((f.mtime_ns for f in self.files), default=0)
+
+    def fingerprint(self) -> tuple:
+        """Cheap change detector: (relative path, size, mtime) of every file."""
+        return tuple((f.parts, f.size, f.mtime_ns) for f in self.files)
+
+
+@traced("scan")
+def scan_module(root: Path, recursive: bool = True) -> ModuleSnapshot:
+    """
+    Walk root once and return a snapshot of its files.
+
+    Each DirEntry is stat'ed at most once; directory type checks come from
+    the directory listing itself. A missing root yields an empty snapshot.
+    """
+    files: list[ScannedFile] = []
+    dirs: set[tuple[str, ...]] = set()
+    pending: list[tuple[str, tuple[str, ...]]] = [(os.fspath(root), ())]
+
+    while pending:
+        dir_path, prefix = pending.pop()
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    parts = prefix + (entry.name,)
+                    try:
+                        if entry.is_dir():
+                            dirs.add(parts)
+                            if recursive and not entry.is_symlink():
+                                pending.append((entry.path, parts))
+                        elif entry.is_file():
+                            st = entry.stat()
+                            files.append(ScannedFile(
+                                Path(entry.path), parts, st.st_size, st.st_mtime_ns
+                            ))
+                    except OSError:
+                        continue  # Vanished or unreadable mid-scan
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+
+    count(files=len(files))
+    return ModuleSnapshot(Path(root), files, dirs)
+
+
+def rework_order(folder: Path) -> tuple[int, int, str]:
+    """Sort key putting rework folders in date order (undated names first)."""
+    match = REWORK_DATE.search(folder.name)
+    month = match.group(1)[:3].lower() if match else ""
+    if month in MONTHS:
+        return int(match.group(2)), MONTHS.index(month) + 1, folder.name
+    return 0, 0, folder.name
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Slides
+
+Finds slides (presentation HTML) and speaker-notes sections that were
+copied between modules and have drifted since. Each unit's text is cut
+into five-word shingles (see rework_diff.py), summarized as a MinHash
+signature, and bucketed by locality-sensitive hashing: only units sharing
+a band of their signature are compared, so a whole catalog is checked
+without comparing every pair.
+
+Signatures are cached under minhash/ in state_paths.CACHE_DIR
+(MINHASH_CACHE), one JSON file per file digest, so re-runs only process
+files that changed. NumPy is used to compute signatures when installed;
+results are identical without.
+
+Usage:
+    python near_duplicates.py --catalog
+    python near_duplicates.py --catalog --threshold 0.9 --kind slides
+    python near_duplicates.py "/path/to/C1M1 rework" "/path/to/C2M4 rework" --within
+    python near_duplicates.py --catalog --json
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import struct
+import sys
+import tempfile
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import NamedTuple
+
+from rework_diff import WORD, document_files, notes_units, presentation_units, shingles
+from state_paths import CACHE_DIR
+from timing_model import load_numpy
+from tracing import count, traced
+from yaml_compat import safe_load
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+MINHASH_CACHE = Path(os.environ.get("MINHASH_CACHE", CACHE_DIR / "minhash"))
+
+# 16 bands of 8 rows: pairs at Jaccard 0.8 share a band ~95% of the time,
+# pairs at 0.5 under 7%
+BANDS = 16
+ROWS = 8
+NUM_PERM = BANDS * ROWS
+HASH_SEED = 20260101
+
+DEFAULT_THRESHOLD = 0.8  # Estimated Jaccard similarity to report
+MIN_WORDS = 20  # Smaller units (title, agenda, "Questions?") are skipped
+MEMBERS_SHOWN = 8  # Per group in the text report
+
+# Bump when shingling or hashing changes, so stale cache entries are ignored
+SIGNATURE_VERSION = 1
+
+MASK64 = (1 << 64) - 1
+_rng = random.Random(HASH_SEED)
+# Multiply-shift hashes ((a*x + b) mod 2^64) >> 32; a is odd
+PERMUTATIONS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_PERM)]
+
+# Document kind -> (rework_diff document, splitter)
+KINDS = {
+    "slides": ("presentation", presentation_units),
+    "notes": ("notes", notes_units),
+}
+
+
+class Signed(NamedTuple):
+    """A slide or notes section with its MinHash signature."""
+    module: str
+    kind: str
+    file: str
+    position: int
+    title: str
+    signature: tuple[int, ...]
+
+
+class Group(NamedTuple):
+    """Units linked by near-duplicate pairs."""
+    kind: str
+    members: list[Signed]
+    pairs: list[tuple[int, int, float]]  # Member indexes and estimated similarity
+
+
+# =============================================================================
+# SIGNATURES
+# =============================================================================
+
+def unit_shingles(text: str) -> list[int]:
+    """Stable 32-bit shingle hashes (crc32 word ids, so they can be cached)."""
+    words = [zlib.crc32(w.encode('utf-8')) for w in WORD.findall(text.lower())]
+    if len(words) < MIN_WORDS:
+        return []
+    return list({h & 0xFFFFFFFF for h in shingles(words)})
+
+
+def minhash(values: list[int]) -> tuple[int, ...]:
+    """MinHash signature of one shingle set, in pure Python."""
+    return tuple(min([(a * x + b) & MASK64 for x in values]) >> 32 for a, b in PERMUTATIONS)
+
+
+def minhash_many(sets: list[list[int]], use_numpy: bool | None = None) -> list[tuple[int, ...]]:
+    """
+    Signatures of many shingle sets.
+
+    With NumPy every set is hashed in one array pass; uint64 arithmetic
+    wraps exactly like the pure-Python mask, so both give the same result.
+    """
+    np = load_numpy() if use_numpy is not False else None
+    if use_numpy and np is None:
+        raise ImportError("numpy is required for use_numpy=True")
+    if np is None or not sets:
+        return [minhash(values) for values in sets]
+
+    a = np.array([p[0] for p in PERMUTATIONS], dtype=np.uint64)[:, None]
+    b = np.array([p[1] for p in PERMUTATIONS], dtype=np.uint64)[:, None]
+    lengths = np.array([len(values) for values in sets])
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    flat = np.fromiter((x for values in sets for x in values), dtype=np.uint64,
+                       count=int(lengths.sum()))
+    signatures = []
+    # Chunks keep the (NUM_PERM, n) working array to a few MB
+    chunk = 1 << 14
+    start = 0
+    while start < len(sets):
+        end = start
+        while end < len(sets) and offsets[end] - offsets[start] < chunk:
+            end += 1
+        end = max(end, start + 1)
+        lo, hi = offsets[start], offsets[end - 1] + lengths[end - 1]
+        hashed = (a * flat[lo:hi] + b) >> np.uint64(32)
+        mins = np.minimum.reduceat(hashed, offsets[start:end] - lo, axis=1)
+        signatures.extend(tuple(int(v) for v in column) for column in mins.T)
+        start = end
+    return signatures
+
+
+def pack(signature: tuple[int, ...]) -> str:
+    return base64.b64encode(struct.pack(f"<{NUM_PERM}I", *signature)).decode('ascii')
+
+
+def unpack(data: str) -> tuple[int, ...]:
+    return struct.unpack(f"<{NUM_PERM}I", base64.b64decode(data))
+
+
+class SignatureCache:
+    """File digest -> per-unit signatures, one JSON file each."""
+
+    def __init__(self, cache_dir: Path = MINHASH_CACHE, use_numpy: bool | None = None):
+        self.cache_dir = cache_dir
+        self.use_numpy = use_numpy
+        self.computed = 0
+        self.cached = 0
+
+    @traced("dupes.signatures")
+    def file_units(self, path: Path, kind: str) -> list[tuple[int, str, tuple[int, ...]]]:
+        """(position, title, signature) of every large-enough unit of a file."""
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return []
+        count(files=1, bytes_read=len(data))
+        digest = hashlib.sha256(data).hexdigest()
+        cache_path = self.cache_dir / f"{digest}-{kind}.json"
+        try:
+            cached = json.loads(cache_path.read_text(encoding='utf-8'))
+            if cached.get("version") == SIGNATURE_VERSION:
+                self.cached += 1
+                return [(p, t, unpack(s)) for p, t, s in cached["units"]]
+        except (OSError, ValueError, TypeError, KeyError, struct.error):
+            pass
+
+        units = KINDS[kind][1](data.decode('utf-8', 'replace'))
+        sets = [(unit, unit_shingles(unit.words)) for unit in units]
+        sets = [(unit, values) for unit, values in sets if values]
+        signatures = minhash_many([values for _, values in sets], self.use_numpy)
+        result = [(unit.position, unit.title, sig) for (unit, _), sig in zip(sets, signatures)]
+        self.computed += 1
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=".minhash-")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"version": SIGNATURE_VERSION, "source": path.name,
+                           "units": [[p, t, pack(s)] for p, t, s in result]}, f)
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass  # Cache is an optimization only
+        return result
+
+
+def module_label(folder: Path) -> str:
+    """Module code from module.yaml, else the folder path."""
+    try:
+        data = safe_load((folder / "module.yaml").read_text(encoding='utf-8')) or {}
+        code = str(data.get("code") or "").upper()
+    except Exception:
+        code = ""
+    return code or str(folder)
+
+
+def collect_units(folders: list[Path], kinds: list[str],
+                  cache: SignatureCache) -> list[Signed]:
+    """Signed units of every folder's presentation and/or speaker notes."""
+    units = []
+    for folder in folders:
+        files = document_files(folder)
+        label = module_label(folder)
+        for kind in kinds:
+            path = files[KINDS[kind][0]]
+            if path is None:
+                continue
+            units.extend(Signed(label, kind, path.name, position, title, signature)
+                         for position, title, signature in cache.file_units(path, kind))
+    return units
+
+
+# =============================================================================
+# LSH
+# =============================================================================
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity: the fraction of agreeing MinHash values."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+@traced("dupes.lsh")
+def find_groups(units: list[Signed], threshold: float = DEFAULT_THRESHOLD,
+                within: bool = False) -> list[Group]:
+    """
+    Near-duplicate groups, largest first.
+
+    Units with identical signatures are collapsed first (copies of a
+    template slide would otherwise pair off quadratically); representatives
+    sharing any LSH band are compared, and pairs at or above threshold are
+    joined with union-find. Pairs from the same module are ignored unless
+    within=True.
+    """
+    by_signature: dict[tuple[str, tuple[int, ...]], list[int]] = defaultdict(list)
+    for i, unit in enumerate(units):
+        by_signature[(unit.kind, unit.signature)].append(i)
+    copies = list(by_signature.values())
+
+    parent = list(range(len(units)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    pairs: list[tuple[int, int, float]] = []
+
+    def link(i: int, j: int, score: float) -> None:
+        if not within and units[i].module == units[j].module:
+            return
+        pairs.append((i, j, score))
+        parent[find(i)] = find(j)
+
+    for members in copies:
+        for j in members[1:]:
+            link(members[0], j, 1.0)
+
+    buckets: dict[tuple, list[int]] = defaultdict(list)
+    for c, members in enumerate(copies):
+        unit = units[members[0]]
+        for band in range(BANDS):
+            key = (unit.kind, band, unit.signature[band * ROWS:(band + 1) * ROWS])
+            buckets[key].append(c)
+
+    seen = set()
+    for bucket in buckets.values():
+        for x, c in enumerate(bucket):
+            for d in bucket[x + 1:]:
+                if (c, d) in seen:
+                    continue
+                seen.add((c, d))
+                score = similarity(units[copies[c][0]].signature, units[copies[d][0]].signature)
+                if score < threshold:
+                    continue
+                for i in copies[c]:
+                    for j in copies[d]:
+                        link(i, j, score)
+    count(candidates=len(seen))
+
+    grouped: dict[int, list[int]] = defaultdict(list)
+    for i in range(len(units)):
+        grouped[find(i)].append(i)
+    members_of = {root: members for root, members in grouped.items() if len(members) > 1}
+    group_pairs: dict[int, list[tuple[int, int, float]]] = defaultdict(list)
+    for i, j, score in pairs:
+        group_pairs[find(i)].append((i, j, score))
+
+    groups = []
+    for root, members in members_of.items():
+        index = {unit: n for n, unit in enumerate(members)}
+        groups.append(Group(units[members[0]].kind, [units[i] for i in members],
+                            [(index[i], index[j], score) for i, j, score in group_pairs[root]]))
+    groups.sort(key=lambda g: (-len({m.module for m in g.members}), -len(g.members),
+                               g.members[0].module, g.members[0].position))
+    return groups
+
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+
+def print_groups(groups: list[Group], threshold: float, limit: int | None) -> None:
+    for kind in KINDS:
+        selected = [g for g in groups if g.kind == kind]
+        label = "slides" if kind == "slides" else "speaker-notes sections"
+        print(f"Near-duplicate {label} (similarity >= {threshold:.0%}): {len(selected)} group(s)")
+        for n, group in enumerate(selected[:limit], 1):
+            scores = [score for _, _, score in group.pairs]
+            spread = (f"{min(scores):.0%}" if min(scores) == max(scores)
+                      else f"{min(scores):.0%}-{max(scores):.0%}")
+            print(f"\n  [{n}] {len(group.members)} units in "
+                  f"{len({m.module for m in group.members})} module(s), {spread} similar")
+            for member in group.members[:MEMBERS_SHOWN]:
+                print(f"      {member.module:<8} {member.file} #{member.position:<4} {member.title}")
+            if len(group.members) > MEMBERS_SHOWN:
+                print(f"      ... and {len(group.members) - MEMBERS_SHOWN} more")
+        if limit is not None and len(selected) > limit:
+            print(f"\n  ... {len(selected) - limit} more (use --limit or --json)")
+        print()
+
+
+def groups_json(groups: list[Group]) -> list[dict]:
+    return [{
+        "kind": g.kind,
+        "members": [{"module": m.module, "file": m.file, "position": m.position,
+                     "title": m.title} for m in g.members],
+        "pairs": [{"a": i, "b": j, "similarity": round(score, 3)} for i, j, score in g.pairs],
+    } for g in groups]
+
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Find near-duplicate slides and speaker notes across modules",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python near_duplicates.py --catalog
+  python near_duplicates.py --catalog --threshold 0.9 --kind slides
+  python near_duplicates.py "/path/to/module A" "/path/to/module B" --within
+  python near_duplicates.py --catalog --json > duplicates.json
+        """
+    )
+    parser.add_argument("paths", nargs="*", type=Path, help="Module (rework) folders")
+    parser.add_argument("--catalog", action="store_true",
+                        help="Every module in the catalog (newest rework of each)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Minimum estimated similarity, 0-1 (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--kind", choices=[*KINDS, "both"], default="both",
+                        help="Compare slides, speaker notes or both (default: both)")
+    parser.add_argument("--within", action="store_true",
+                        help="Also report duplicates inside one module")
+    parser.add_argument("--limit", type=int, default=20,
+                        help="Groups shown per kind (default: 20)")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+
+    args = parser.parse_args(argv)
+    folders = list(args.paths)
+    if args.catalog:
+        import catalog
+        conn = catalog.connect()
+        folders += [Path(row["path"]) for row in catalog.query_catalog(conn)]
+        conn.close()
+    if not folders:
+        parser.error("give module folders, or --catalog")
+
+    missing = [p for p in folders if not p.is_dir()]
+    if missing:
+        print(f"Error: Folder not found: {missing[0]}")
+        return 3
+
+    kinds = list(KINDS) if args.kind == "both" else [args.kind]
+    cache = SignatureCache()
+    units = collect_units(folders, kinds, cache)
+    groups = find_groups(units, args.threshold, args.within)
+
+    if args.json:
+        print(json.dumps(groups_json(groups), indent=2))
+        return 0
+    print_groups(groups, args.threshold, args.limit)
+    print(f"{len(units)} units in {len(folders)} module(s); signatures for "
+          f"{cache.computed} file(s) computed, {cache.cached} cached")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
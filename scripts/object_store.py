@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Module Store
+
+Optional storage mode for published modules. Each presentation embeds the
+same design-system CSS and navigation JS, so HTML files are split into
+blocks: every inline <style>/<script> element becomes its own block and the
+module-specific markup between them fills the rest. Blocks are stored once
+under their SHA256 digest; a per-module manifest lists the blocks of each
+file, and export rebuilds the original self-contained files byte for byte.
+
+Layout:
+    {store}/objects/ab/cdef...   Block contents, named by digest
+    {store}/manifests/C1M1.json  Files of a module as lists of digests
+
+Republishing a module leaves the blocks only its old files used behind;
+gc deletes every object no manifest references (publish runs it after
+storing a module, so the commit includes the deletions).
+
+Usage:
+    python object_store.py stats
+    python object_store.py gc --dry-run
+    python object_store.py export C1M1 ./out
+    python publish_module.py C1M1 --store
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Iterator
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+WORKSPACE_ROOT = Path(os.environ.get("WORKSPACE_ROOT", "."))
+STORE_ROOT = Path(os.environ.get("OBJECT_STORE", WORKSPACE_ROOT / "courses" / ".store"))
+
+# Inline <style>/<script> elements become shareable blocks. Elements with a
+# src attribute are never split out: they would break the self-contained rule.
+BLOCK_PATTERN = re.compile(
+    r'<(style|script)\b(?![^>]*\bsrc\s*=)[^>]*>.*?</\1\s*>',
+    re.IGNORECASE | re.DOTALL,
+)
+
+# External references a rebuilt file must never contain
+EXTERNAL_PATTERNS = [
+    (re.compile(r'<link[^>]*href\s*=', re.IGNORECASE), "External CSS link"),
+    (re.compile(r'<script[^>]*src\s*=', re.IGNORECASE), "External JavaScript"),
+]
+
+
+class StoreError(Exception):
+    """Raised for missing manifests/objects or non-self-contained output."""
+
+
+# =============================================================================
+# BLOCK SPLITTING
+# =============================================================================
+
+def split_blocks(name: str, data: bytes) -> list[bytes]:
+    """
+    Split a file into blocks whose concatenation is the original bytes.
+
+    HTML files yield alternating content and <style>/<script> blocks;
+    everything else is a single block.
+    """
+    if not name.lower().endswith(('.html', '.htm')):
+        return [data]
+
+    text = data.decode('utf-8', errors='surrogateescape')
+    blocks = []
+    pos = 0
+    for match in BLOCK_PATTERN.finditer(text):
+        if match.start() > pos:
+            blocks.append(text[pos:match.start()])
+        blocks.append(match.group(0))
+        pos = match.end()
+    if pos < len(text) or not blocks:
+        blocks.append(text[pos:])
+    return [b.encode('utf-8', errors='surrogateescape') for b in blocks]
+
+
+def check_self_contained(name: str, data: bytes) -> None:
+    """Raise StoreError if a rebuilt HTML file references external resources."""
+    if not name.lower().endswith(('.html', '.htm')):
+        return
+    text = data.decode('utf-8', errors='replace')
+    for pattern, description in EXTERNAL_PATTERNS:
+        if pattern.search(text):
+            raise StoreError(f"{name}: {description} in rebuilt output")
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+class ObjectStore:
+    """Digest-addressed blocks plus per-module manifests on disk."""
+
+    def __init__(self, root: Path = STORE_ROOT):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.manifests = self.root / "manifests"
+        # Objects gc() deleted through this instance, for committing the store
+        self.deleted: list[Path] = []
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest[2:]
+
+    def manifest_path(self, module_code: str) -> Path:
+        return self.manifests / f"{module_code.upper()}.json"
+
+    def put_object(self, data: bytes) -> tuple[str, bool]:
+        """Store a block; returns (digest, newly_written)."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if path.exists():
+            return digest, False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return digest, True
+
+    def get_object(self, digest: str) -> bytes:
+        try:
+            return self.object_path(digest).read_bytes()
+        except FileNotFoundError:
+            raise StoreError(f"Missing object {digest}") from None
+
+    def put_module(self, module_code: str, files: dict[str, bytes]) -> dict[str, int]:
+        """
+        Store a module's files and write its manifest.
+
+        Returns {"files", "bytes", "new_bytes"}: logical size of the module
+        and how much of it was not already in the store.
+        """
+        manifest = {"module": module_code.upper(), "files": {}}
+        new_bytes = 0
+
+        for name in sorted(files):
+            data = files[name]
+            digests = []
+            for block in split_blocks(name, data):
+                digest, written = self.put_object(block)
+                digests.append(digest)
+                if written:
+                    new_bytes += len(block)
+            manifest["files"][name] = {"size": len(data), "blocks": digests}
+
+        path = self.manifest_path(module_code)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding='utf-8')
+
+        return {
+            "files": len(files),
+            "bytes": sum(len(d) for d in files.values()),
+            "new_bytes": new_bytes,
+        }
+
+    def module_paths(self, module_code: str) -> list[Path]:
+        """A module's manifest and every object it references."""
+        manifest = self.load_manifest(module_code)
+        digests = {d for entry in manifest["files"].values() for d in entry["blocks"]} \
+            if manifest else set()
+        return [self.manifest_path(module_code)] + [self.object_path(d) for d in sorted(digests)]
+
+    def load_manifest(self, module_code: str) -> dict | None:
+        path = self.manifest_path(module_code)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding='utf-8'))
+
+    def read_file(self, module_code: str, name: str) -> bytes | None:
+        """Rebuild one file of a module; None if the module or file is missing."""
+        manifest = self.load_manifest(module_code)
+        entry = manifest["files"].get(name) if manifest else None
+        if entry is None:
+            return None
+        return b"".join(self.get_object(d) for d in entry["blocks"])
+
+    def read_module(self, module_code: str) -> dict[str, bytes]:
+        """Rebuild every file of a module in memory."""
+        manifest = self.load_manifest(module_code)
+        if manifest is None:
+            raise StoreError(f"No manifest for {module_code.upper()}")
+        return {
+            name: b"".join(self.get_object(d) for d in entry["blocks"])
+            for name, entry in manifest["files"].items()
+        }
+
+    def export_module(self, module_code: str, out_dir: Path) -> list[Path]:
+        """Write a module's self-contained files to out_dir."""
+        files = self.read_module(module_code)
+        for name, data in files.items():
+            check_self_contained(name, data)
+
+        out_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        for name, data in sorted(files.items()):
+            target = out_dir / name
+            target.write_bytes(data)
+            written.append(target)
+        return written
+
+    def iter_manifests(self) -> Iterator[dict]:
+        if self.manifests.exists():
+            for path in self.manifests.glob("*.json"):
+                yield json.loads(path.read_text(encoding='utf-8'))
+
+    def iter_objects(self) -> Iterator[tuple[str, os.DirEntry]]:
+        """(digest, directory entry) of every stored object."""
+        if not self.objects.exists():
+            return
+        for shard in os.scandir(self.objects):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if not entry.name.startswith('.'):
+                        yield shard.name + entry.name, entry
+
+    def live_digests(self) -> set[str]:
+        """Digests referenced by any manifest."""
+        return {digest
+                for manifest in self.iter_manifests()
+                for entry in manifest["files"].values()
+                for digest in entry["blocks"]}
+
+    def gc(self, dry_run: bool = False) -> dict[str, int]:
+        """
+        Delete objects no manifest references, and emptied shard folders.
+
+        Returns {"objects", "bytes"} removed (or that would be, with
+        dry_run). Run it under publish_module.PUBLISH_LOCK: a publish in
+        progress writes its objects before its manifest.
+        """
+        live = self.live_digests()
+        removed = {"objects": 0, "bytes": 0}
+        shards = set()
+        for digest, entry in list(self.iter_objects()):
+            if digest in live:
+                continue
+            removed["objects"] += 1
+            removed["bytes"] += entry.stat().st_size
+            if not dry_run:
+                os.unlink(entry.path)
+                self.deleted.append(Path(entry.path))
+                shards.add(os.path.dirname(entry.path))
+        for shard in shards:
+            try:
+                os.rmdir(shard)
+            except OSError:
+                pass  # Still holds live objects
+        return removed
+
+    def stats(self) -> dict[str, float]:
+        """
+        Logical vs stored bytes across every manifest.
+
+        stored_bytes counts only referenced objects; unreferenced ones (see
+        gc) are reported as orphaned_objects/orphaned_bytes.
+        """
+        logical = 0
+        modules = 0
+        live = set()
+        for manifest in self.iter_manifests():
+            logical += sum(f["size"] for f in manifest["files"].values())
+            live.update(d for f in manifest["files"].values() for d in f["blocks"])
+            modules += 1
+
+        stored = objects = orphaned = orphaned_bytes = 0
+        for digest, entry in self.iter_objects():
+            size = entry.stat().st_size
+            if digest in live:
+                stored += size
+                objects += 1
+            else:
+                orphaned_bytes += size
+                orphaned += 1
+
+        return {
+            "modules": modules,
+            "objects": objects,
+            "logical_bytes": logical,
+            "stored_bytes": stored,
+            "bytes_saved": logical - stored,
+            "dedupe_ratio": round(logical / stored, 2) if stored else 0.0,
+            "orphaned_objects": orphaned,
+            "orphaned_bytes": orphaned_bytes,
+        }
+
+
+def format_stats(stats: dict) -> str:
+    """One-line summary used by publish and the stats command."""
+    summary = (f"{stats['modules']} module(s), {stats['objects']} object(s): "
+               f"{stats['logical_bytes'] // 1024}KB logical, "
+               f"{stats['stored_bytes'] // 1024}KB stored "
+               f"(dedupe {stats['dedupe_ratio']}x, {stats['bytes_saved'] // 1024}KB saved)")
+    if stats.get("orphaned_objects"):
+        summary += (f"; {stats['orphaned_objects']} unreferenced object(s), "
+                    f"{stats['orphaned_bytes'] // 1024}KB (run gc)")
+    return summary
+
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Inspect or export the content-addressed module store",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python object_store.py stats
+  python object_store.py gc --dry-run
+  python object_store.py export C1M1 ./export/c1m1
+        """
+    )
+    parser.add_argument("--store", type=Path, default=STORE_ROOT,
+                        help=f"Store location (default: {STORE_ROOT})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Show dedupe ratio and bytes saved")
+    gc = sub.add_parser("gc", help="Delete objects no manifest references")
+    gc.add_argument("--dry-run", action="store_true", help="Only report what would be deleted")
+    export = sub.add_parser("export", help="Rebuild a module's self-contained files")
+    export.add_argument("module", help="Module code (e.g., C1M1)")
+    export.add_argument("out_dir", type=Path, help="Output folder")
+
+    args = parser.parse_args(argv)
+    store = ObjectStore(args.store)
+
+    if args.command == "stats":
+        print(format_stats(store.stats()))
+        return 0
+
+    if args.command == "gc":
+        from publish_module import PUBLISH_LOCK, file_lock
+
+        with file_lock(PUBLISH_LOCK):
+            removed = store.gc(args.dry_run)
+        verb = "Would delete" if args.dry_run else "Deleted"
+        print(f"{verb} {removed['objects']} unreferenced object(s), "
+              f"{removed['bytes'] // 1024}KB")
+        return 0
+
+    try:
+        written = store.export_module(args.module, args.out_dir)
+    except StoreError as e:
+        print(f"Error: {e}")
+        return 3
+    for path in written:
+        print(f"[OK] {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
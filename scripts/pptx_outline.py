@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Source Presentation Outlines
+
+Extracts slide titles and body text from .pptx files using only zipfile
+and a streaming XML parser, for the per-slide outline in
+00_Context_Bundle.md. Results are cached on disk as JSON keyed by the
+file's SHA256 digest, so an unchanged deck is parsed once no matter how
+often modules are (re)initialized.
+
+Usage:
+    python pptx_outline.py "/path/to/source.pptx"
+    python pptx_outline.py deck.pptx --json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import NamedTuple
+from xml.etree.ElementTree import ParseError, iterparse
+
+from state_paths import CACHE_DIR
+from tracing import count, traced
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+OUTLINE_CACHE = Path(os.environ.get("OUTLINE_CACHE", CACHE_DIR / "outlines"))
+
+# Bump when extraction output changes, so stale cache entries are ignored
+EXTRACTOR_VERSION = 1
+
+# Outline formatting limits (per slide)
+MAX_BODY_LINES = 8
+MAX_LINE_CHARS = 160
+
+NS_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+NS_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+NS_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+TITLE_PLACEHOLDERS = {"title", "ctrTitle"}
+
+
+class SlideText(NamedTuple):
+    """Text of one slide: its title placeholder and other paragraphs."""
+    number: int
+    title: str
+    body: list[str]
+
+
+# =============================================================================
+# EXTRACTION
+# =============================================================================
+
+def slide_order(zf: zipfile.ZipFile) -> list[str]:
+    """Slide part names in presentation order."""
+    names = set(zf.namelist())
+    try:
+        targets = {}
+        with zf.open("ppt/_rels/presentation.xml.rels") as f:
+            for _, elem in iterparse(f):
+                if elem.tag == f"{NS_REL}Relationship":
+                    targets[elem.get("Id")] = posixpath.normpath(
+                        posixpath.join("ppt", elem.get("Target", "")))
+        order = []
+        with zf.open("ppt/presentation.xml") as f:
+            for _, elem in iterparse(f):
+                if elem.tag == f"{NS_P}sldId":
+                    target = targets.get(elem.get(f"{NS_R}id"))
+                    if target in names:
+                        order.append(target)
+        if order:
+            return order
+    except (KeyError, ParseError):
+        pass
+
+    # No usable presentation.xml: fall back to slideN numbering
+    slides = [n for n in names if re.fullmatch(r"ppt/slides/slide\d+\.xml", n)]
+    return sorted(slides, key=lambda n: int(re.search(r"(\d+)\.xml$", n).group(1)))
+
+
+def read_slide(zf: zipfile.ZipFile, part: str, number: int) -> SlideText:
+    """Stream one slide's XML, collecting paragraph text per shape."""
+    title_parts: list[str] = []
+    body: list[str] = []
+    is_title = False
+    paragraph: list[str] = []
+
+    with zf.open(part) as f:
+        for event, elem in iterparse(f, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                if tag == f"{NS_P}sp":
+                    is_title = False
+                elif tag == f"{NS_P}ph":
+                    is_title = elem.get("type") in TITLE_PLACEHOLDERS
+                elif tag == f"{NS_A}p":
+                    paragraph = []
+                continue
+
+            if tag == f"{NS_A}t" and elem.text:
+                paragraph.append(elem.text)
+            elif tag == f"{NS_A}br":
+                paragraph.append(" ")
+            elif tag == f"{NS_A}p":
+                text = " ".join("".join(paragraph).split())
+                if text:
+                    (title_parts if is_title else body).append(text)
+            elif tag == f"{NS_P}sp":
+                is_title = False
+                elem.clear()  # Keep memory flat on large decks
+
+    return SlideText(number, " ".join(title_parts), body)
+
+
+@traced("outline.extract")
+def extract_slides(path: Path) -> list[SlideText]:
+    """Parse every slide of a .pptx file (uncached)."""
+    with zipfile.ZipFile(path) as zf:
+        slides = [read_slide(zf, part, i) for i, part in enumerate(slide_order(zf), 1)]
+    count(files=1, bytes_read=path.stat().st_size)
+    return slides
+
+
+def file_digest(path: Path) -> str:
+    """SHA256 of a file, read in blocks."""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def load_slides(path: Path, cache_dir: Path = OUTLINE_CACHE) -> list[SlideText]:
+    """
+    Slides of a .pptx, from the digest-keyed cache when possible.
+
+    Raises zipfile.BadZipFile or ParseError for unreadable decks.
+    """
+    cache_path = cache_dir / f"{file_digest(path)}.json"
+    try:
+        cached = json.loads(cache_path.read_text(encoding='utf-8'))
+        if cached.get("version") == EXTRACTOR_VERSION:
+            return [SlideText(*s) for s in cached["slides"]]
+    except (OSError, ValueError, TypeError):
+        pass
+
+    slides = extract_slides(path)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, prefix=".outline-")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"version": EXTRACTOR_VERSION, "source": path.name,
+                       "slides": [list(s) for s in slides]}, f)
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass  # Cache is an optimization only
+    return slides
+
+
+# =============================================================================
+# FORMATTING
+# =============================================================================
+
+def shorten(text: str, limit: int = MAX_LINE_CHARS) -> str:
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+def format_outline(slides: list[SlideText]) -> str:
+    """Markdown outline: one heading per slide with its first body lines."""
+    lines = []
+    for slide in slides:
+        lines.append(f"### Slide {slide.number}: {shorten(slide.title) or '(untitled)'}")
+        for text in slide.body[:MAX_BODY_LINES]:
+            lines.append(f"- {shorten(text)}")
+        if len(slide.body) > MAX_BODY_LINES:
+            lines.append(f"- ... ({len(slide.body) - MAX_BODY_LINES} more)")
+        lines.append("")
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def source_outline(path: Path | None) -> str | None:
+    """Outline markdown for a source deck, or None if not a readable .pptx."""
+    if path is None or path.suffix.lower() != ".pptx":
+        return None
+    try:
+        slides = load_slides(path)
+    except (OSError, zipfile.BadZipFile, ParseError) as e:
+        print(f"WARNING: Cannot extract outline from {path.name}: {e}")
+        return None
+    return format_outline(slides) if slides else None
+
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Print the per-slide outline of a .pptx file",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python pptx_outline.py "/path/to/source.pptx"
+  python pptx_outline.py deck.pptx --json
+        """
+    )
+    parser.add_argument("file", type=Path, help=".pptx file")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Parse the file even if a cached outline exists")
+
+    args = parser.parse_args(argv)
+    if not args.file.exists():
+        print(f"Error: File not found: {args.file}")
+        return 3
+
+    try:
+        slides = extract_slides(args.file) if args.no_cache else load_slides(args.file)
+    except (zipfile.BadZipFile, ParseError) as e:
+        print(f"Error: Not a readable .pptx file: {e}")
+        return 1
+
+    if args.json:
+        print(json.dumps([s._asdict() for s in slides], indent=2))
+    else:
+        print(format_outline(slides), end="")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,21 +3,38 @@
 Curriculum Module Initialization Script
 
 Automates setup for curriculum rework projects. Creates folder structure,
-initializes changelog and context bundle.
+initializes changelog and context bundle, and scaffolds the brief, speaker
+notes and presentation templates with the module's details filled in.
 
 Usage:
     python project_init.py --course 2 --module 3 --title "Module Title"
     python project_init.py -c 2 -m 3 -t "Title" --duration 90
     python project_init.py -c 2 -m 3 -t "Title" --no-launch
     python project_init.py -c 2 -m 3 -t "Title" --print-only
+    python project_init.py -c 2 -m 3 -t "Title" --template brief --template qa
+    python project_init.py --manifest modules.yaml
 """
 
 import argparse
+import functools
+import html
 import os
+import re
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from typing import NamedTuple
+
+from module_scan import ModuleSnapshot, rework_order, scan_module
+from timing_model import BUFFER_MINUTES, MINUTES_PER_SLIDE, max_slides, presentation_minutes
+from tracing import enable as enable_tracing, span, traced
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 # =============================================================================
 # CONFIGURATION - Update these paths for your environment
@@ -35,10 +52,48 @@ STARTER_KIT_PATH = Path(os.environ.get(
     "/path/to/curriculum-dev-kit/templates"
 ))
 
-# Timing defaults
+# Timing defaults (buffer and pace live in timing_model)
 DEFAULT_DURATION = int(os.environ.get("DEFAULT_DURATION", 90))
-BUFFER_MINUTES = int(os.environ.get("BUFFER_MINUTES", 3))
-MINUTES_PER_SLIDE = 2.5
+
+# Concurrent folder/file creation for --manifest
+DEFAULT_JOBS = 8
+
+# Templates scaffolded into each new rework folder: kit file, file name
+# ({code} is the module code, e.g. C2M3)
+SCAFFOLD_TEMPLATES = {
+    "brief": ("02-presentation-brief.md", "02_Presentation_Brief.md"),
+    "notes": ("03-speaker-notes-spec.md", "03_Speaker_Notes.md"),
+    "presentation": ("presentation-template.html", "{code}_Presentation.html"),
+    "qa": ("06-qa-checklist.md", "06_QA_Checklist.md"),
+}
+DEFAULT_TEMPLATES = ["brief", "notes", "presentation"]
+
+# Template text replaced while scaffolding, and what replaces it. Fields:
+# course, module, title (title_html in HTML), duration, slides, date
+PLACEHOLDERS = {
+    # 02-presentation-brief.md
+    "{e.g., Course 2, Module 1: Introduction to Planning}": "Course {course}, Module {module}: {title}",
+    "{e.g., 90-minute synchronous online session}": "{duration}-minute synchronous online session",
+    "Total session time:           _____ minutes": "Total session time:           {duration} minutes",
+    "**Calculated Slide Budget:** _____ slides": "**Calculated Slide Budget:** {slides} slides",
+    "{Date}": "{date}",
+    # 03-speaker-notes-spec.md
+    "{Course Number}": "{course}",
+    "{Module Number}": "{module}",
+    "{Module Title}": "{title}",
+    "{Target time}": "{duration} minutes",
+    "{Slide count}": "{slides}",
+    # presentation-template.html
+    "<title>Course Title - Module Name</title>": "<title>Course {course} - {title_html}</title>",
+    "Main Presentation Title": "{title_html}",
+    "Subtitle or Module Name": "Module {module}",
+    "Course Name | Instructor Name | Date": "Course {course} | Instructor Name | {date}",
+    "Course Name | Module Name": "Course {course} | Module {module}: {title_html}",
+}
+PLACEHOLDER = re.compile("|".join(map(re.escape, sorted(PLACEHOLDERS, key=len, reverse=True))))
+
+# Linux ioctl cloning a file's extents (btrfs, XFS, bcachefs)
+FICLONE = 0x40049409
 
 
 # =============================================================================
@@ -47,8 +102,7 @@ MINUTES_PER_SLIDE = 2.5
 
 def calculate_max_slides(target_duration: int) -> int:
     """Calculate maximum slides given target session duration."""
-    available = target_duration - BUFFER_MINUTES
-    return round(available / MINUTES_PER_SLIDE)
+    return max_slides(target_duration, rounding="nearest")
 
 
 def get_current_month_year() -> tuple[str, int]:
@@ -57,25 +111,25 @@ def get_current_month_year() -> tuple[str, int]:
     return now.strftime("%B"), now.year
 
 
-def find_existing_reworks(module_path: Path) -> list[Path]:
-    """Find existing rework/remake folders."""
+@traced("init.discover")
+def find_existing_reworks(module_path: Path,
+                          snapshot: ModuleSnapshot | None = None) -> list[Path]:
+    """Find existing rework/remake folders, oldest first."""
     reworks = []
-    if module_path.exists():
-        for item in module_path.iterdir():
-            if item.is_dir():
-                name_lower = item.name.lower()
-                if "rework" in name_lower or "remake" in name_lower:
-                    reworks.append(item)
-    return sorted(reworks, key=lambda p: p.name)
+    snapshot = snapshot or scan_module(module_path, recursive=False)
+    for item in snapshot.subdirs:
+        name_lower = item.name.lower()
+        if "rework" in name_lower or "remake" in name_lower:
+            reworks.append(item)
+    return sorted(reworks, key=rework_order)
 
 
-def find_source_presentation(module_path: Path) -> tuple[Path | None, list[Path]]:
+@traced("init.discover")
+def find_source_presentation(module_path: Path,
+                             snapshot: ModuleSnapshot | None = None) -> tuple[Path | None, list[Path]]:
     """Find source presentation file in module folder."""
-    pptx_files = []
-    if module_path.exists():
-        for item in module_path.iterdir():
-            if item.is_file() and item.suffix.lower() in [".pptx", ".pdf"]:
-                pptx_files.append(item)
+    snapshot = snapshot or scan_module(module_path, recursive=False)
+    pptx_files = [f.path for f in snapshot.select([".pptx", ".pdf"])]
 
     if len(pptx_files) == 0:
         return None, []
@@ -89,7 +143,7 @@ def generate_changelog(course: int, module: int, title: str, duration: int,
                        source_file: Path | None, rework_folder: Path) -> str:
     """Generate the 00_Project_Changelog.md content."""
     max_slides = calculate_max_slides(duration)
-    available = duration - BUFFER_MINUTES
+    available = presentation_minutes(duration)
     today = datetime.now().strftime("%Y-%m-%d")
     source_str = str(source_file) if source_file else "Not specified"
 
@@ -129,14 +183,34 @@ def generate_changelog(course: int, module: int, title: str, duration: int,
 
 def generate_context_bundle(course: int, module: int, title: str, duration: int,
                             source_file: Path | None, rework_folder: Path,
-                            previous_rework: Path | None) -> str:
-    """Generate the 00_Context_Bundle.md content."""
+                            previous_rework: Path | None,
+                            outline: str | None = None,
+                            pack=None) -> str:
+    """
+    Generate the 00_Context_Bundle.md content.
+
+    outline is the source deck's per-slide outline (see pptx_outline.py);
+    pack is a context_budget.ContextPack of excerpts and token estimates.
+    """
     max_slides = calculate_max_slides(duration)
-    available = duration - BUFFER_MINUTES
+    available = presentation_minutes(duration)
     prev_str = str(previous_rework) if previous_rework else "None"
     source_str = str(source_file) if source_file else "Not specified"
 
     topic_outline = STARTER_KIT_PATH / "01-topic-outline-review.md"
+    outline_section = f"""
+## Source Outline
+
+Slide titles and text extracted from the source presentation:
+
+{outline}
+---
+""" if outline else ""
+    if pack is not None:
+        from context_budget import format_pack
+        pack_section = f"\n{format_pack(pack)}\n---\n"
+    else:
+        pack_section = ""
 
     return f"""# Context Bundle: {title}
 
@@ -156,7 +230,7 @@ Read these to begin Topic Outline Review:
 2. **Topic Outline Template:** {topic_outline}
 
 ---
-
+{outline_section}
 ## Timing Budget
 
 - Target session: {duration} minutes
@@ -165,7 +239,7 @@ Read these to begin Topic Outline Review:
 - At {MINUTES_PER_SLIDE} min/slide: **{max_slides} slides maximum**
 
 ---
-
+{pack_section}
 ## Starter Kit Location
 
 All templates: `{STARTER_KIT_PATH}`
@@ -181,17 +255,22 @@ All templates: `{STARTER_KIT_PATH}`
 
 
 def generate_prompt(course: int, module: int, title: str, duration: int,
-                    source_file: Path | None, rework_folder: Path) -> str:
+                    source_file: Path | None, rework_folder: Path,
+                    pack=None) -> str:
     """Generate the prompt for starting work."""
     max_slides = calculate_max_slides(duration)
     topic_outline = STARTER_KIT_PATH / "01-topic-outline-review.md"
     source_str = str(source_file) if source_file else "[specify source file]"
+    bundle_line = ""
+    if pack is not None:
+        bundle_line = (f"\n3. Context bundle (outline and excerpts, ~{pack.used:,} tokens): "
+                       f"{rework_folder / '00_Context_Bundle.md'}")
 
     return f"""I'm starting a rework of Course {course} Module {module}: {title}.
 
 Please read these files:
 1. Source presentation: {source_str}
-2. Topic Outline Template: {topic_outline}
+2. Topic Outline Template: {topic_outline}{bundle_line}
 
 Create a Topic Outline Review using the template. I need:
 - Section-by-section breakdown with slide numbers and content summaries
@@ -199,7 +278,7 @@ Create a Topic Outline Review using the template. I need:
 - Identified consolidation opportunities
 - Decision points for me to complete
 
-Target session length: {duration} minutes ({duration - BUFFER_MINUTES} usable, {max_slides} slides max)"""
+Target session length: {duration} minutes ({presentation_minutes(duration)} usable, {max_slides} slides max)"""
 
 
 def launch_claude_code(prompt: str, working_dir: Path,
@@ -233,6 +312,111 @@ def launch_claude_code(prompt: str, working_dir: Path,
         return False
 
 
+# =============================================================================
+# TEMPLATE SCAFFOLDING
+# =============================================================================
+
+@functools.lru_cache(maxsize=None)
+def read_template(path: Path, mtime_ns: int) -> str:
+    """Template text, read once per bulk run (mtime_ns keys out edits)."""
+    return path.read_text(encoding="utf-8")
+
+
+def clone_file(source: Path, target: Path) -> str:
+    """
+    Copy source to target, sharing its blocks where the filesystem can.
+
+    Tries a reflink (copy-on-write clone), then falls back to
+    shutil.copyfile, which streams in the kernel (sendfile) where
+    available. Hard links are never used: editing the copy in place would
+    edit the kit template. Returns "reflink" or "copy".
+    """
+    if fcntl is not None:
+        try:
+            with open(source, "rb") as src, open(target, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return "reflink"
+        except OSError:
+            pass  # Not supported here (ext4, tmpfs, across filesystems)
+    shutil.copyfile(source, target)
+    return "copy"
+
+
+def scaffold_templates(course: int, module: int, title: str, duration: int,
+                       rework_folder: Path,
+                       templates: list[str] | None = None) -> list[Path]:
+    """
+    Copy the chosen starter-kit templates into a rework folder.
+
+    Placeholders are filled in one pass over each template; templates with
+    nothing to fill are cloned. Files that already exist are left alone,
+    since they may hold work, and missing templates are skipped.
+    """
+    fields = {
+        "course": course, "module": module, "title": title, "title_html": html.escape(title),
+        "duration": duration, "slides": calculate_max_slides(duration),
+        "date": datetime.now().strftime("%Y-%m-%d"),
+    }
+    values = {text: value.format(**fields) for text, value in PLACEHOLDERS.items()}
+
+    written = []
+    for name in DEFAULT_TEMPLATES if templates is None else templates:
+        template, filename = SCAFFOLD_TEMPLATES[name]
+        source = STARTER_KIT_PATH / template
+        target = rework_folder / filename.format(code=f"C{course}M{module}")
+        try:
+            text = read_template(source, source.stat().st_mtime_ns)
+        except OSError:
+            continue
+        if target.exists():
+            continue
+        filled, replaced = PLACEHOLDER.subn(lambda m: values[m.group(0)], text)
+        with span("init.scaffold", template=name, filled=replaced):
+            if replaced:
+                target.write_text(filled, encoding="utf-8")
+            else:
+                clone_file(source, target)
+        written.append(target)
+    return written
+
+
+def write_project_files(course: int, module: int, title: str, duration: int,
+                        source_path: Path | None, rework_folder: Path,
+                        previous_rework: Path | None,
+                        token_budget: int | None = None,
+                        templates: list[str] | None = None) -> tuple[list[Path], object]:
+    """
+    Write the changelog and context bundle, and scaffold templates.
+
+    Returns (files written, context_budget.ContextPack of the bundle).
+    """
+    from context_budget import DEFAULT_TOKEN_BUDGET, build_context_pack
+    from pptx_outline import source_outline
+
+    topic_outline = STARTER_KIT_PATH / "01-topic-outline-review.md"
+    pack = build_context_pack(
+        [("Source presentation", source_path),
+         ("Topic outline template", topic_outline if topic_outline.exists() else None)],
+        source_outline(source_path), previous_rework,
+        topic_outline if topic_outline.exists() else None,
+        token_budget or DEFAULT_TOKEN_BUDGET,
+    )
+
+    changelog_path = rework_folder / "00_Project_Changelog.md"
+    changelog_path.write_text(generate_changelog(
+        course, module, title, duration, source_path, rework_folder
+    ), encoding="utf-8")
+
+    bundle_path = rework_folder / "00_Context_Bundle.md"
+    bundle_path.write_text(generate_context_bundle(
+        course, module, title, duration, source_path, rework_folder, previous_rework,
+        pack.outline, pack
+    ), encoding="utf-8")
+
+    scaffolded = scaffold_templates(course, module, title, duration, rework_folder, templates)
+    return [changelog_path, bundle_path, *scaffolded], pack
+
+
 # =============================================================================
 # MAIN FUNCTION
 # =============================================================================
@@ -242,7 +426,9 @@ def initialize_project(course: int, module: int, title: str,
                        force: bool = False,
                        source_file: str | None = None,
                        no_launch: bool = False,
-                       print_only: bool = False) -> bool:
+                       print_only: bool = False,
+                       token_budget: int | None = None,
+                       templates: list[str] | None = None) -> bool:
     """
     Main function to initialize a curriculum rework project.
 
@@ -313,25 +499,15 @@ def initialize_project(course: int, module: int, title: str,
     rework_folder.mkdir(parents=True, exist_ok=True)
     print(f"Created: {rework_folder}")
 
-    # Generate and write changelog
-    changelog_content = generate_changelog(
-        course, module, title, duration, source_path, rework_folder
-    )
-    changelog_path = rework_folder / "00_Project_Changelog.md"
-    changelog_path.write_text(changelog_content, encoding="utf-8")
-    print(f"Created: {changelog_path.name}")
-
-    # Generate and write context bundle
-    bundle_content = generate_context_bundle(
-        course, module, title, duration, source_path, rework_folder, previous_rework
-    )
-    bundle_path = rework_folder / "00_Context_Bundle.md"
-    bundle_path.write_text(bundle_content, encoding="utf-8")
-    print(f"Created: {bundle_path.name}")
+    paths, pack = write_project_files(course, module, title, duration, source_path,
+                                      rework_folder, previous_rework, token_budget,
+                                      templates)
+    for path in paths:
+        print(f"Created: {path.name}")
 
     # Generate prompt
     prompt = generate_prompt(
-        course, module, title, duration, source_path, rework_folder
+        course, module, title, duration, source_path, rework_folder, pack
     )
     max_slides = calculate_max_slides(duration)
 
@@ -343,6 +519,7 @@ def initialize_project(course: int, module: int, title: str,
     print(f"Rework folder: {rework_folder}")
     print(f"Source: {source_path.name if source_path else 'Not specified'}")
     print(f"Target: {duration} min / {max_slides} slides max")
+    print(f"Context: ~{pack.used:,} of {pack.budget:,} tokens packed into the bundle")
     print(divider)
 
     # Handle output mode
@@ -363,12 +540,185 @@ def initialize_project(course: int, module: int, title: str,
     return True
 
 
+# =============================================================================
+# BULK INITIALIZATION (--manifest)
+# =============================================================================
+
+class InitPlan(NamedTuple):
+    """One validated manifest entry, ready to be created."""
+    course: int
+    module: int
+    title: str
+    duration: int
+    source_path: Path | None
+    rework_folder: Path
+    previous_rework: Path | None
+
+
+def load_init_manifest(manifest_path: Path) -> list[dict]:
+    """
+    Read a manifest: a list of entries, or a mapping with a `modules` list.
+
+    Each entry has course, module and title, plus optional duration and
+    source (a filename in the module folder, as with --source).
+    """
+    from yaml_compat import safe_load
+
+    data = safe_load(manifest_path.read_text(encoding="utf-8"))
+    if isinstance(data, dict):
+        data = data.get("modules")
+    if not isinstance(data, list):
+        raise ValueError("manifest must be a list of modules or have a 'modules' list")
+    return data
+
+
+def plan_manifest(entries: list[dict], force: bool = False) -> tuple[list[InitPlan], list[str]]:
+    """
+    Validate every entry against one scan of the course tree.
+
+    Each course and module folder is listed at most once however many
+    entries share it. Returns (plans, errors).
+    """
+    month, year = get_current_month_year()
+    rework_name = f"{month} {year} ReWork"
+    snapshots: dict[Path, ModuleSnapshot] = {}
+
+    def listing(folder: Path) -> ModuleSnapshot:
+        if folder not in snapshots:
+            snapshots[folder] = scan_module(folder, recursive=False)
+        return snapshots[folder]
+
+    plans = []
+    errors = []
+    seen = set()
+    course_names = {d.name for d in listing(BASE_COURSE_PATH).subdirs}
+
+    for i, entry in enumerate(entries, 1):
+        where = f"Entry {i}"
+        try:
+            course = int(entry["course"])
+            module = int(entry["module"])
+            title = str(entry["title"])
+            duration = int(entry.get("duration", DEFAULT_DURATION))
+        except (KeyError, TypeError, ValueError) as e:
+            errors.append(f"{where}: needs course, module and title ({e})")
+            continue
+
+        where = f"Entry {i} (Course {course} Module {module})"
+        if (course, module) in seen:
+            errors.append(f"{where}: listed more than once")
+            continue
+        seen.add((course, module))
+
+        if f"Course {course}" not in course_names:
+            errors.append(f"{where}: course folder not found")
+            continue
+        course_folder = BASE_COURSE_PATH / f"Course {course}"
+        module_folder = course_folder / f"Module {module}"
+        if module_folder not in listing(course_folder).subdirs:
+            errors.append(f"{where}: module folder not found")
+            continue
+
+        snapshot = listing(module_folder)
+        rework_folder = module_folder / rework_name
+        if snapshot.exists(rework_name) and not force:
+            errors.append(f"{where}: rework folder already exists (use --force)")
+            continue
+
+        if entry.get("source"):
+            source_path = module_folder / entry["source"]
+            if not snapshot.exists(entry["source"]):
+                errors.append(f"{where}: source file not found: {entry['source']}")
+                continue
+        else:
+            source_path, all_sources = find_source_presentation(module_folder, snapshot)
+            if source_path is None and len(all_sources) > 1:
+                names = ", ".join(f.name for f in all_sources)
+                errors.append(f"{where}: multiple source files, set 'source' ({names})")
+                continue
+
+        existing_reworks = find_existing_reworks(module_folder, snapshot)
+        previous_rework = None
+        if existing_reworks and existing_reworks[-1] != rework_folder:
+            previous_rework = existing_reworks[-1]
+
+        plans.append(InitPlan(course, module, title, duration, source_path,
+                              rework_folder, previous_rework))
+
+    return plans, errors
+
+
+def create_from_plan(plan: InitPlan, token_budget: int | None = None,
+                     templates: list[str] | None = None) -> int:
+    """Create one rework folder and its generated files; returns packed tokens."""
+    with span("init.create", course=plan.course, module=plan.module):
+        plan.rework_folder.mkdir(parents=True, exist_ok=True)
+        _, pack = write_project_files(plan.course, plan.module, plan.title, plan.duration,
+                                      plan.source_path, plan.rework_folder,
+                                      plan.previous_rework, token_budget, templates)
+    return pack.used
+
+
+def initialize_from_manifest(manifest_path: Path, force: bool = False,
+                             jobs: int = DEFAULT_JOBS,
+                             token_budget: int | None = None,
+                             templates: list[str] | None = None) -> bool:
+    """
+    Initialize every module listed in a manifest, without launching anything.
+
+    Nothing is created unless every entry validates. Returns True on success.
+    """
+    try:
+        entries = load_init_manifest(manifest_path)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: Cannot read manifest {manifest_path}: {e}")
+        return False
+
+    if not BASE_COURSE_PATH.is_dir():
+        print(f"ERROR: Course base path not found: {BASE_COURSE_PATH}")
+        return False
+
+    plans, errors = plan_manifest(entries, force)
+    if errors:
+        print(f"ERROR: {len(errors)} of {len(entries)} manifest entries are invalid; "
+              "nothing was created.")
+        for err in errors:
+            print(f"  {err}")
+        return False
+
+    failures = {}
+    tokens = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = {pool.submit(create_from_plan, plan, token_budget, templates): plan for plan in plans}
+        for future, plan in futures.items():
+            try:
+                tokens[plan] = future.result()
+            except OSError as e:
+                failures[plan] = str(e)
+
+    divider = "=" * 60
+    print(divider)
+    print(f"PROJECTS INITIALIZED: {len(plans) - len(failures)} of {len(plans)}")
+    print(divider)
+    for plan in plans:
+        status = f"FAILED: {failures[plan]}" if plan in failures else f"OK (~{tokens[plan]:,} tokens)"
+        source = plan.source_path.name if plan.source_path else "no source"
+        print(f"C{plan.course}M{plan.module:<3} {plan.duration:>3} min / "
+              f"{calculate_max_slides(plan.duration):>2} slides  {source:<30} {status}")
+    print(divider)
+    if plans:
+        print(f"Rework folder name: {plans[0].rework_folder.name}")
+
+    return not failures
+
+
 # =============================================================================
 # COMMAND LINE INTERFACE
 # =============================================================================
 
-def main():
+def main(argv: list[str] | None = None, prog: str | None = None):
     parser = argparse.ArgumentParser(
+        prog=prog,
         description="Initialize a curriculum rework project",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
@@ -376,14 +726,20 @@ Examples:
   python project_init.py -c 4 -m 5 -t "Effective Communication"
   python project_init.py --course 4 --module 5 --title "Title" --duration 90
   python project_init.py -c 4 -m 5 -t "Title" --source "specific_file.pptx"
+  python project_init.py --manifest modules.yaml --jobs 4
+
+Manifest format (modules.yaml):
+  modules:
+    - {course: 4, module: 5, title: "Effective Communication"}
+    - {course: 4, module: 6, title: "Feedback", duration: 60, source: "m6.pptx"}
         """
     )
 
-    parser.add_argument("-c", "--course", type=int, required=True,
+    parser.add_argument("-c", "--course", type=int,
                         help="Course number")
-    parser.add_argument("-m", "--module", type=int, required=True,
+    parser.add_argument("-m", "--module", type=int,
                         help="Module number")
-    parser.add_argument("-t", "--title", type=str, required=True,
+    parser.add_argument("-t", "--title", type=str,
                         help="Module title")
     parser.add_argument("-d", "--duration", type=int, default=DEFAULT_DURATION,
                         help=f"Target duration in minutes (default: {DEFAULT_DURATION})")
@@ -395,19 +751,48 @@ Examples:
                         help="Don't launch editor, just create files")
     parser.add_argument("--print-only", action="store_true",
                         help="Print prompt instead of launching")
-
-    args = parser.parse_args()
-
-    success = initialize_project(
-        course=args.course,
-        module=args.module,
-        title=args.title,
-        duration=args.duration,
-        force=args.force,
-        source_file=args.source,
-        no_launch=args.no_launch,
-        print_only=args.print_only
-    )
+    parser.add_argument("--manifest", type=Path,
+                        help="YAML list of modules to initialize in bulk (never launches)")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS,
+                        help=f"Parallel folder creation with --manifest (default: {DEFAULT_JOBS})")
+    parser.add_argument("--token-budget", type=int, default=None,
+                        help="Tokens of outline/excerpts to pack into the context bundle "
+                             "(default: CONTEXT_TOKEN_BUDGET or 6000)")
+    parser.add_argument("--template", action="append", choices=list(SCAFFOLD_TEMPLATES),
+                        help="Template to scaffold into the rework folder, repeatable "
+                             f"(default: {', '.join(DEFAULT_TEMPLATES)})")
+    parser.add_argument("--no-templates", action="store_true",
+                        help="Don't scaffold any templates")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Append per-step timings to FILE as JSONL")
+
+    args = parser.parse_args(argv)
+    if args.trace:
+        enable_tracing(args.trace)
+    templates = [] if args.no_templates else args.template
+
+    if args.manifest:
+        with span("project_init.manifest", manifest=str(args.manifest)):
+            success = initialize_from_manifest(args.manifest, args.force, args.jobs,
+                                               args.token_budget, templates)
+        return 0 if success else 1
+
+    if args.course is None or args.module is None or args.title is None:
+        parser.error("--course, --module and --title are required (or use --manifest)")
+
+    with span("project_init", course=args.course, module=args.module):
+        success = initialize_project(
+            course=args.course,
+            module=args.module,
+            title=args.title,
+            duration=args.duration,
+            force=args.force,
+            source_file=args.source,
+            no_launch=args.no_launch,
+            print_only=args.print_only,
+            token_budget=args.token_budget,
+            templates=templates
+        )
 
     return 0 if success else 1
 
@@ -21,6 +21,7 @@ Usage:
 """
 
 import argparse
+import difflib
 import hashlib
 import json
 import os
@@ -29,10 +30,21 @@ import shutil
 import subprocess
 import sys
 import time
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 from pathlib import Path
+from typing import Callable, Iterable, NamedTuple
 
-import yaml
+from module_scan import ModuleSnapshot, ScannedFile, rework_order, scan_module
+from state_paths import state_dir
+from tracing import count, enable as enable_tracing, span, traced
+from yaml_compat import safe_load
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 # Configuration
 WORKSPACE_ROOT = Path(os.environ.get("WORKSPACE_ROOT", "."))
@@ -42,10 +54,19 @@ ONEDRIVE_BASE = Path(os.environ.get("COURSE_BASE_PATH", "."))
 # File extensions to include in hashing and copying
 INCLUDE_EXTENSIONS = {'.html', '.md', '.yaml', '.yml', '.txt'}
 
+# Units the search index stores: one per slide, one per Markdown section
+SLIDE_START = re.compile(r'<div\s+class="slide[\s"]', re.IGNORECASE)
+MARKDOWN_HEADING = re.compile(r'^#{1,3}\s+(.+)$', re.MULTILINE)
+
 # Retry settings for cloud-synced file locking
 MAX_RETRIES = 3
 RETRY_DELAY = 2  # seconds
 
+# Held while publishing, so concurrent runs (and the publish_queue.py worker)
+# on one workspace take turns with the git index and the source markers
+PUBLISH_LOCK = Path(os.environ.get("PUBLISH_LOCK", state_dir(WORKSPACE_ROOT) / "publish.lock"))
+LOCK_POLL = 0.2  # seconds
+
 
 def log(message: str, status: str = "INFO") -> None:
     """Print formatted log message."""
@@ -60,46 +81,152 @@ def log(message: str, status: str = "INFO") -> None:
     print(f"{symbol} {message}")
 
 
-def read_file_with_retry(path: Path) -> str:
+def try_lock(fd: int) -> bool:
+    """Take an exclusive advisory lock on fd without waiting."""
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+@contextmanager
+def file_lock(path: Path, blocking: bool = True, on_wait: Callable[[], None] | None = None):
+    """
+    Hold an advisory lock on path for the with block; yields whether it is held.
+
+    With blocking=False yields False at once if another process holds the
+    lock; otherwise on_wait is called once and the lock is polled until
+    free. The lock is released on exit, or by the OS if the process dies.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        held = try_lock(fd)
+        if not held and blocking:
+            if on_wait:
+                on_wait()
+            while not held:
+                time.sleep(LOCK_POLL)
+                held = try_lock(fd)
+        yield held
+    finally:
+        os.close(fd)  # Closing releases the lock
+
+
+def read_file_with_retry(path: Path, binary: bool = False) -> str | bytes:
     """Read file with retry logic for cloud-synced file locks."""
     for attempt in range(MAX_RETRIES):
         try:
-            return path.read_text(encoding='utf-8')
+            return path.read_bytes() if binary else path.read_text(encoding='utf-8')
         except PermissionError:
             if attempt < MAX_RETRIES - 1:
+                count(retries=1)
                 log(f"File locked, retrying in {RETRY_DELAY}s... ({path.name})", "WARN")
                 time.sleep(RETRY_DELAY)
             else:
                 raise
 
 
-def calculate_content_hash(folder: Path) -> str:
-    """Calculate deterministic SHA256 hash of folder contents."""
-    hasher = hashlib.sha256()
+def hash_contents(items: Iterable[tuple[str, str | None]]) -> str:
+    """
+    Hash (relative path, text) pairs in the given order.
 
-    # Get files sorted alphabetically for determinism
-    files = sorted([
-        f for f in folder.rglob('*')
-        if f.is_file() and f.suffix.lower() in INCLUDE_EXTENSIONS
-        and not f.name.startswith('_')  # Exclude marker files
-    ])
+    Text of None (unreadable file) contributes only its path.
+    """
+    hasher = hashlib.sha256()
 
-    for file_path in files:
+    for rel_path, content in items:
         # Add relative path to hash
-        rel_path = file_path.relative_to(folder)
-        hasher.update(str(rel_path).encode('utf-8'))
+        hasher.update(rel_path.encode('utf-8'))
 
         # Add normalized content
-        try:
-            content = read_file_with_retry(file_path)
+        if content is not None:
             content = content.replace('\r\n', '\n').strip()
-            hasher.update(content.encode('utf-8'))
-        except Exception as e:
-            log(f"Cannot read {file_path.name}: {e}", "WARN")
+            hasher.update(content.encode('utf-8', errors='surrogateescape'))
+
+    return f"sha256:{hasher.hexdigest()}"
+
+
+@traced("publish.hash")
+def calculate_content_hash(folder: Path, snapshot: ModuleSnapshot | None = None) -> str:
+    """Calculate deterministic SHA256 hash of folder contents."""
+    snapshot = snapshot or scan_module(folder)
 
+    # Snapshot files are sorted by path components for determinism;
+    # marker files (leading underscore) are excluded
+    files = snapshot.select(INCLUDE_EXTENSIONS, skip_markers=True)
+
+    def contents():
+        for entry in files:
+            try:
+                yield entry.rel_path, read_file_with_retry(entry.path)
+                count(files=1, bytes_read=entry.size)
+            except Exception as e:
+                log(f"Cannot read {entry.name}: {e}", "WARN")
+                yield entry.rel_path, None
+
+    return hash_contents(contents())
+
+
+@traced("publish.source_hash")
+def calculate_source_hash(snapshot: ModuleSnapshot, optimize: bool = False) -> str:
+    """
+    Hash of exactly what a publish would take from the source folder.
+
+    Covers the raw bytes of the top-level files that get copied, plus the
+    --optimize setting since it changes the published HTML.
+    """
+    hasher = hashlib.sha256(f"optimize={optimize}\n".encode('utf-8'))
+    for entry in snapshot.select(INCLUDE_EXTENSIONS, top_level=True, skip_markers=True):
+        data = read_file_with_retry(entry.path, binary=True)
+        count(files=1, bytes_read=len(data))
+        hasher.update(f"{entry.name}\0{len(data)}\0".encode('utf-8'))
+        hasher.update(data)
     return f"sha256:{hasher.hexdigest()}"
 
 
+def is_up_to_date(source_path: Path, source_snapshot: ModuleSnapshot, source_hash: str,
+                  dest_exists: bool, current_hash: Callable[[], str],
+                  dest_path: Path | None = None) -> bool:
+    """
+    True when the last publish already holds this exact source.
+
+    Requires the marker's Source Hash to match the current source, the
+    destination to still hash to the marker's Content Hash and, given
+    dest_path, that publish to have reached the branch (see marker_landed).
+    """
+    marker_path = source_path / "_GIT_PUBLISHED.md"
+    if not dest_exists or not source_snapshot.exists(marker_path.name):
+        return False
+    marker = parse_marker(marker_path)
+    if marker.get("Source Hash") != source_hash or "Content Hash" not in marker:
+        return False
+    if current_hash() != marker["Content Hash"]:
+        return False
+    return dest_path is None or marker_landed(marker, dest_path)
+
+
+def marker_landed(marker: dict[str, str], dest_path: Path) -> bool:
+    """
+    True if the marker's publish is in the workspace branch.
+
+    A Git Commit id must be HEAD or an ancestor of it; for other values
+    ("unchanged", from a publish with nothing new to commit) dest_path must
+    be tracked with no uncommitted changes.
+    """
+    from git_backend import commit_on_branch, path_committed
+
+    commit = marker.get("Git Commit", "")
+    if re.fullmatch(r'[0-9a-f]{7,40}', commit):
+        return commit_on_branch(WORKSPACE_ROOT, commit)
+    return path_committed(WORKSPACE_ROOT, dest_path)
+
+
+@traced("publish.discover")
 def discover_source_path(module_code: str) -> Path | None:
     """
     Discover source path based on module code.
@@ -119,23 +246,21 @@ def discover_source_path(module_code: str) -> Path | None:
         if not year_path.exists():
             continue
 
-        # Look for course folder
-        course_pattern = f"Course {course_num}"
+        # Look for course folder ("Course 1" must not match "Course 10")
+        course_pattern = re.compile(rf'\bCourse {course_num}(?!\d)')
         for course_folder in year_path.iterdir():
-            if course_folder.is_dir() and course_pattern in course_folder.name:
+            if course_folder.is_dir() and course_pattern.search(course_folder.name):
                 # Look for module folder
-                module_pattern = f"Module {module_num}"
+                module_pattern = re.compile(rf'\bModule {module_num}(?!\d)')
                 for module_folder in course_folder.iterdir():
-                    if module_folder.is_dir() and module_pattern in module_folder.name:
+                    if module_folder.is_dir() and module_pattern.search(module_folder.name):
                         # Look for ReWork folder (most recent month)
                         rework_folders = [
                             f for f in module_folder.iterdir()
                             if f.is_dir() and "ReWork" in f.name
                         ]
                         if rework_folders:
-                            # Sort by name to get most recent
-                            rework_folders.sort(key=lambda x: x.name, reverse=True)
-                            return rework_folders[0]
+                            return max(rework_folders, key=rework_order)
 
     return None
 
@@ -152,27 +277,56 @@ def get_dest_path(module_code: str) -> Path:
     return COURSES_ROOT / "google-pm" / f"c{course_num}" / f"m{module_num}"
 
 
-def extract_hash_from_marker(marker_path: Path) -> str | None:
-    """Extract content hash from _GIT_PUBLISHED.md marker file."""
+def parse_marker(marker_path: Path) -> dict[str, str]:
+    """
+    Read the "- **Field:** value" lines of a _GIT_PUBLISHED.md marker.
+
+    Returns an empty dict if the marker is missing or unreadable.
+    """
     try:
         content = read_file_with_retry(marker_path)
-        match = re.search(r'Content Hash:\s*(\S+)', content)
-        if match:
-            return match.group(1)
     except Exception:
-        pass
-    return None
+        return {}
+    return {
+        m.group(1).strip(): m.group(2).strip()
+        for m in re.finditer(r'^-?\s*\**([A-Za-z ]+?):\**\s*(\S.*)$', content, re.MULTILINE)
+    }
+
 
+def extract_hash_from_marker(marker_path: Path) -> str | None:
+    """Extract content hash from _GIT_PUBLISHED.md marker file."""
+    return parse_marker(marker_path).get("Content Hash")
 
-def check_publish_safety(source_path: Path, dest_path: Path) -> tuple[bool, str]:
+
+def check_publish_safety(source_path: Path, dest_path: Path,
+                         source_snapshot: ModuleSnapshot | None = None,
+                         dest_snapshot: ModuleSnapshot | None = None) -> tuple[bool, str]:
     """
     Check if it's safe to publish.
 
     Returns (safe: bool, reason: str)
     """
+    dest_snapshot = dest_snapshot or scan_module(dest_path)
+    return compare_with_marker(
+        source_path, not dest_snapshot.is_empty,
+        lambda: calculate_content_hash(dest_path, dest_snapshot),
+        source_snapshot,
+    )
+
+
+@traced("publish.safety")
+def compare_with_marker(source_path: Path, dest_exists: bool,
+                        current_hash: Callable[[], str],
+                        source_snapshot: ModuleSnapshot | None = None) -> tuple[bool, str]:
+    """
+    Compare the published content's hash with the one stored in the marker.
+
+    current_hash is only called when a marker exists, so an expensive hash
+    is skipped for first-time publishes.
+    """
+    source_snapshot = source_snapshot or scan_module(source_path, recursive=False)
     marker_path = source_path / "_GIT_PUBLISHED.md"
-    marker_exists = marker_path.exists()
-    dest_exists = dest_path.exists() and any(dest_path.iterdir())
+    marker_exists = source_snapshot.exists(marker_path.name)
 
     if not dest_exists:
         return True, "First-time publish to empty destination"
@@ -182,7 +336,7 @@ def check_publish_safety(source_path: Path, dest_path: Path) -> tuple[bool, str]
         if stored_hash is None:
             return False, "Marker file exists but hash is missing/corrupted"
 
-        git_hash = calculate_content_hash(dest_path)
+        git_hash = current_hash()
 
         if git_hash == stored_hash:
             return True, "Destination unchanged since last publish"
@@ -192,32 +346,233 @@ def check_publish_safety(source_path: Path, dest_path: Path) -> tuple[bool, str]
         return False, "Destination exists but no publish marker found (orphaned or manual edit?)"
 
 
-def copy_module_files(source_path: Path, dest_path: Path, dry_run: bool = False) -> list[str]:
+def read_publish_content(entry: ScannedFile, optimize: bool = False) -> bytes:
+    """
+    Bytes to publish for a source file.
+
+    With optimize=True, HTML is minified by html_optimize and the per-file
+    savings are logged; other files are published as-is.
+    """
+    if optimize and entry.suffix.lower() == '.html':
+        from html_optimize import format_savings, optimize_html
+        with span("publish.optimize", file=entry.name):
+            result = optimize_html(read_file_with_retry(entry.path))
+            count(files=1, bytes_read=entry.size)
+        log(format_savings(entry.name, result), "INFO")
+        return result.text.encode('utf-8')
+    count(files=1, bytes_read=entry.size)
+    return read_file_with_retry(entry.path, binary=True)
+
+
+@traced("publish.copy")
+def copy_module_files(source_path: Path, dest_path: Path, dry_run: bool = False,
+                      snapshot: ModuleSnapshot | None = None,
+                      optimize: bool = False) -> list[str]:
     """Copy module files from source to destination."""
     copied = []
+    snapshot = snapshot or scan_module(source_path)
 
     # Create destination if needed
     if not dry_run:
         dest_path.mkdir(parents=True, exist_ok=True)
-
-    # Copy files with included extensions
-    for file_path in source_path.iterdir():
-        if file_path.is_file() and file_path.suffix.lower() in INCLUDE_EXTENSIONS:
-            if not file_path.name.startswith('_'):  # Skip marker files
-                dest_file = dest_path / file_path.name
-                if dry_run:
-                    status = "update" if dest_file.exists() else "new"
-                    copied.append(f"+ {file_path.name} ({status})")
-                else:
-                    shutil.copy2(file_path, dest_file)
-                    copied.append(file_path.name)
+        dest_snapshot = None
+    else:
+        dest_snapshot = scan_module(dest_path, recursive=False)
+
+    # Copy top-level files with included extensions, skipping marker files
+    for entry in snapshot.select(INCLUDE_EXTENSIONS, top_level=True, skip_markers=True):
+        if dry_run:
+            if optimize:
+                read_publish_content(entry, optimize)
+            status = "update" if dest_snapshot.exists(entry.name) else "new"
+            copied.append(f"+ {entry.name} ({status})")
+        elif optimize and entry.suffix.lower() == '.html':
+            (dest_path / entry.name).write_bytes(read_publish_content(entry, optimize))
+            copied.append(entry.name)
+        else:
+            shutil.copy2(entry.path, dest_path / entry.name)
+            count(files=1, bytes_read=entry.size)
+            copied.append(entry.name)
 
     return copied
 
 
-def create_marker_file(source_path: Path, dest_path: Path, commit_hash: str = "pending") -> None:
+@traced("publish.store")
+def store_module_files(source_path: Path, module_code: str, object_store,
+                       dry_run: bool = False,
+                       snapshot: ModuleSnapshot | None = None,
+                       optimize: bool = False) -> list[str]:
+    """Write module files into the content-addressed store instead of copying."""
+    snapshot = snapshot or scan_module(source_path)
+    entries = snapshot.select(INCLUDE_EXTENSIONS, top_level=True, skip_markers=True)
+
+    if dry_run:
+        if optimize:
+            for entry in entries:
+                read_publish_content(entry, optimize)
+        manifest = object_store.load_manifest(module_code) or {"files": {}}
+        return [
+            f"+ {e.name} ({'update' if e.name in manifest['files'] else 'new'})"
+            for e in entries
+        ]
+
+    files = {e.name: read_publish_content(e, optimize) for e in entries}
+    result = object_store.put_module(module_code, files)
+    log(f"Stored {result['new_bytes'] // 1024}KB new of {result['bytes'] // 1024}KB", "INFO")
+    # Blocks only the previous version used; the commit picks up the deletions
+    removed = object_store.gc()
+    if removed["objects"]:
+        log(f"Removed {removed['objects']} unreferenced object(s), "
+            f"{removed['bytes'] // 1024}KB", "INFO")
+    return list(files)
+
+
+@traced("publish.hash")
+def store_content_hash(object_store, module_code: str) -> str:
+    """Content hash of a stored module, identical to hashing its exported files."""
+    files = object_store.read_module(module_code)
+    return hash_contents(
+        # Same newline translation as read_file_with_retry's text mode
+        (name, data.decode('utf-8', errors='surrogateescape')
+         .replace('\r\n', '\n').replace('\r', '\n'))
+        for name, data in sorted(files.items())
+    )
+
+
+# =============================================================================
+# PUBLISH PLAN (--dry-run)
+# =============================================================================
+
+class FileChange(NamedTuple):
+    """How one published file would change; old/new are None when absent."""
+    name: str
+    status: str  # unchanged, modified, new, deleted, stale
+    old: bytes | None
+    new: bytes | None
+
+    @property
+    def delta(self) -> int:
+        return len(self.new or b"") - len(self.old or b"")
+
+
+def split_index_chunks(name: str, text: str) -> dict[str, str]:
+    """
+    Split a published file into index units: label -> text.
+
+    HTML is split per slide, Markdown per heading (levels 1-3); other files
+    are a single unit.
+    """
+    if name.endswith('.html'):
+        starts = [m.start() for m in SLIDE_START.finditer(text)]
+        return {f"{name} slide {i + 1}": text[start:end]
+                for i, (start, end) in enumerate(zip(starts, starts[1:] + [len(text)]))}
+    if name.endswith('.md'):
+        matches = list(MARKDOWN_HEADING.finditer(text))
+        chunks = {f"{name} (preamble)": text[:matches[0].start()]} if matches else {name: text}
+        for i, match in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+            label = f"{name} \"{match.group(1).strip()}\""
+            if label in chunks:  # Repeated heading
+                label = f"{label} #{sum(k.startswith(label) for k in chunks) + 1}"
+            chunks[label] = text[match.start():end]
+        return {label: chunk for label, chunk in chunks.items() if chunk.strip()}
+    return {name: text}
+
+
+def read_published_files(module_code: str, dest_snapshot: ModuleSnapshot | None,
+                         object_store=None) -> dict[str, bytes]:
+    """Currently published files of a module (empty on first publish)."""
+    if object_store:
+        from object_store import StoreError
+        try:
+            return object_store.read_module(module_code)
+        except StoreError:
+            return {}
+    return {
+        e.name: read_file_with_retry(e.path, binary=True)
+        for e in dest_snapshot.select(INCLUDE_EXTENSIONS, top_level=True, skip_markers=True)
+    }
+
+
+@traced("publish.plan")
+def plan_file_changes(source_snapshot: ModuleSnapshot, published: dict[str, bytes],
+                      optimize: bool = False, removes_stale: bool = False) -> list[FileChange]:
+    """
+    Compare what would be published with what is published now.
+
+    Files only in the destination are "deleted" when the publish mode
+    replaces the whole module (object store) and "stale" when plain copies
+    would leave them in place.
+    """
+    changes = []
+    seen = set()
+    for entry in source_snapshot.select(INCLUDE_EXTENSIONS, top_level=True, skip_markers=True):
+        new = read_publish_content(entry, optimize)
+        old = published.get(entry.name)
+        seen.add(entry.name)
+        if old is None:
+            status = "new"
+        elif old == new:
+            status = "unchanged"
+        else:
+            status = "modified"
+        changes.append(FileChange(entry.name, status, old, new))
+
+    for name in sorted(published.keys() - seen):
+        changes.append(FileChange(name, "deleted" if removes_stale else "stale",
+                                  published[name], None))
+    return changes
+
+
+def changed_index_chunks(changes: list[FileChange]) -> list[str]:
+    """Labels of index units that are new, edited or removed by the plan."""
+    labels = []
+    for change in changes:
+        if change.status in ("unchanged", "stale"):
+            continue
+        old = split_index_chunks(change.name, (change.old or b"").decode('utf-8', 'replace'))
+        new = split_index_chunks(change.name, (change.new or b"").decode('utf-8', 'replace'))
+        labels.extend(label for label, text in new.items() if old.get(label) != text)
+        labels.extend(f"{label} (removed)" for label in old if label not in new)
+    return labels
+
+
+def format_bytes(size: int) -> str:
+    return f"{size // 1024}KB" if abs(size) >= 1024 else f"{size} B"
+
+
+def print_plan(changes: list[FileChange], show_diff: bool = False) -> None:
+    """Per-file plan lines, optionally followed by unified diffs."""
+    symbols = {"unchanged": "=", "modified": "~", "new": "+", "deleted": "-", "stale": "?"}
+    for change in changes:
+        if change.status == "modified":
+            detail = (f"{format_bytes(len(change.old))} -> {format_bytes(len(change.new))}, "
+                      f"{change.delta:+,} B")
+        elif change.status == "stale":
+            detail = "only in destination, kept"
+        else:
+            detail = format_bytes(len(change.new if change.new is not None else change.old))
+        log(f"{symbols[change.status]} {change.name} ({change.status}, {detail})", "DRY")
+
+        if show_diff and change.status in ("modified", "new", "deleted"):
+            old = (change.old or b"").decode('utf-8', 'replace').splitlines(keepends=True)
+            new = (change.new or b"").decode('utf-8', 'replace').splitlines(keepends=True)
+            diff = difflib.unified_diff(old, new, f"published/{change.name}", f"source/{change.name}")
+            sys.stdout.writelines(line if line.endswith('\n') else line + '\n' for line in diff)
+
+    changed = [c for c in changes if c.status in ("modified", "new", "deleted")]
+    net = sum(c.delta for c in changed)
+    log(f"{len(changed)} changed, {len(changes) - len(changed)} unchanged/kept, "
+        f"net {net:+,} B", "DRY")
+
+
+@traced("publish.marker")
+def create_marker_file(source_path: Path, dest_path: Path, commit_hash: str = "pending",
+                       content_hash: str | None = None,
+                       module_code: str | None = None,
+                       source_hash: str | None = None) -> None:
     """Create _GIT_PUBLISHED.md marker file in source directory."""
-    content_hash = calculate_content_hash(dest_path)
+    content_hash = content_hash or calculate_content_hash(dest_path)
 
     marker_content = f"""# Published to Git Repository
 
@@ -225,66 +580,50 @@ def create_marker_file(source_path: Path, dest_path: Path, commit_hash: str = "p
 - **Git Path:** {dest_path.relative_to(WORKSPACE_ROOT)}
 - **Git Commit:** {commit_hash}
 - **Content Hash:** {content_hash}
+- **Source Hash:** {source_hash or "unknown"}
 
 ---
 
 *This file marks this module as published. Do not delete.*
-*If you edit this module, republish using: `python publish_module.py {dest_path.name.upper()}`*
+*If you edit this module, republish using: `python publish_module.py {module_code or dest_path.name.upper()}`*
 """
 
     marker_path = source_path / "_GIT_PUBLISHED.md"
     marker_path.write_text(marker_content, encoding='utf-8')
 
 
-def git_commit(dest_path: Path, module_code: str, module_title: str, is_first: bool) -> tuple[bool, str]:
-    """Create git commit for the published module."""
+@traced("publish.git")
+def git_commit(dest_path: Path | list[Path], module_code: str, module_title: str,
+               is_first: bool, git=None) -> tuple[bool, str]:
+    """
+    Create git commit for the published module.
+
+    dest_path is the published folder, or with --store the exact files the
+    publish wrote or deleted. git is an open git_backend session shared by
+    batch callers; without one a per-call backend is used (GIT_BACKEND,
+    subprocess by default).
+    """
+    from git_backend import GitError, open_backend
+
     action = "Publish" if is_first else "Update"
     message = f"[courses] {action} {module_code}: {module_title}"
 
+    def commit(git):
+        if isinstance(dest_path, list):
+            return git.commit_paths(dest_path, message)
+        return git.commit_folder(dest_path, message)
+
+    if git is not None:
+        return commit(git)
     try:
-        # Add files
-        subprocess.run(
-            ["git", "add", str(dest_path)],
-            cwd=WORKSPACE_ROOT,
-            check=True,
-            capture_output=True
-        )
-
-        # Check if there are changes to commit
-        result = subprocess.run(
-            ["git", "diff", "--cached", "--quiet"],
-            cwd=WORKSPACE_ROOT,
-            capture_output=True
-        )
-
-        if result.returncode == 0:
-            return True, "No changes to commit"
-
-        # Commit
-        subprocess.run(
-            ["git", "commit", "-m", message],
-            cwd=WORKSPACE_ROOT,
-            check=True,
-            capture_output=True
-        )
-
-        # Get commit hash
-        result = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
-            cwd=WORKSPACE_ROOT,
-            check=True,
-            capture_output=True,
-            text=True
-        )
-        commit_hash = result.stdout.strip()[:12]
-
-        return True, commit_hash
-
-    except subprocess.CalledProcessError as e:
-        return False, f"Git error: {e.stderr.decode() if e.stderr else str(e)}"
-
-
-def run_validation(source_path: Path) -> int:
+        with open_backend(WORKSPACE_ROOT) as git:
+            return commit(git)
+    except GitError as e:
+        return False, f"Git error: {e}"
+
+
+@traced("publish.validate")
+def run_validation(source_path: Path, optimize: bool = False) -> int:
     """Run validate_module.py on source path."""
     validate_script = Path(__file__).parent / "validate_module.py"
 
@@ -293,7 +632,8 @@ def run_validation(source_path: Path) -> int:
         return 0
 
     result = subprocess.run(
-        [sys.executable, str(validate_script), str(source_path)],
+        [sys.executable, str(validate_script), str(source_path)]
+        + (["--optimize"] if optimize else []),
         capture_output=True,
         text=True
     )
@@ -305,6 +645,7 @@ def run_validation(source_path: Path) -> int:
     return result.returncode
 
 
+@traced("publish.index")
 def run_indexing(module_code: str) -> bool:
     """Run index_courses.py for the module."""
     index_script = Path(__file__).parent / "index_courses.py"
@@ -327,10 +668,38 @@ def run_indexing(module_code: str) -> bool:
         return False
 
 
-def publish_module(module_code: str, dry_run: bool = False, force: bool = False) -> int:
+@traced("publish.search")
+def update_search_index(module_code: str, source_snapshot: ModuleSnapshot,
+                        object_store=None) -> bool:
+    """Re-index the module's published files and research reports (search_index.py)."""
+    from search_index import index_module, research_reports
+
+    dest_snapshot = None if object_store else scan_module(get_dest_path(module_code),
+                                                          recursive=False)
+    try:
+        passages = index_module(module_code,
+                                read_published_files(module_code, dest_snapshot, object_store),
+                                research_reports(source_snapshot))
+    except OSError as e:
+        log(f"Search index not updated: {e}", "WARN")
+        return False
+    log(f"Search index updated ({passages} passages)", "OK")
+    return True
+
+
+def publish_module(module_code: str, dry_run: bool = False, force: bool = False,
+                   store: bool = False, optimize: bool = False, git=None,
+                   show_diff: bool = False) -> int:
     """
     Main publish workflow.
 
+    With store=True the module goes into the content-addressed object store
+    (see object_store.py) instead of being copied as plain files. With
+    optimize=True HTML is minified (see html_optimize.py) before the size
+    check and in the published output. git is an optional shared
+    git_backend session for publishing many modules. show_diff adds unified
+    diffs to the --dry-run plan.
+
     Returns exit code.
     """
     module_code = module_code.upper()
@@ -344,17 +713,53 @@ def publish_module(module_code: str, dry_run: bool = False, force: bool = False)
         return 3
 
     log(f"Source: {source_path}", "OK" if not dry_run else "DRY")
+    source_snapshot = scan_module(source_path)
 
     # Step 2: Get destination
-    dest_path = get_dest_path(module_code)
+    object_store = None
+    if store:
+        from object_store import ObjectStore, format_stats
+        object_store = ObjectStore()
+        dest_path = object_store.manifest_path(module_code)
+    else:
+        dest_path = get_dest_path(module_code)
     log(f"Destination: {dest_path.relative_to(WORKSPACE_ROOT)}", "OK" if not dry_run else "DRY")
 
+    if object_store:
+        is_first_publish = object_store.load_manifest(module_code) is None
+        dest_snapshot = None
+        current_hash = lambda: store_content_hash(object_store, module_code)
+    else:
+        dest_snapshot = scan_module(dest_path)
+        is_first_publish = dest_snapshot.is_empty
+        current_hash = lambda: calculate_content_hash(dest_path, dest_snapshot)
+
+    # Nothing changed since the last publish: skip validation, copy, git,
+    # marker (so the synced drive sees no new upload) and indexing
+    source_hash = calculate_source_hash(source_snapshot, optimize)
+    if is_up_to_date(source_path, source_snapshot, source_hash,
+                     not is_first_publish, current_hash, dest_path):
+        print()
+        log(f"{module_code} is up to date - nothing to publish", "OK")
+        return 0
+
     # Step 3: Validate source
     print("\n--- Validation ---")
     if dry_run:
-        log("Would run validation on source", "DRY")
+        # In-process and read-only, reusing the source scan
+        from validate_module import check_module
+        report = check_module(source_path, snapshot=source_snapshot, optimize=optimize)
+        for status, message in report.messages:
+            if status == "DETAIL":
+                print(f"  {message}")
+            else:
+                log(message, status)
+        if report.exit_code != 0:
+            log(f"Validation would fail (exit {report.exit_code})"
+                + (" - proceeding due to --force" if force else " - publish would stop here"),
+                "WARN")
     else:
-        exit_code = run_validation(source_path)
+        exit_code = run_validation(source_path, optimize)
         if exit_code != 0:
             if force:
                 log("Validation failed but proceeding due to --force", "WARN")
@@ -365,8 +770,8 @@ def publish_module(module_code: str, dry_run: bool = False, force: bool = False)
 
     # Step 4: Safety check
     print("\n--- Safety Check ---")
-    is_first_publish = not dest_path.exists() or not any(dest_path.iterdir())
-    safe, reason = check_publish_safety(source_path, dest_path)
+    safe, reason = compare_with_marker(source_path, not is_first_publish, current_hash,
+                                       source_snapshot)
 
     if safe:
         log(reason, "OK" if not dry_run else "DRY")
@@ -381,10 +786,25 @@ def publish_module(module_code: str, dry_run: bool = False, force: bool = False)
             return 2
 
     # Step 5: Copy files
-    print("\n--- File Copy ---")
-    copied = copy_module_files(source_path, dest_path, dry_run)
-    for f in copied:
-        log(f, "OK" if not dry_run else "DRY")
+    if dry_run:
+        print("\n--- Publish Plan ---")
+        published = read_published_files(module_code, dest_snapshot, object_store)
+        plan = plan_file_changes(source_snapshot, published, optimize,
+                                 removes_stale=object_store is not None)
+        print_plan(plan, show_diff)
+        copied = [c.name for c in plan if c.status != "stale"]
+        has_changes = any(c.status in ("modified", "new", "deleted") for c in plan)
+    else:
+        print("\n--- File Copy ---")
+        if object_store:
+            copied = store_module_files(source_path, module_code, object_store, dry_run,
+                                        source_snapshot, optimize)
+        else:
+            copied = copy_module_files(source_path, dest_path, dry_run, source_snapshot, optimize)
+        for f in copied:
+            log(f, "OK")
+        if object_store and copied:
+            log(f"Store: {format_stats(object_store.stats())}", "OK")
 
     if not copied:
         log("No files to copy", "WARN")
@@ -393,9 +813,9 @@ def publish_module(module_code: str, dry_run: bool = False, force: bool = False)
     # Step 6: Read module metadata for commit message
     yaml_path = source_path / "module.yaml"
     module_title = module_code
-    if yaml_path.exists():
+    if source_snapshot.exists("module.yaml"):
         try:
-            data = yaml.safe_load(yaml_path.read_text(encoding='utf-8'))
+            data = safe_load(yaml_path.read_text(encoding='utf-8'))
             module_title = data.get("title", module_code)
         except Exception:
             pass
@@ -404,10 +824,16 @@ def publish_module(module_code: str, dry_run: bool = False, force: bool = False)
     print("\n--- Git Commit ---")
     if dry_run:
         action = "Publish" if is_first_publish else "Update"
-        log(f"Would commit: [courses] {action} {module_code}: {module_title}", "DRY")
+        if has_changes:
+            log(f"Would commit: [courses] {action} {module_code}: {module_title}", "DRY")
+        else:
+            log("Would not commit: no changes", "DRY")
         commit_hash = "dry-run"
     else:
-        success, result = git_commit(dest_path, module_code, module_title, is_first_publish)
+        # Only this module's manifest and objects, not a scan of the whole store
+        git_path = (object_store.module_paths(module_code) + object_store.deleted
+                    if object_store else dest_path)
+        success, result = git_commit(git_path, module_code, module_title, is_first_publish, git)
         if success:
             if result == "No changes to commit":
                 log(result, "OK")
@@ -419,20 +845,34 @@ def publish_module(module_code: str, dry_run: bool = False, force: bool = False)
             log(result, "FAIL")
             return 5
 
-    # Step 8: Create marker file
-    print("\n--- Marker File ---")
-    if dry_run:
-        log("Would create _GIT_PUBLISHED.md in source", "DRY")
-    else:
-        create_marker_file(source_path, dest_path, commit_hash)
+    # Steps 8-9: Marker file, Qdrant and the local search index, only once
+    # the commit is on the branch. A shared fast-import session moves the
+    # branch at close; a marker for a commit that never landed would make
+    # every later run skip the module as up to date
+    def finish():
+        print(f"\n--- Marker File ({module_code}) ---")
+        content_hash = store_content_hash(object_store, module_code) if object_store else None
+        create_marker_file(source_path, dest_path, commit_hash, content_hash, module_code,
+                           source_hash)
         log("Created _GIT_PUBLISHED.md", "OK")
 
-    # Step 9: Index to Qdrant
-    print("\n--- Qdrant Index ---")
+        print(f"\n--- Qdrant Index ({module_code}) ---")
+        run_indexing(module_code)
+        update_search_index(module_code, source_snapshot, object_store)
+
     if dry_run:
-        log("Would update Qdrant course_content collection", "DRY")
+        print("\n--- Marker File ---")
+        log("Would create _GIT_PUBLISHED.md in source", "DRY")
+        print("\n--- Qdrant Index ---")
+        chunks = changed_index_chunks(plan)
+        log(f"Would re-index {len(chunks)} chunk(s) in Qdrant course_content", "DRY")
+        for label in chunks:
+            print(f"  {label}")
+        log("Would update the local search index", "DRY")
+    elif git is not None:
+        git.after_close(finish)
     else:
-        run_indexing(module_code)
+        finish()
 
     # Final summary
     print("\n" + "=" * 40)
@@ -446,26 +886,47 @@ def publish_module(module_code: str, dry_run: bool = False, force: bool = False)
     return 0
 
 
-def main():
+def main(argv: list[str] | None = None, prog: str | None = None):
     parser = argparse.ArgumentParser(
+        prog=prog,
         description="Publish course modules to the Git repository",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
   python publish_module.py C1M1 --dry-run    # Preview changes
+  python publish_module.py C1M1 --dry-run --diff  # ...with unified diffs
   python publish_module.py C1M1              # Publish
   python publish_module.py C1M1 --force      # Force overwrite
+  python publish_module.py C1M1 --store      # Publish into the object store
+  python publish_module.py C1M1 --optimize   # Minify HTML while publishing
         """
     )
     parser.add_argument("module", help="Module code (e.g., C1M1, C2M3)")
     parser.add_argument("--dry-run", action="store_true",
                         help="Preview changes without executing")
+    parser.add_argument("--diff", action="store_true",
+                        help="With --dry-run, show unified diffs of changed files")
     parser.add_argument("--force", action="store_true",
                         help="Force publish even if destination modified")
-
-    args = parser.parse_args()
-
-    exit_code = publish_module(args.module, args.dry_run, args.force)
+    parser.add_argument("--store", action="store_true",
+                        help="Publish into the content-addressed object store "
+                             "(OBJECT_STORE) instead of plain files")
+    parser.add_argument("--optimize", action="store_true",
+                        help="Minify HTML/CSS/SVG and drop unused CSS rules "
+                             "before size checks and publishing")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Append per-step timings to FILE as JSONL")
+
+    args = parser.parse_args(argv)
+    if args.trace:
+        enable_tracing(args.trace)
+
+    # Dry runs only read, so they don't wait for other publishes
+    waiting = lambda: log("Another publish is running in this workspace, waiting...", "WARN")
+    guard = nullcontext() if args.dry_run else file_lock(PUBLISH_LOCK, on_wait=waiting)
+    with span("publish_module", module=args.module.upper()), guard:
+        exit_code = publish_module(args.module, args.dry_run, args.force, args.store,
+                                   args.optimize, show_diff=args.diff)
     sys.exit(exit_code)
 
 
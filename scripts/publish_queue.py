@@ -0,0 +1,550 @@
+#!/usr/bin/env python3
+"""
+Publish Queue
+
+Lets several people publish from one workspace without racing on the git
+index and the _GIT_PUBLISHED.md markers. Clients add module codes to a
+SQLite job table; one worker at a time (held by an advisory lock on
+PUBLISH_QUEUE_LOCK) drains it:
+
+- duplicate queued jobs for the same module and options share one publish
+  run (coalescing), and every job gets that run's result
+- up to --batch runs share one git_backend session, so a batch of modules
+  costs one fast-import process rather than a git add/commit per module
+- the worker also holds publish_module.PUBLISH_LOCK while publishing, so
+  direct `publish_module.py` runs wait for the batch and vice versa
+
+Any client can become the worker (`submit --drain`); whoever finds the
+lock taken leaves the jobs to the current worker, which checks the queue
+again after letting go of the lock.
+
+Usage:
+    python publish_queue.py submit C1M1 C1M2 --drain --wait
+    python publish_queue.py status
+    python publish_queue.py status 12 --log
+    python publish_queue.py work --follow
+    python publish_queue.py cancel 14
+"""
+
+import argparse
+import getpass
+import io
+import json
+import os
+import re
+import socket
+import sqlite3
+import sys
+import time
+import traceback
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Iterable
+
+import publish_module
+from publish_module import file_lock
+from state_paths import state_dir
+from tracing import span
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+WORKSPACE_ROOT = Path(os.environ.get("WORKSPACE_ROOT", "."))
+QUEUE_DB = Path(os.environ.get("PUBLISH_QUEUE_DB",
+                               state_dir(WORKSPACE_ROOT) / "publish-queue.db"))
+WORKER_LOCK = Path(os.environ.get("PUBLISH_QUEUE_LOCK",
+                                  state_dir(WORKSPACE_ROOT) / "publish-queue.lock"))
+
+QUEUE_SCHEMA_VERSION = 1
+
+BATCH_SIZE = int(os.environ.get("PUBLISH_QUEUE_BATCH", "20"))  # Publish runs per git session
+POLL_INTERVAL = 0.5  # seconds, for --wait and --follow
+BUSY_TIMEOUT = 30.0  # seconds a submitter waits for a write lock on the database
+KEEP_DAYS = 30  # Finished jobs older than this are pruned by the worker
+
+MODULE_CODE = re.compile(r'^C\d+M\d+$')
+
+# Publish flags a job can carry; jobs only coalesce when these match
+PUBLISH_OPTIONS = ("force", "store", "optimize")
+
+FINISHED = ("done", "failed", "cancelled")
+
+# publish_module exit codes
+EXIT_MEANINGS = {
+    0: "published",
+    1: "validation failed",
+    2: "safety check failed (needs --force)",
+    3: "source not found",
+    4: "index error",
+    5: "git commit failed",
+}
+EXIT_ERROR = 70  # Publish raised instead of returning an exit code
+COMMITTED = re.compile(r'Committed: ([0-9a-f]+)')
+UP_TO_DATE = "is up to date - nothing to publish"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    module TEXT NOT NULL,
+    options TEXT NOT NULL,
+    status TEXT NOT NULL,
+    submitted_by TEXT,
+    submitted_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    batch INTEGER,
+    run_id INTEGER,
+    exit_code INTEGER,
+    result TEXT,
+    output TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, id);
+"""
+
+
+def log(message: str, status: str = "INFO") -> None:
+    """Print formatted log message."""
+    symbols = {"OK": "[OK]", "FAIL": "[FAIL]", "WARN": "[WARN]", "INFO": "->"}
+    print(f"{symbols.get(status, '->')} {message}")
+
+
+def now() -> str:
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def client_name() -> str:
+    """user@host of the submitting client."""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "unknown"
+    return f"{user}@{socket.gethostname()}"
+
+
+# =============================================================================
+# DATABASE
+# =============================================================================
+
+def connect(db_path: Path = QUEUE_DB) -> sqlite3.Connection:
+    """Open (and create) the queue database."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    # Autocommit; writes that must be atomic use BEGIN IMMEDIATE
+    conn = sqlite3.connect(str(db_path), timeout=BUSY_TIMEOUT, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != QUEUE_SCHEMA_VERSION:
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {QUEUE_SCHEMA_VERSION}")
+    return conn
+
+
+def option_key(options: dict) -> str:
+    """Canonical JSON of the publish flags that are set."""
+    return json.dumps({k: True for k in PUBLISH_OPTIONS if options.get(k)}, sort_keys=True)
+
+
+def submit(conn: sqlite3.Connection, codes: Iterable[str], options: dict | None = None,
+           submitted_by: str | None = None) -> list[int]:
+    """Queue one job per module code; returns the new job ids."""
+    codes = [code.upper() for code in codes]
+    invalid = [code for code in codes if not MODULE_CODE.match(code)]
+    if invalid:
+        raise ValueError(f"Invalid module code(s): {', '.join(invalid)}")
+
+    key = option_key(options or {})
+    who = submitted_by or client_name()
+    stamp = now()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        ids = [conn.execute(
+            "INSERT INTO jobs (module, options, status, submitted_by, submitted_at) "
+            "VALUES (?, ?, 'queued', ?, ?)", (code, key, who, stamp)).lastrowid
+            for code in codes]
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return ids
+
+
+def cancel(conn: sqlite3.Connection, ids: Iterable[int]) -> int:
+    """Cancel queued jobs (running ones finish); returns how many were cancelled."""
+    ids = list(ids)
+    marks = ",".join("?" * len(ids))
+    cursor = conn.execute(
+        f"UPDATE jobs SET status = 'cancelled', finished_at = ? "
+        f"WHERE status = 'queued' AND id IN ({marks})", (now(), *ids))
+    return cursor.rowcount
+
+
+def get_jobs(conn: sqlite3.Connection, ids: Iterable[int] | None = None,
+             active: bool = False, limit: int | None = None) -> list[sqlite3.Row]:
+    """Jobs by id, or the latest jobs (only queued/running with active=True)."""
+    sql = "SELECT * FROM jobs"
+    params: list = []
+    if ids:
+        ids = list(ids)
+        sql += f" WHERE id IN ({','.join('?' * len(ids))})"
+        params += ids
+    elif active:
+        sql += " WHERE status IN ('queued', 'running')"
+    sql += " ORDER BY id DESC"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return conn.execute(sql, params).fetchall()[::-1]
+
+
+def pending(conn: sqlite3.Connection) -> int:
+    """Number of queued jobs."""
+    return conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+
+# =============================================================================
+# WORKER
+# =============================================================================
+
+def recover(conn: sqlite3.Connection) -> int:
+    """
+    Requeue jobs left running by a worker that died.
+
+    Only call while holding WORKER_LOCK: then no other worker can be
+    running them.
+    """
+    return conn.execute(
+        "UPDATE jobs SET status = 'queued', started_at = NULL, batch = NULL, run_id = NULL "
+        "WHERE status = 'running'").rowcount
+
+
+def prune(conn: sqlite3.Connection, days: int = KEEP_DAYS) -> int:
+    """Delete finished jobs older than days."""
+    cutoff = (datetime.now() - timedelta(days=days)).isoformat(timespec='seconds')
+    return conn.execute(
+        "DELETE FROM jobs WHERE status IN ('done', 'failed', 'cancelled') AND finished_at < ?",
+        (cutoff,)).rowcount
+
+
+def claim_batch(conn: sqlite3.Connection, size: int = BATCH_SIZE) -> list[list[sqlite3.Row]]:
+    """
+    Mark the next runs as running and return them, oldest first.
+
+    A run is every queued job for one (module, options) pair, so duplicate
+    submissions are published once. At most size runs are claimed.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        runs: dict[tuple[str, str], list[sqlite3.Row]] = {}
+        for job in conn.execute("SELECT * FROM jobs WHERE status = 'queued' ORDER BY id"):
+            key = (job["module"], job["options"])
+            if key in runs:
+                runs[key].append(job)
+            elif len(runs) < size:
+                runs[key] = [job]
+        batch = conn.execute("SELECT COALESCE(MAX(batch), 0) + 1 FROM jobs").fetchone()[0]
+        stamp = now()
+        for jobs in runs.values():
+            lead = jobs[0]["id"]
+            conn.executemany(
+                "UPDATE jobs SET status = 'running', started_at = ?, batch = ?, run_id = ? "
+                "WHERE id = ?", [(stamp, batch, lead, job["id"]) for job in jobs])
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return list(runs.values())
+
+
+def summarize(exit_code: int, output: str) -> str:
+    """One-line result for a publish run."""
+    if exit_code == 0:
+        if UP_TO_DATE in output:
+            return "up to date"
+        commit = COMMITTED.search(output)
+        return f"committed {commit.group(1)}" if commit else "published (no changes)"
+    return EXIT_MEANINGS.get(exit_code, f"error (exit {exit_code})")
+
+
+class JobSession:
+    """
+    One publish run's view of the shared git session.
+
+    after_close() work (markers, index updates) runs when the batch's
+    session closes, long after run_publish returned; this sends its output
+    to the run's own log and records whether it raised.
+    """
+
+    def __init__(self, git):
+        self.git = git
+        self.out = io.StringIO()
+        self.failed = False
+
+    def __getattr__(self, name):
+        return getattr(self.git, name)
+
+    def after_close(self, callback: Callable[[], None]) -> None:
+        def run():
+            with redirect_stdout(self.out):
+                try:
+                    callback()
+                except Exception:
+                    traceback.print_exc(file=self.out)
+                    self.failed = True
+        self.git.after_close(run)
+
+
+def run_publish(module: str, options: dict, git, publish: Callable) -> tuple[int, JobSession]:
+    """Publish one module with its output captured; returns (exit code, job session)."""
+    job = JobSession(git)
+    with redirect_stdout(job.out), span("queue.publish", module=module):
+        try:
+            exit_code = publish(module, git=job, **options)
+        except Exception:
+            traceback.print_exc(file=job.out)
+            exit_code = EXIT_ERROR
+    return exit_code, job
+
+
+def finish_run(conn: sqlite3.Connection, jobs: list[sqlite3.Row], exit_code: int,
+               result: str, output: str) -> None:
+    """Record a run's outcome on every job it covered."""
+    status = "done" if exit_code == 0 else "failed"
+    conn.executemany(
+        "UPDATE jobs SET status = ?, finished_at = ?, exit_code = ?, result = ?, output = ? "
+        "WHERE id = ?", [(status, now(), exit_code, result, output, job["id"]) for job in jobs])
+
+
+def drain(conn: sqlite3.Connection, batch_size: int = BATCH_SIZE,
+          publish: Callable | None = None) -> dict[str, int]:
+    """
+    Publish queued jobs until the queue is empty.
+
+    Each batch holds PUBLISH_LOCK and shares one git_backend session.
+    Results are recorded once the session has closed, since a fast-import
+    session only updates the branch then (and only then writes the
+    publish markers and index updates). publish defaults to
+    publish_module.publish_module (tests and benchmarks can pass another).
+    """
+    from git_backend import GitError, open_backend
+
+    publish = publish or publish_module.publish_module
+    totals = {"jobs": 0, "runs": 0, "failed": 0, "batches": 0}
+    while True:
+        runs = claim_batch(conn, batch_size)
+        if not runs:
+            return totals
+
+        results = []
+        with file_lock(publish_module.PUBLISH_LOCK):
+            git = open_backend(publish_module.WORKSPACE_ROOT, batch=True)
+            try:
+                for jobs in runs:
+                    module = jobs[0]["module"]
+                    options = json.loads(jobs[0]["options"])
+                    extra = f" ({len(jobs)} requests)" if len(jobs) > 1 else ""
+                    log(f"{module}: publishing{extra}")
+                    exit_code, job = run_publish(module, options, git, publish)
+                    results.append((jobs, exit_code, job))
+            finally:
+                failure = None
+                try:
+                    git.close()
+                except GitError as e:
+                    failure = e
+                sessions, results = results, []
+                for jobs, code, job in sessions:
+                    output = job.out.getvalue()
+                    if failure is not None and getattr(git, "landed", False):
+                        # Commits, markers and index updates are in; only
+                        # the index sync afterwards failed
+                        output += f"\n[WARN] Git index not updated: {failure}"
+                    elif failure is not None:
+                        # Nothing from this session reached the branch, so
+                        # no markers or index updates were written either
+                        code = 5 if code == 0 else code
+                        output += f"\n[FAIL] Git error: {failure}"
+                    if job.failed and code == 0:
+                        code = EXIT_ERROR
+                    results.append((jobs, code, output))
+
+        conn.execute("BEGIN IMMEDIATE")
+        for jobs, exit_code, output in results:
+            result = summarize(exit_code, output)
+            finish_run(conn, jobs, exit_code, result, output)
+            log(f"{jobs[0]['module']}: {result}", "OK" if exit_code == 0 else "FAIL")
+            totals["jobs"] += len(jobs)
+            totals["runs"] += 1
+            totals["failed"] += exit_code != 0
+        conn.execute("COMMIT")
+        totals["batches"] += 1
+
+
+def work(conn: sqlite3.Connection, batch_size: int = BATCH_SIZE, follow: bool = False,
+         interval: float = POLL_INTERVAL, publish: Callable | None = None) -> dict[str, int] | None:
+    """
+    Drain the queue if no other worker is; returns totals, or None if one is.
+
+    With follow=True keeps polling for new jobs until interrupted.
+    """
+    totals = {"jobs": 0, "runs": 0, "failed": 0, "batches": 0}
+    while True:
+        with file_lock(WORKER_LOCK, blocking=False) as held:
+            if not held:
+                return None if not totals["batches"] else totals
+            recover(conn)
+            prune(conn)
+            for key, value in drain(conn, batch_size, publish).items():
+                totals[key] += value
+        # A submitter that found the lock taken just before we let go of it
+        # left its jobs to us; take them now
+        if pending(conn):
+            continue
+        if not follow:
+            return totals
+        time.sleep(interval)
+
+
+def wait_for(conn: sqlite3.Connection, ids: list[int], interval: float = POLL_INTERVAL,
+             drain_if_idle: bool = False) -> list[sqlite3.Row]:
+    """
+    Block until the jobs have finished; returns them.
+
+    With drain_if_idle, becomes the worker whenever no one else is (covers
+    the worker exiting between our submit and our lock attempt).
+    """
+    while True:
+        jobs = get_jobs(conn, ids)
+        if all(job["status"] in FINISHED for job in jobs):
+            return jobs
+        if drain_if_idle and any(job["status"] == "queued" for job in jobs):
+            if work(conn) is not None:
+                continue
+        time.sleep(interval)
+
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+
+def print_jobs(jobs: list[sqlite3.Row]) -> None:
+    """Print jobs as a plain-text table."""
+    header = (f"{'Job':>6}  {'Module':<8} {'Status':<10} {'Run':>6}  {'Submitted':<19}  "
+              f"{'By':<20} Result")
+    print(header)
+    print("-" * len(header))
+    for job in jobs:
+        options = ",".join(json.loads(job["options"]))
+        run = "" if job["run_id"] in (None, job["id"]) else str(job["run_id"])
+        module = job["module"] + (f" +{options}" if options else "")
+        print(f"{job['id']:>6}  {module:<8} {job['status']:<10} {run:>6}  "
+              f"{job['submitted_at']:<19}  {job['submitted_by'] or '':<20} {job['result'] or ''}")
+    print(f"\n{len(jobs)} job(s)")
+
+
+def exit_status(jobs: list[sqlite3.Row]) -> int:
+    """0 if every job published, else 1."""
+    return 0 if all(job["status"] == "done" for job in jobs) else 1
+
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Queue module publishes and drain them one batch at a time",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python publish_queue.py submit C1M1 C1M2          # Queue and return
+  python publish_queue.py submit C1M1 --drain --wait # Publish now unless a worker is busy
+  python publish_queue.py status                    # Latest jobs
+  python publish_queue.py status 12 --log           # Publish output of job 12
+  python publish_queue.py work --follow             # Long-running worker
+  python publish_queue.py cancel 14 15
+        """
+    )
+    parser.add_argument("--db", type=Path, default=QUEUE_DB,
+                        help=f"Queue database (default: {QUEUE_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    submit_cmd = sub.add_parser("submit", help="Queue modules for publishing")
+    submit_cmd.add_argument("modules", nargs="+", help="Module codes (e.g. C1M1)")
+    for option, text in (("force", "Publish despite validation/safety failures"),
+                         ("store", "Publish into the object store"),
+                         ("optimize", "Minify HTML while publishing")):
+        submit_cmd.add_argument(f"--{option}", action="store_true", help=text)
+    submit_cmd.add_argument("--drain", action="store_true",
+                            help="Work the queue now if no worker is running")
+    submit_cmd.add_argument("--wait", action="store_true",
+                            help="Wait for the jobs and exit 1 if any failed")
+
+    status_cmd = sub.add_parser("status", help="Show jobs")
+    status_cmd.add_argument("ids", nargs="*", type=int, help="Job ids (default: latest jobs)")
+    status_cmd.add_argument("--active", action="store_true", help="Only queued/running jobs")
+    status_cmd.add_argument("--limit", type=int, default=50,
+                            help="Latest jobs to show (default: 50)")
+    status_cmd.add_argument("--log", action="store_true", help="Print each job's publish output")
+    status_cmd.add_argument("--json", action="store_true", help="Output as JSON")
+
+    work_cmd = sub.add_parser("work", help="Drain the queue")
+    work_cmd.add_argument("--follow", action="store_true",
+                          help="Keep waiting for new jobs")
+    work_cmd.add_argument("--batch", type=int, default=BATCH_SIZE,
+                          help=f"Publish runs per git session (default: {BATCH_SIZE})")
+    work_cmd.add_argument("--interval", type=float, default=POLL_INTERVAL,
+                          help=f"--follow polling interval in seconds (default: {POLL_INTERVAL})")
+
+    cancel_cmd = sub.add_parser("cancel", help="Cancel queued jobs")
+    cancel_cmd.add_argument("ids", nargs="+", type=int, help="Job ids")
+
+    args = parser.parse_args(argv)
+    conn = connect(args.db)
+
+    if args.command == "submit":
+        options = {k: True for k in PUBLISH_OPTIONS if getattr(args, k)}
+        try:
+            ids = submit(conn, args.modules, options)
+        except ValueError as e:
+            log(str(e), "FAIL")
+            return 2
+        log(f"Queued job(s) {', '.join(map(str, ids))}", "OK")
+        if args.drain and work(conn) is None:
+            log("Another worker is draining the queue", "INFO")
+        if not args.wait:
+            return 0
+        jobs = wait_for(conn, ids, drain_if_idle=args.drain)
+        print()
+        print_jobs(jobs)
+        return exit_status(jobs)
+
+    if args.command == "status":
+        jobs = get_jobs(conn, args.ids, args.active, None if args.ids else args.limit)
+        if args.json:
+            print(json.dumps([dict(job) for job in jobs], indent=2))
+        elif args.log:
+            for job in jobs:
+                print(f"===== Job {job['id']} {job['module']} ({job['status']}) =====")
+                print(job["output"] or "(no output)")
+        else:
+            print_jobs(jobs)
+        return 0 if jobs or not args.ids else 3
+
+    if args.command == "work":
+        totals = work(conn, args.batch, args.follow, args.interval)
+        if totals is None:
+            log("Another worker is draining the queue", "INFO")
+            return 0
+        log(f"{totals['jobs']} job(s) in {totals['runs']} publish run(s), "
+            f"{totals['batches']} batch(es), {totals['failed']} failed",
+            "OK" if not totals["failed"] else "WARN")
+        return 1 if totals["failed"] else 0
+
+    cancelled = cancel(conn, args.ids)
+    log(f"Cancelled {cancelled} job(s)", "OK")
+    return 0 if cancelled == len(args.ids) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
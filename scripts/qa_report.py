@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Catalog QA Report
+
+Builds a static dashboard of every module in the catalog: validation
+result, size headroom against MAX_MODULE_SIZE, slide count against the
+brief's slide budget, brief lock state and last publish (date, commit,
+content hash). Writes index.html and report.json to report/ in
+state_paths.CACHE_DIR (QA_REPORT_DIR, or --output).
+
+The catalog is refreshed first, which re-reads only modules whose
+fingerprint (file paths, sizes, mtimes) changed since the last refresh.
+Rows are then streamed from SQLite straight into both files, so memory
+use does not grow with the size of the catalog.
+
+Usage:
+    python qa_report.py
+    python qa_report.py --course 3 --output /tmp/qa
+    python qa_report.py --no-refresh --all-reworks
+"""
+
+import argparse
+import html
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+import catalog
+from state_paths import CACHE_DIR
+from tracing import span, traced
+from validate_module import MAX_MODULE_SIZE
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+QA_REPORT_DIR = Path(os.environ.get("QA_REPORT_DIR", CACHE_DIR / "report"))
+
+# Headroom below this fraction of MAX_MODULE_SIZE is flagged
+LOW_HEADROOM = 0.10
+
+BRIEF_LABELS = {
+    "locked": "Locked",
+    "review": "Under review",
+    "draft": "Draft",
+    "unchecked": "No status ticked",
+    None: "No brief",
+}
+
+STYLE = """
+body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+       margin: 2rem; color: #1e293b; }
+h1 { font-size: 1.5rem; margin-bottom: 0.25rem; }
+.meta { color: #64748b; margin-bottom: 1.5rem; }
+table { border-collapse: collapse; width: 100%; font-size: 0.875rem; }
+th, td { text-align: left; padding: 0.4rem 0.6rem; border-bottom: 1px solid #e2e8f0;
+         vertical-align: top; }
+th { background: #f8fafc; position: sticky; top: 0; }
+td.num { text-align: right; white-space: nowrap; }
+code { font-size: 0.8rem; }
+.ok { color: #16a34a; }
+.warn { color: #d97706; }
+.fail { color: #dc2626; font-weight: 600; }
+.muted { color: #94a3b8; }
+.summary { margin-top: 1.5rem; }
+.summary td { border: none; padding: 0.15rem 1rem 0.15rem 0; }
+"""
+
+
+# =============================================================================
+# ROWS
+# =============================================================================
+
+def iter_modules(conn: sqlite3.Connection, all_reworks: bool = False,
+                 course: int | None = None) -> Iterator[sqlite3.Row]:
+    """Catalog rows in course/module order, fetched lazily from the cursor."""
+    clauses, params = [], []
+    if not all_reworks:
+        clauses.append("latest = 1")
+    if course is not None:
+        clauses.append("course = ?")
+        params.append(course)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    yield from conn.execute(f"SELECT * FROM modules {where} "
+                            f"ORDER BY course, module, rework_date, rework", params)
+
+
+def report_row(row: sqlite3.Row) -> dict:
+    """The dashboard's view of one catalog row."""
+    size = row["total_size"] or 0
+    slides, budget = row["slide_count"], row["slide_budget"]
+    published = row["published_hash"] is not None
+    return {
+        "code": row["code"],
+        "title": row["title"],
+        "path": row["path"],
+        "status": row["status"],
+        "score": row["score"],
+        "valid": row["exit_code"] == 0,
+        "exit_code": row["exit_code"],
+        "errors": json.loads(row["errors"] or "[]"),
+        "total_size": size,
+        "headroom": MAX_MODULE_SIZE - size,
+        "slide_count": slides,
+        "slide_budget": budget,
+        "over_budget": slides is not None and budget is not None and slides > budget,
+        "brief_status": row["brief_status"],
+        "published_at": row["published_at"],
+        "published_commit": row["published_commit"],
+        "published_hash": row["published_hash"],
+        # Source Hash, not Content Hash: the latter hashes the published
+        # output, which --optimize and the object store transform
+        "changed_since_publish": published and row["published_source_hash"] != row["source_hash"],
+        "fingerprint": row["fingerprint"],
+    }
+
+
+class Summary:
+    """Running totals, updated as rows stream past."""
+
+    def __init__(self):
+        self.counts = {"modules": 0, "invalid": 0, "over_size": 0, "low_headroom": 0,
+                       "over_budget": 0, "locked_briefs": 0, "never_published": 0,
+                       "changed_since_publish": 0}
+
+    def add(self, row: dict) -> None:
+        c = self.counts
+        c["modules"] += 1
+        c["invalid"] += not row["valid"]
+        c["over_size"] += row["headroom"] < 0
+        c["low_headroom"] += 0 <= row["headroom"] < MAX_MODULE_SIZE * LOW_HEADROOM
+        c["over_budget"] += row["over_budget"]
+        c["locked_briefs"] += row["brief_status"] == "locked"
+        c["never_published"] += row["published_hash"] is None
+        c["changed_since_publish"] += row["changed_since_publish"]
+
+
+# =============================================================================
+# WRITERS
+# =============================================================================
+
+class AtomicWriter:
+    """Text file written to a temporary name and renamed into place on close."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, self.tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-")
+        self.file = os.fdopen(fd, 'w', encoding='utf-8')
+
+    def write(self, text: str) -> None:
+        self.file.write(text)
+
+    def commit(self) -> None:
+        self.file.close()
+        os.replace(self.tmp, self.path)
+
+    def abort(self) -> None:
+        self.file.close()
+        os.unlink(self.tmp)
+
+
+class JsonReport(AtomicWriter):
+    """{"generated", "modules": [...], "summary"}, one module per line."""
+
+    def begin(self, generated: str) -> None:
+        self.write(f'{{"generated": {json.dumps(generated)},\n "modules": [\n')
+        self.first = True
+
+    def add(self, row: dict) -> None:
+        self.write(("" if self.first else ",\n") + "  " + json.dumps(row))
+        self.first = False
+
+    def end(self, summary: Summary) -> None:
+        self.write(f'\n ],\n "summary": {json.dumps(summary.counts)}}}\n')
+
+
+def esc(value) -> str:
+    return html.escape("" if value is None else str(value))
+
+
+def kb(size: int) -> str:
+    return f"{size / 1024:,.0f} KB"
+
+
+class HtmlReport(AtomicWriter):
+    """Self-contained HTML table; the summary follows the rows."""
+
+    def begin(self, generated: str) -> None:
+        self.write(f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<title>Module QA Report</title>
+<style>{STYLE}</style>
+</head>
+<body>
+<h1>Module QA Report</h1>
+<p class="meta">Generated {esc(generated)} &middot; size limit {kb(MAX_MODULE_SIZE)}</p>
+<table>
+<thead><tr><th>Module</th><th>Title</th><th>Status</th><th>Validation</th>
+<th>Size</th><th>Headroom</th><th>Slides / budget</th><th>Brief</th><th>Last publish</th></tr></thead>
+<tbody>
+""")
+
+    def add(self, row: dict) -> None:
+        if row["valid"]:
+            validation = '<span class="ok">Valid</span>'
+        else:
+            first = row["errors"][0] if row["errors"] else "see validate_module"
+            more = f" (+{len(row['errors']) - 1} more)" if len(row["errors"]) > 1 else ""
+            validation = (f'<span class="fail">Exit {row["exit_code"]}</span> '
+                          f'{esc(first)}{esc(more)}')
+
+        headroom = row["headroom"]
+        headroom_class = ("fail" if headroom < 0 else
+                          "warn" if headroom < MAX_MODULE_SIZE * LOW_HEADROOM else "ok")
+
+        if row["slide_count"] is None:
+            slides = '<span class="muted">no presentation</span>'
+        else:
+            budget = row["slide_budget"] if row["slide_budget"] is not None else "?"
+            slides_class = "fail" if row["over_budget"] else ""
+            slides = f'<span class="{slides_class}">{row["slide_count"]} / {budget}</span>'
+
+        brief_class = {"locked": "ok", None: "muted"}.get(row["brief_status"], "warn")
+        brief = f'<span class="{brief_class}">{BRIEF_LABELS.get(row["brief_status"], "?")}</span>'
+
+        if row["published_hash"] is None:
+            published = '<span class="muted">never</span>'
+        else:
+            published = (f'{esc(row["published_at"])}<br><code>{esc((row["published_commit"] or "")[:12])}'
+                         f'</code> <code>{esc(row["published_hash"][:12])}</code>')
+            if row["changed_since_publish"]:
+                published += '<br><span class="warn">changed since publish</span>'
+
+        status = esc(row["status"] or "?")
+        if row["score"] is not None:
+            status += f" ({row['score']})"
+
+        self.write(
+            f'<tr><td title="{esc(row["path"])}"><strong>{esc(row["code"] or "?")}</strong></td>'
+            f'<td>{esc(row["title"])}</td><td>{status}</td><td>{validation}</td>'
+            f'<td class="num">{kb(row["total_size"])}</td>'
+            f'<td class="num {headroom_class}">{kb(headroom)}</td>'
+            f'<td class="num">{slides}</td><td>{brief}</td><td>{published}</td></tr>\n'
+        )
+
+    def end(self, summary: Summary) -> None:
+        labels = {
+            "modules": "Modules",
+            "invalid": "Failing validation",
+            "over_size": "Over the size limit",
+            "low_headroom": f"Under {LOW_HEADROOM:.0%} size headroom",
+            "over_budget": "More slides than budgeted",
+            "locked_briefs": "Locked briefs",
+            "never_published": "Never published",
+            "changed_since_publish": "Changed since last publish",
+        }
+        rows = "\n".join(f"<tr><td>{labels[k]}</td><td class=\"num\">{v}</td></tr>"
+                         for k, v in summary.counts.items())
+        self.write(f"""</tbody>
+</table>
+<h2>Summary</h2>
+<table class="summary">
+{rows}
+</table>
+</body>
+</html>
+""")
+
+
+# =============================================================================
+# REPORT
+# =============================================================================
+
+@traced("report.write")
+def write_report(conn: sqlite3.Connection, output: Path,
+                 all_reworks: bool = False, course: int | None = None) -> Summary:
+    """Stream catalog rows into output/index.html and output/report.json."""
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M')
+    writers = [HtmlReport(output / "index.html"), JsonReport(output / "report.json")]
+    summary = Summary()
+    try:
+        for writer in writers:
+            writer.begin(generated)
+        for module in iter_modules(conn, all_reworks, course):
+            row = report_row(module)
+            summary.add(row)
+            for writer in writers:
+                writer.add(row)
+        for writer in writers:
+            writer.end(summary)
+    except BaseException:
+        for writer in writers:
+            writer.abort()
+        raise
+    for writer in writers:
+        writer.commit()
+    return summary
+
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Build the catalog QA dashboard (HTML and JSON)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python qa_report.py
+  python qa_report.py --course 3 --output /tmp/qa
+  python qa_report.py --no-refresh --all-reworks
+        """
+    )
+    parser.add_argument("--output", type=Path, default=QA_REPORT_DIR,
+                        help=f"Output folder (default: {QA_REPORT_DIR})")
+    parser.add_argument("--course", type=int, help="Only this course")
+    parser.add_argument("--all-reworks", action="store_true",
+                        help="Include superseded rework folders")
+    parser.add_argument("--no-refresh", action="store_true",
+                        help="Report the catalog as it is, without rescanning")
+
+    args = parser.parse_args(argv)
+    conn = catalog.connect()
+    try:
+        if not args.no_refresh:
+            with span("report.refresh"):
+                counts = catalog.refresh_catalog(conn)
+            print(f"Catalog: {counts['added'] + counts['updated']} module(s) re-read, "
+                  f"{counts['unchanged']} unchanged, {counts['removed']} removed")
+        summary = write_report(conn, args.output, args.all_reworks, args.course)
+    finally:
+        conn.close()
+
+    c = summary.counts
+    print(f"{c['modules']} module(s): {c['invalid']} failing validation, "
+          f"{c['over_size']} over size, {c['over_budget']} over slide budget, "
+          f"{c['locked_briefs']} locked brief(s)")
+    print(f"Report: {args.output / 'index.html'}")
+    print(f"        {args.output / 'report.json'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Rework Diff
+
+Summarizes what changed between two rework folders of a module (by default
+the two newest, e.g. "January 2025 ReWork" -> "March 2026 ReWork"):
+
+    brief               aligned by section (Markdown headings)
+    speaker notes       aligned by slide ("## Slide N: Title")
+    presentation HTML   aligned by slide
+
+Units are matched by content hash first, then by title, then by shared
+word shingles (a rolling hash over every SHINGLE_WORDS-word window), which
+finds slides and sections that were retitled or moved as well as edited.
+Matched units out of their old relative order are reported as moved.
+
+Usage:
+    python rework_diff.py "/path/to/Course 1/Module 3"
+    python rework_diff.py C1M3
+    python rework_diff.py "/path/to/January 2025 ReWork" "/path/to/March 2026 ReWork"
+    python rework_diff.py C1M3 --all --json
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import re
+import sys
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import NamedTuple
+
+from catalog import deliverable_file, read_text
+from module_scan import ModuleSnapshot, scan_module
+from project_init import find_existing_reworks
+from publish_module import MARKDOWN_HEADING, SLIDE_START, discover_source_path
+from yaml_compat import safe_load
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+SHINGLE_WORDS = 5
+SIMILARITY_THRESHOLD = 0.4  # Jaccard of shingles for pairing retitled units
+
+# Polynomial rolling hash over word ids
+HASH_BASE = 1_000_003
+HASH_MOD = (1 << 61) - 1
+
+# Deliverable -> (module.yaml key, suffixes, file name hint, unit name)
+DOCUMENTS = {
+    "brief": ("brief", [".md"], "brief", "section"),
+    "notes": ("speaker_notes", [".md"], "notes", "slide"),
+    "presentation": ("presentation", [".html"], "", "slide"),
+}
+
+NOTES_SLIDE = re.compile(r'^##\s+Slide\s+(\d+)\s*[:.\-–—]?\s*(.*)$', re.MULTILINE)
+HTML_TITLE = re.compile(r'<h[1-3][^>]*>(.*?)</h[1-3]>', re.IGNORECASE | re.DOTALL)
+TAG = re.compile(r'<[^>]+>')
+STYLE_OR_SCRIPT = re.compile(r'<(style|script)\b.*?</\1>', re.IGNORECASE | re.DOTALL)
+WORD = re.compile(r'\w+')
+SPACE = re.compile(r'\s+')
+
+MODULE_CODE = re.compile(r'^C\d+M\d+$', re.IGNORECASE)
+
+
+class Unit(NamedTuple):
+    """One section or slide of a document."""
+    position: int  # 1-based
+    title: str
+    digest: str  # Of the whitespace-normalized content
+    words: str  # Plain text, for shingling
+
+
+class Change(NamedTuple):
+    """A unit that was added, removed, moved and/or edited."""
+    status: str  # "added", "removed", "moved", "edited" or "moved, edited"
+    old: Unit | None
+    new: Unit | None
+    similarity: float | None  # Shingle Jaccard for edited units
+
+
+class DocumentDiff(NamedTuple):
+    document: str
+    unit: str
+    old_file: str | None
+    new_file: str | None
+    old_count: int
+    new_count: int
+    changes: list[Change]
+
+    @property
+    def counts(self) -> dict[str, int]:
+        counts = Counter()
+        for change in self.changes:
+            for status in change.status.split(", "):
+                counts[status] += 1
+        matched = self.new_count - counts["added"]
+        counts["unchanged"] = matched - sum(1 for c in self.changes if c.old and c.new)
+        return {k: counts[k] for k in ("added", "removed", "moved", "edited", "unchanged")}
+
+
+# =============================================================================
+# SPLITTING
+# =============================================================================
+
+def make_unit(position: int, title: str, content: str, plain: str) -> Unit:
+    normalized = SPACE.sub(" ", content).strip()
+    return Unit(position, title, hashlib.sha1(normalized.encode('utf-8')).hexdigest(), plain)
+
+
+def html_text(fragment: str) -> str:
+    """Visible text of an HTML fragment."""
+    return SPACE.sub(" ", html.unescape(TAG.sub(" ", STYLE_OR_SCRIPT.sub(" ", fragment)))).strip()
+
+
+def brief_units(text: str) -> list[Unit]:
+    """Brief sections, one per heading (levels 1-3) plus any preamble."""
+    matches = list(MARKDOWN_HEADING.finditer(text))
+    bounds = [(m.group(1).strip(), m.start(), m.end()) for m in matches]
+    units = []
+    preamble = text[:matches[0].start()] if matches else text
+    if preamble.strip():
+        units.append(make_unit(1, "(preamble)", preamble, preamble))
+    for i, (title, start, body_start) in enumerate(bounds):
+        end = bounds[i + 1][1] if i + 1 < len(bounds) else len(text)
+        units.append(make_unit(len(units) + 1, title, text[start:end], text[body_start:end]))
+    return units
+
+
+def notes_units(text: str) -> list[Unit]:
+    """Speaker-notes slides; the slide number is left out of the hash."""
+    matches = list(NOTES_SLIDE.finditer(text))
+    units = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        title = match.group(2).strip() or f"Slide {match.group(1)}"
+        body = text[match.end():end]
+        units.append(make_unit(i + 1, title, title + body, body))
+    return units
+
+
+def presentation_units(text: str) -> list[Unit]:
+    """Presentation slides, titled by their first h1-h3."""
+    starts = [m.start() for m in SLIDE_START.finditer(text)]
+    units = []
+    for i, (start, end) in enumerate(zip(starts, starts[1:] + [len(text)])):
+        fragment = text[start:end]
+        heading = HTML_TITLE.search(fragment)
+        plain = html_text(fragment)
+        title = html_text(heading.group(1)) if heading else plain[:40]
+        units.append(make_unit(i + 1, title or f"Slide {i + 1}", fragment, plain))
+    return units
+
+
+SPLITTERS = {"brief": brief_units, "notes": notes_units, "presentation": presentation_units}
+
+
+# =============================================================================
+# MATCHING
+# =============================================================================
+
+def shingles(words: list[int], k: int = SHINGLE_WORDS) -> set[int]:
+    """Rolling hashes of every k-word window (the whole text if shorter)."""
+    if not words:
+        return set()
+    h = 0
+    for word in words[:k]:
+        h = (h * HASH_BASE + word) % HASH_MOD
+    out = {h}
+    high = pow(HASH_BASE, k - 1, HASH_MOD)
+    for i in range(k, len(words)):
+        h = ((h - words[i - k] * high) * HASH_BASE + words[i]) % HASH_MOD
+        out.add(h)
+    return out
+
+
+def jaccard(a: set[int], b: set[int]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def unmoved(pairs: list[tuple[int, int]]) -> set[tuple[int, int]]:
+    """
+    The largest set of (old, new) pairs already in the same relative order.
+
+    Longest increasing subsequence of old positions taken in new order;
+    every other pair was moved.
+    """
+    pairs = sorted(pairs, key=lambda p: p[1])
+    tails: list[int] = []  # Smallest old position ending a run of each length
+    tail_index: list[int] = []
+    previous = [-1] * len(pairs)
+    for i, (old, _) in enumerate(pairs):
+        length = bisect_left(tails, old)
+        if length == len(tails):
+            tails.append(old)
+            tail_index.append(i)
+        else:
+            tails[length] = old
+            tail_index[length] = i
+        previous[i] = tail_index[length - 1] if length else -1
+    keep = set()
+    i = tail_index[-1] if tail_index else -1
+    while i >= 0:
+        keep.add(pairs[i])
+        i = previous[i]
+    return keep
+
+
+def diff_units(old: list[Unit], new: list[Unit]) -> list[Change]:
+    """Added, removed, moved and edited units, in new-document order."""
+    matched: dict[int, int] = {}  # new index -> old index
+
+    # 1. Identical content
+    by_digest: dict[str, list[int]] = {}
+    for i, unit in enumerate(old):
+        by_digest.setdefault(unit.digest, []).append(i)
+    for j, unit in enumerate(new):
+        if by_digest.get(unit.digest):
+            matched[j] = by_digest[unit.digest].pop(0)
+
+    # 2. Same title
+    used = set(matched.values())
+    by_title: dict[str, list[int]] = {}
+    for i, unit in enumerate(old):
+        if i not in used:
+            by_title.setdefault(unit.title.lower(), []).append(i)
+    for j, unit in enumerate(new):
+        if j not in matched and by_title.get(unit.title.lower()):
+            matched[j] = by_title[unit.title.lower()].pop(0)
+
+    # 3. Shared shingles (retitled, split or merged units)
+    vocabulary: dict[str, int] = {}
+    cache: dict[tuple[str, int], set[int]] = {}
+
+    def unit_shingles(side: str, index: int, unit: Unit) -> set[int]:
+        key = (side, index)
+        if key not in cache:
+            words = [vocabulary.setdefault(w, len(vocabulary) + 1)
+                     for w in WORD.findall(unit.words.lower())]
+            cache[key] = shingles(words)
+        return cache[key]
+
+    used = set(matched.values())
+    postings: dict[int, list[int]] = {}
+    for i, unit in enumerate(old):
+        if i not in used:
+            for h in unit_shingles("old", i, unit):
+                postings.setdefault(h, []).append(i)
+    candidates = []
+    for j, unit in enumerate(new):
+        if j in matched:
+            continue
+        mine = unit_shingles("new", j, unit)
+        overlap = Counter(i for h in mine for i in postings.get(h, ()))
+        for i, shared in overlap.items():
+            theirs = cache[("old", i)]
+            score = shared / len(mine | theirs)
+            if score >= SIMILARITY_THRESHOLD:
+                candidates.append((score, j, i))
+    used = set(matched.values())
+    for score, j, i in sorted(candidates, reverse=True):
+        if j not in matched and i not in used:
+            matched[j] = i
+            used.add(i)
+
+    in_order = unmoved([(i, j) for j, i in matched.items()])
+    changes = []
+    for j, unit in enumerate(new):
+        if j not in matched:
+            changes.append(Change("added", None, unit, None))
+            continue
+        i = matched[j]
+        before = old[i]
+        status = [] if (i, j) in in_order else ["moved"]
+        similarity = None
+        if before.digest != unit.digest:
+            status.append("edited")
+            similarity = jaccard(unit_shingles("old", i, before), unit_shingles("new", j, unit))
+        if status:
+            changes.append(Change(", ".join(status), before, unit, similarity))
+    used = set(matched.values())
+    for i, unit in enumerate(old):
+        if i not in used:
+            changes.append(Change("removed", unit, None, None))
+    return changes
+
+
+# =============================================================================
+# REWORK FOLDERS
+# =============================================================================
+
+def document_files(folder: Path, snapshot: ModuleSnapshot | None = None) -> dict[str, Path | None]:
+    """The brief, speaker notes and presentation of a rework folder."""
+    snapshot = snapshot or scan_module(folder, recursive=False)
+    deliverables = None
+    if snapshot.exists("module.yaml"):
+        try:
+            deliverables = (safe_load(read_text(folder / "module.yaml") or "") or {}).get("deliverables")
+        except Exception:
+            pass
+    return {name: deliverable_file(snapshot, deliverables, key, suffixes, hint)
+            for name, (key, suffixes, hint, _) in DOCUMENTS.items()}
+
+
+def diff_reworks(old_folder: Path, new_folder: Path) -> list[DocumentDiff]:
+    """Per-document diffs between two rework folders."""
+    old_files, new_files = document_files(old_folder), document_files(new_folder)
+    diffs = []
+    for name, (_, _, _, unit) in DOCUMENTS.items():
+        old_file, new_file = old_files[name], new_files[name]
+        if old_file is None and new_file is None:
+            continue
+        split = SPLITTERS[name]
+        old_units = split(read_text(old_file) or "")
+        new_units = split(read_text(new_file) or "")
+        diffs.append(DocumentDiff(
+            name, unit,
+            old_file.name if old_file else None, new_file.name if new_file else None,
+            len(old_units), len(new_units), diff_units(old_units, new_units),
+        ))
+    return diffs
+
+
+def module_folder(target: str) -> Path | None:
+    """Module folder for a module code, a module folder or a rework folder."""
+    if MODULE_CODE.match(target) and not Path(target).exists():
+        rework = discover_source_path(target.upper())
+        return rework.parent if rework else None
+    path = Path(target)
+    if find_existing_reworks(path):
+        return path
+    return path.parent if path.is_dir() else None
+
+
+def rework_pairs(target: str, every: bool = False) -> list[tuple[Path, Path]]:
+    """
+    Consecutive (older, newer) rework pairs to compare.
+
+    A rework folder is compared with the one before it; a module folder or
+    code with its two newest (every consecutive pair with every=True).
+    """
+    folder = module_folder(target)
+    if folder is None:
+        return []
+    reworks = find_existing_reworks(folder)
+    path = Path(target)
+    if path in reworks:
+        index = reworks.index(path)
+        return [(reworks[index - 1], path)] if index else []
+    pairs = list(zip(reworks, reworks[1:]))
+    return pairs if every else pairs[-1:]
+
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+
+def describe(change: Change, unit: str) -> str:
+    """One summary line for a change."""
+    if change.status == "added":
+        return f"  + {unit} {change.new.position}: {change.new.title}"
+    if change.status == "removed":
+        return f"  - {unit} {change.old.position}: {change.old.title}"
+    symbol = ">" if change.status == "moved" else "~"
+    where = (f"{change.old.position} -> {change.new.position}"
+             if change.old.position != change.new.position else str(change.new.position))
+    title = change.new.title
+    if change.old.title != title:
+        title = f"{change.old.title} -> {title}"
+    line = f"  {symbol} {unit} {where}: {title}"
+    if "moved" in change.status and "edited" in change.status:
+        line += " (moved)"
+    if change.similarity is not None:
+        line += f" ({change.similarity:.0%} similar)"
+    return line
+
+
+def print_diff(old_folder: Path, new_folder: Path, diffs: list[DocumentDiff]) -> None:
+    print(f"{old_folder.name} -> {new_folder.name}  ({new_folder.parent})")
+    for diff in diffs:
+        files = diff.new_file or diff.old_file
+        if diff.old_file and diff.new_file and diff.old_file != diff.new_file:
+            files = f"{diff.old_file} -> {diff.new_file}"
+        print(f"\n{diff.document.capitalize()} ({files}): "
+              f"{diff.old_count} -> {diff.new_count} {diff.unit}s")
+        for change in diff.changes:
+            print(describe(change, diff.unit))
+        print("  " + ", ".join(f"{v} {k}" for k, v in diff.counts.items()))
+
+
+def diff_json(old_folder: Path, new_folder: Path, diffs: list[DocumentDiff]) -> dict:
+    def unit(u: Unit | None):
+        return {"position": u.position, "title": u.title} if u else None
+
+    return {
+        "old": str(old_folder),
+        "new": str(new_folder),
+        "documents": [{
+            "document": d.document,
+            "old_file": d.old_file,
+            "new_file": d.new_file,
+            "old_count": d.old_count,
+            "new_count": d.new_count,
+            "counts": d.counts,
+            "changes": [{"status": c.status, "old": unit(c.old), "new": unit(c.new),
+                         "similarity": None if c.similarity is None else round(c.similarity, 3)}
+                        for c in d.changes],
+        } for d in diffs],
+    }
+
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Summarize what changed between consecutive rework folders",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python rework_diff.py C1M3                          # Two newest reworks
+  python rework_diff.py "/path/to/Course 1/Module 3" --all
+  python rework_diff.py "/path/to/March 2026 ReWork"  # ...and the one before
+  python rework_diff.py OLD_FOLDER NEW_FOLDER --json
+        """
+    )
+    parser.add_argument("paths", nargs="+", metavar="PATH",
+                        help="Module code, module folder or rework folder; or two rework folders")
+    parser.add_argument("--all", action="store_true",
+                        help="Every consecutive pair of reworks, not just the newest")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+
+    args = parser.parse_args(argv)
+    if len(args.paths) > 2:
+        parser.error("give one module or rework, or two rework folders")
+    if len(args.paths) == 2:
+        pairs = [(Path(args.paths[0]), Path(args.paths[1]))]
+        missing = [p for p in pairs[0] if not p.is_dir()]
+        if missing:
+            print(f"Error: Not a folder: {missing[0]}")
+            return 3
+    else:
+        pairs = rework_pairs(args.paths[0], args.all)
+        if not pairs:
+            print(f"Error: No earlier rework to compare for {args.paths[0]}")
+            return 3
+
+    results = [(old, new, diff_reworks(old, new)) for old, new in pairs]
+    if args.json:
+        output = [diff_json(*result) for result in results]
+        print(json.dumps(output[0] if len(output) == 1 else output, indent=2))
+    else:
+        for i, result in enumerate(results):
+            if i:
+                print("\n" + "=" * 40 + "\n")
+            print_diff(*result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
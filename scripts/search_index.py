@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+"""
+Full-Text Search Index
+
+BM25-ranked search over the published courses (slides, Markdown sections,
+module.yaml) and each module's NotebookLM/Gemini research reports, without
+grepping the whole tree. The index lives in the workspace's git directory
+(.git/cdk/search/, see state_paths.py; SEARCH_INDEX) as one segment file
+per module, so publishing a module rewrites only its own segment.
+Segments are memory-mapped at query time:
+
+    header          course, module, document and term counts, offsets
+    doc lengths     uint32 per passage (for BM25 length normalization)
+    doc types       uint8 per passage (artifact type filter)
+    term table      sorted, fixed-size entries (binary searched in place)
+    postings        per term: varint doc delta, term frequency, positions
+    metadata        JSON: file, label and title of each passage
+
+Passages are the same units the Qdrant index uses: one per slide, one per
+Markdown section (see publish_module.split_index_chunks).
+
+Usage:
+    python search_index.py query "stakeholder register"
+    python search_index.py query '"planning fallacy" bias' --course 2 --type notes
+    python search_index.py update C1M1 C1M2
+    python search_index.py rebuild
+"""
+
+import argparse
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+from module_scan import ModuleSnapshot, scan_module
+from publish_module import split_index_chunks
+from rework_diff import HTML_TITLE, html_text
+from state_paths import state_dir
+from tracing import count, traced
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+WORKSPACE_ROOT = Path(os.environ.get("WORKSPACE_ROOT", "."))
+SEARCH_INDEX = Path(os.environ.get("SEARCH_INDEX", state_dir(WORKSPACE_ROOT) / "search"))
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+DEFAULT_LIMIT = 10
+
+REPORT_NAME = re.compile(r'^(NotebookLM|Gemini)_Report_.*\.md$', re.IGNORECASE)
+MODULE_CODE = re.compile(r'^C(\d+)M(\d+)$', re.IGNORECASE)
+TOKEN = re.compile(r'\w+')
+QUERY_PART = re.compile(r'"([^"]*)"|(\S+)')
+
+ARTIFACT_TYPES = ("presentation", "brief", "notes", "outline", "changelog", "context",
+                  "module", "report", "other")
+
+SEGMENT_MAGIC = b"CDKSRCH1"
+SEGMENT_FORMAT = 1
+SEGMENT_SUFFIX = ".idx"
+# magic, format, course, module, docs, terms, total length, then offsets of
+# lengths, types, term table, term strings, postings and metadata (+ size)
+HEADER = struct.Struct("<8sIIIIIQQQQQQQQ")
+TERM = struct.Struct("<IIIII")  # string offset, string length, df, postings offset, length
+
+
+class Passage(NamedTuple):
+    """One indexed unit of a module."""
+    file: str
+    label: str
+    title: str
+    type: str
+    tokens: list[str]
+
+
+class Hit(NamedTuple):
+    score: float
+    module: str
+    type: str
+    file: str
+    label: str
+    title: str
+
+
+# =============================================================================
+# PASSAGES
+# =============================================================================
+
+def artifact_type(name: str) -> str:
+    """Artifact type of a published or research file, from its name."""
+    base = name.rsplit("/", 1)[-1]
+    lower = base.lower()
+    if REPORT_NAME.match(base):
+        return "report"
+    if lower.endswith((".html", ".htm")):
+        return "presentation"
+    if lower in ("module.yaml", "module.yml"):
+        return "module"
+    for kind in ("brief", "notes", "outline", "changelog", "context"):
+        if kind in lower:
+            return kind
+    return "other"
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN.findall(text.lower())
+
+
+def file_passages(name: str, data: bytes) -> list[Passage]:
+    """Passages of one file: slides, Markdown sections or the whole file."""
+    text = data.decode('utf-8', 'replace')
+    kind = artifact_type(name)
+    passages = []
+    for label, chunk in split_index_chunks(name, text).items():
+        if name.lower().endswith(('.html', '.htm')):
+            heading = HTML_TITLE.search(chunk)
+            title = html_text(heading.group(1)) if heading else ""
+            chunk = html_text(chunk)
+        else:
+            title = chunk.lstrip("# \n").split("\n", 1)[0].strip() if chunk.startswith("#") else ""
+        tokens = tokenize(chunk)
+        if tokens:
+            passages.append(Passage(name, label, title[:120], kind, tokens))
+    return passages
+
+
+def research_reports(snapshot: ModuleSnapshot) -> dict[str, bytes]:
+    """NotebookLM/Gemini report files anywhere in a source folder."""
+    return {"/".join(entry.parts): entry.path.read_bytes()
+            for entry in snapshot.files if REPORT_NAME.match(entry.name)}
+
+
+# =============================================================================
+# WRITING
+# =============================================================================
+
+def put_varint(out: bytearray, n: int) -> None:
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def varints(data: bytes) -> Iterator[int]:
+    n = shift = 0
+    for byte in data:
+        n |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield n
+            n = shift = 0
+
+
+def segment_path(module_code: str, index_dir: Path = SEARCH_INDEX) -> Path:
+    return index_dir / f"{module_code.upper()}{SEGMENT_SUFFIX}"
+
+
+def encode_segment(module_code: str, passages: list[Passage]) -> bytes:
+    """Segment file contents for a module's passages."""
+    match = MODULE_CODE.match(module_code)
+    course, module = (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+    # term -> [(doc, positions)], docs in increasing order
+    postings: dict[str, list[tuple[int, list[int]]]] = defaultdict(list)
+    for doc, passage in enumerate(passages):
+        positions: dict[str, list[int]] = defaultdict(list)
+        for position, token in enumerate(passage.tokens):
+            positions[token].append(position)
+        for term, where in positions.items():
+            postings[term].append((doc, where))
+
+    terms = sorted(postings, key=lambda t: t.encode('utf-8'))
+    strings = bytearray()
+    table = bytearray()
+    blob = bytearray()
+    for term in terms:
+        encoded = term.encode('utf-8')
+        start = len(blob)
+        previous_doc = 0
+        for doc, where in postings[term]:
+            put_varint(blob, doc - previous_doc)
+            previous_doc = doc
+            put_varint(blob, len(where))
+            previous = 0
+            for position in where:
+                put_varint(blob, position - previous)
+                previous = position
+        table += TERM.pack(len(strings), len(encoded), len(postings[term]), start,
+                           len(blob) - start)
+        strings += encoded
+
+    lengths = struct.pack(f"<{len(passages)}I", *(len(p.tokens) for p in passages))
+    types = bytes(ARTIFACT_TYPES.index(p.type) for p in passages)
+    meta = json.dumps({"module": module_code.upper(),
+                       "docs": [[p.file, p.label, p.title] for p in passages]}).encode('utf-8')
+
+    offset = HEADER.size
+    sections = []
+    for part in (lengths, types, table, strings, blob, meta):
+        sections.append(offset)
+        offset += len(part)
+    header = HEADER.pack(SEGMENT_MAGIC, SEGMENT_FORMAT, course, module, len(passages), len(terms),
+                         sum(len(p.tokens) for p in passages), *sections, len(meta))
+    return b"".join([header, lengths, types, bytes(table), bytes(strings), bytes(blob), meta])
+
+
+@traced("search.index")
+def index_module(module_code: str, files: dict[str, bytes],
+                 reports: dict[str, bytes] | None = None,
+                 index_dir: Path = SEARCH_INDEX) -> int:
+    """
+    Replace a module's segment; returns the number of passages indexed.
+
+    files are the published files (name -> contents), reports the research
+    reports (relative path -> contents).
+    """
+    passages = []
+    for name, data in sorted({**files, **(reports or {})}.items()):
+        passages.extend(file_passages(name, data))
+        count(files=1, bytes_read=len(data))
+
+    index_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=index_dir, prefix=".segment-")
+    with os.fdopen(fd, 'wb') as f:
+        f.write(encode_segment(module_code, passages))
+    os.replace(tmp, segment_path(module_code, index_dir))
+    return len(passages)
+
+
+def remove_module(module_code: str, index_dir: Path = SEARCH_INDEX) -> bool:
+    try:
+        segment_path(module_code, index_dir).unlink()
+        return True
+    except FileNotFoundError:
+        return False
+
+
+# =============================================================================
+# READING
+# =============================================================================
+
+class Segment:
+    """A memory-mapped module segment."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.course, self.module, self.doc_count, self.term_count,
+         self.total_length, self.lengths_at, self.types_at, self.terms_at, self.strings_at,
+         self.postings_at, self.meta_at, self.meta_size) = HEADER.unpack_from(self.data, 0)
+        if magic != SEGMENT_MAGIC or version != SEGMENT_FORMAT:
+            self.data.close()
+            raise ValueError(f"{path.name}: not a search segment (rebuild the index)")
+        self._meta = None
+
+    def close(self) -> None:
+        self.data.close()
+
+    def lookup(self, term: str) -> tuple[int, int, int] | None:
+        """(df, postings offset, postings length) of term, or None."""
+        key = term.encode('utf-8')
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            at, size, df, offset, length = TERM.unpack_from(self.data, self.terms_at + mid * TERM.size)
+            probe = self.data[self.strings_at + at:self.strings_at + at + size]
+            if probe == key:
+                return df, self.postings_at + offset, length
+            if probe < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def postings(self, entry: tuple[int, int, int]) -> Iterator[tuple[int, list[int]]]:
+        """(doc, positions) for a looked-up term."""
+        _, offset, length = entry
+        numbers = varints(self.data[offset:offset + length])
+        doc = 0
+        for delta in numbers:
+            doc += delta
+            position = 0
+            where = []
+            for _ in range(next(numbers)):
+                position += next(numbers)
+                where.append(position)
+            yield doc, where
+
+    def length(self, doc: int) -> int:
+        return struct.unpack_from("<I", self.data, self.lengths_at + doc * 4)[0]
+
+    def type(self, doc: int) -> str:
+        return ARTIFACT_TYPES[self.data[self.types_at + doc]]
+
+    @property
+    def meta(self) -> dict:
+        if self._meta is None:
+            self._meta = json.loads(self.data[self.meta_at:self.meta_at + self.meta_size])
+        return self._meta
+
+
+def open_segments(index_dir: Path = SEARCH_INDEX) -> list[Segment]:
+    segments = []
+    for path in sorted(index_dir.glob(f"*{SEGMENT_SUFFIX}")):
+        try:
+            segments.append(Segment(path))
+        except (OSError, ValueError, struct.error):
+            continue  # Empty or foreign file: skipped until rebuilt
+    return segments
+
+
+def parse_query(query: str) -> tuple[list[str], list[list[str]]]:
+    """Free terms and "quoted phrases" (as token lists) of a query."""
+    terms, phrases = [], []
+    for phrase, word in QUERY_PART.findall(query):
+        tokens = tokenize(phrase or word)
+        if phrase and len(tokens) > 1:
+            phrases.append(tokens)
+        else:
+            terms.extend(tokens)
+    return terms, phrases
+
+
+def contains_phrase(positions: list[list[int]]) -> bool:
+    """True if some start p has term i at p + i for every term."""
+    later = [set(p) for p in positions[1:]]
+    return any(all(start + i + 1 in where for i, where in enumerate(later))
+               for start in positions[0])
+
+
+@traced("search.query")
+def search(query: str, course: int | None = None, module: int | None = None,
+           types: Iterable[str] | None = None, limit: int = DEFAULT_LIMIT,
+           index_dir: Path = SEARCH_INDEX) -> list[Hit]:
+    """
+    Best-scoring passages for query.
+
+    Free terms are ranked with BM25 (any may match); every quoted phrase
+    must appear. Document frequencies and average length come from the
+    whole index, so filters narrow results without changing scores.
+    """
+    terms, phrases = parse_query(query)
+    wanted = sorted(set(terms).union(*phrases))
+    if not wanted:
+        return []
+    types = set(types or ())
+    segments = open_segments(index_dir)
+    try:
+        docs = sum(s.doc_count for s in segments)
+        average = sum(s.total_length for s in segments) / docs if docs else 0
+        entries = [{term: s.lookup(term) for term in wanted} for s in segments]
+        df = {term: sum(e[term][0] for e in entries if e[term]) for term in wanted}
+        idf = {term: math.log(1 + (docs - n + 0.5) / (n + 0.5)) for term, n in df.items()}
+
+        scored = []
+        for segment, entry in zip(segments, entries):
+            if course is not None and segment.course != course:
+                continue
+            if module is not None and segment.module != module:
+                continue
+            if any(entry[t] is None for phrase in phrases for t in phrase):
+                continue
+            scores: dict[int, float] = defaultdict(float)
+            positions: dict[int, dict[str, list[int]]] = defaultdict(dict)
+            for term in wanted:
+                if entry[term] is None:
+                    continue
+                for doc, where in segment.postings(entry[term]):
+                    if types and segment.type(doc) not in types:
+                        continue
+                    tf = len(where)
+                    norm = K1 * (1 - B + B * segment.length(doc) / average)
+                    scores[doc] += idf[term] * tf * (K1 + 1) / (tf + norm)
+                    if phrases:
+                        positions[doc][term] = where
+            for doc, score in scores.items():
+                if all(all(t in positions[doc] for t in phrase)
+                       and contains_phrase([positions[doc][t] for t in phrase])
+                       for phrase in phrases):
+                    scored.append((score, segment, doc))
+        count(segments=len(segments))
+
+        hits = []
+        for score, segment, doc in heapq.nlargest(limit, scored, key=lambda s: s[0]):
+            file, label, title = segment.meta["docs"][doc]
+            hits.append(Hit(round(score, 3), segment.meta["module"], segment.type(doc),
+                            file, label, title))
+        return hits
+    finally:
+        for segment in segments:
+            segment.close()
+
+
+def index_stats(index_dir: Path = SEARCH_INDEX) -> dict[str, int]:
+    segments = open_segments(index_dir)
+    try:
+        return {
+            "modules": len(segments),
+            "passages": sum(s.doc_count for s in segments),
+            "tokens": sum(s.total_length for s in segments),
+            "bytes": sum(s.path.stat().st_size for s in segments),
+        }
+    finally:
+        for segment in segments:
+            segment.close()
+
+
+# =============================================================================
+# MODULE SOURCES
+# =============================================================================
+
+def published_files(module_code: str) -> dict[str, bytes] | None:
+    """A module's published files, from courses/ or the object store."""
+    from publish_module import get_dest_path, read_published_files
+
+    dest = get_dest_path(module_code)
+    if dest.is_dir():
+        return read_published_files(module_code, scan_module(dest, recursive=False))
+    from object_store import ObjectStore
+    store = ObjectStore()
+    if store.load_manifest(module_code) is not None:
+        return read_published_files(module_code, None, store)
+    return None
+
+
+def published_codes() -> list[str]:
+    """Codes of every module in courses/google-pm/ or the object store."""
+    from archive_export import published_modules
+
+    return list(published_modules())
+
+
+def update_module(module_code: str, index_dir: Path = SEARCH_INDEX) -> int | None:
+    """Re-index a published module and its source reports; None if unpublished."""
+    from publish_module import discover_source_path
+
+    files = published_files(module_code)
+    if files is None:
+        return None
+    source = discover_source_path(module_code)
+    reports = research_reports(scan_module(source)) if source else {}
+    return index_module(module_code, files, reports, index_dir)
+
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def print_hits(hits: list[Hit], seconds: float) -> None:
+    for n, hit in enumerate(hits, 1):
+        title = f"  {hit.title}" if hit.title else ""
+        print(f"{n:>3}. {hit.score:>6.2f}  {hit.module:<6} {hit.type:<12} {hit.label}{title}")
+    print(f"\n{len(hits)} result(s) in {seconds * 1000:.1f} ms")
+
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Search published courses and research reports",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python search_index.py query "stakeholder register"
+  python search_index.py query '"planning fallacy" estimate' --course 2
+  python search_index.py query "risk" --type notes --type brief --limit 20
+  python search_index.py update C1M1        # Re-index one module
+  python search_index.py rebuild            # Every published module
+        """
+    )
+    parser.add_argument("--index", type=Path, default=SEARCH_INDEX,
+                        help=f"Index directory (default: {SEARCH_INDEX})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    query = sub.add_parser("query", help="Search the index")
+    query.add_argument("query", help='Terms and "quoted phrases"')
+    query.add_argument("--course", type=int, help="Course number")
+    query.add_argument("--module", type=int, help="Module number")
+    query.add_argument("--type", action="append", choices=ARTIFACT_TYPES,
+                       help="Artifact type (repeatable)")
+    query.add_argument("--limit", type=int, default=DEFAULT_LIMIT,
+                       help=f"Results to show (default: {DEFAULT_LIMIT})")
+    query.add_argument("--json", action="store_true", help="Output as JSON")
+
+    update = sub.add_parser("update", help="Re-index published modules")
+    update.add_argument("modules", nargs="+", help="Module codes (e.g. C1M1)")
+
+    sub.add_parser("rebuild", help="Re-index every published module, dropping others")
+    sub.add_parser("stats", help="Index size")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "query":
+        start = time.perf_counter()
+        hits = search(args.query, args.course, args.module, args.type, args.limit, args.index)
+        seconds = time.perf_counter() - start
+        if args.json:
+            print(json.dumps([h._asdict() for h in hits], indent=2))
+        else:
+            print_hits(hits, seconds)
+        return 0
+
+    if args.command == "stats":
+        print(", ".join(f"{k}: {v}" for k, v in index_stats(args.index).items()))
+        return 0
+
+    if args.command == "rebuild":
+        codes = published_codes()
+        for path in args.index.glob(f"*{SEGMENT_SUFFIX}"):
+            if path.stem not in codes:
+                remove_module(path.stem, args.index)
+    else:
+        codes = [code.upper() for code in args.modules]
+
+    missing = 0
+    for code in codes:
+        passages = update_module(code, args.index)
+        if passages is None:
+            print(f"[FAIL] {code}: not published")
+            missing += 1
+        else:
+            print(f"[OK] {code}: {passages} passage(s)")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
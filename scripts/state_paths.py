@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+State and Cache Locations
+
+Where the scripts keep files they generate for themselves, so nothing lands
+in whatever directory a command happens to run from:
+
+- CACHE_DIR: caches keyed by content or URL, and indexes rebuilt from the
+  course base (such as the catalog). $CDK_CACHE_DIR, else
+  $XDG_CACHE_HOME/curriculum-dev-kit (~/.cache/curriculum-dev-kit).
+- state_dir(workspace): state belonging to one published workspace. Kept
+  in the workspace's git directory (.git/cdk), where it is never
+  committed; $CDK_STATE_DIR overrides it, and a workspace outside git uses
+  <workspace>/.cdk.
+
+Every path built on these still has its own environment variable
+(CATALOG_DB, ...) that takes precedence.
+
+Usage:
+    from state_paths import CACHE_DIR, state_dir
+
+    CATALOG_DB = Path(os.environ.get("CATALOG_DB", CACHE_DIR / "catalog.db"))
+    lock_path = state_dir(WORKSPACE_ROOT) / "publish.lock"
+"""
+
+import os
+from pathlib import Path
+
+CACHE_DIR = Path(os.environ.get("CDK_CACHE_DIR")
+                 or Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+                 / "curriculum-dev-kit")
+
+
+def git_dir(path: Path) -> Path | None:
+    """
+    The git directory of the repository containing path, or None.
+
+    Reads .git (a directory, or a "gitdir:" file in worktrees and
+    submodules) directly rather than running git, so importing is free.
+    """
+    path = path.resolve()
+    for folder in (path, *path.parents):
+        dot_git = folder / ".git"
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            text = dot_git.read_text(encoding='utf-8', errors='replace').strip()
+            if text.startswith("gitdir:"):
+                return (folder / text[len("gitdir:"):].strip()).resolve()
+    return None
+
+
+def state_dir(workspace: Path) -> Path:
+    """Directory for workspace's own state (see module docstring)."""
+    if os.environ.get("CDK_STATE_DIR"):
+        return Path(os.environ["CDK_STATE_DIR"])
+    repo = git_dir(workspace)
+    return repo / "cdk" if repo else workspace / ".cdk"
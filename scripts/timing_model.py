@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Slide Budget Timing Model
+
+One model for how many slides fit in a session, shared by project_init
+(changelog and context bundle budgets), validate_brief (timing sanity
+check) and the brief template / tools/timing-calculator.html:
+
+    presentation minutes = total - activities - discussion - buffer
+    maximum slides       = presentation minutes / minutes per slide
+    content slides       = maximum slides - REQUIRED_SLIDES
+
+The batch API evaluates the model with NumPy over whole arrays of
+modules and what-if scenarios (pace, buffer, activity and discussion
+time) at once. NumPy is optional: without it the same sweeps run in pure
+Python, only slower.
+
+Usage:
+    python timing_model.py budget 90 --activities 15 --discussion 10 --buffer 5
+    python timing_model.py sweep --pace 2:3.5:0.5 --buffer 0,3,5
+    python timing_model.py sweep --durations 45,60,90,120 --activities 0:30:5 --json
+"""
+
+import argparse
+import functools
+import itertools
+import json
+import math
+import os
+import re
+import statistics
+import sys
+from typing import NamedTuple
+
+from tracing import traced
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+BUFFER_MINUTES = int(os.environ.get("BUFFER_MINUTES", 3))
+MINUTES_PER_SLIDE = 2.5
+
+# Title, objectives, summary and similar slides (see the timing calculator)
+REQUIRED_SLIDES = 4
+
+# Plausible pace range for a stated budget (validate_brief)
+SLOWEST_PACE = 4
+FASTEST_PACE = 1.5
+
+# How fractional slide counts are resolved. The brief template and timing
+# calculator round down; project_init has always rounded to nearest.
+ROUNDING = ("floor", "nearest")
+
+# Scenario axes a sweep can vary, in TimingInputs field order
+AXES = ("activities", "discussion", "buffer", "pace")
+
+# "Timing Calculations" lines of a brief (templates/02-presentation-brief.md)
+TIMING_LINES = {
+    "total": re.compile(r"Total\s*session.*?(\d+)\s*min", re.IGNORECASE),
+    "activities": re.compile(r"Minus\s*(?:planned\s*)?activit\w*.*?(\d+)\s*min", re.IGNORECASE),
+    "discussion": re.compile(r"Minus\s*(?:structured\s*)?discussion.*?(\d+)\s*min", re.IGNORECASE),
+    "buffer": re.compile(r"Minus\s*(?:transitions/)?buffer.*?(\d+)\s*min", re.IGNORECASE),
+    "pace": re.compile(r"÷\s*(\d+(?:\.\d+)?)\s*min", re.IGNORECASE),
+    "budget": re.compile(r"(\d+)\s*slides?\s*(?:maximum|budget)", re.IGNORECASE),
+}
+TIMING_SECTION = re.compile(r"Timing\s*Calculations.*?slides?\s*(?:maximum|budget)",
+                            re.IGNORECASE | re.DOTALL)
+
+
+class TimingInputs(NamedTuple):
+    """Minutes of one session; pace is minutes per slide."""
+    total: int
+    activities: int = 0
+    discussion: int = 0
+    buffer: int = BUFFER_MINUTES
+    pace: float = MINUTES_PER_SLIDE
+
+
+class SlideBudget(NamedTuple):
+    presentation_minutes: int
+    max_slides: int
+    content_slides: int
+
+
+class ScenarioResult(NamedTuple):
+    """Catalog-wide totals for one combination of scenario axis values."""
+    scenario: dict  # Axis -> value; axes not swept keep each module's own
+    total_slides: int
+    content_slides: int
+    min_slides: int
+    median_slides: float
+    max_slides: int
+    over_budget: int  # Modules whose stated budget exceeds the scenario maximum
+
+
+# =============================================================================
+# SCALAR MODEL
+# =============================================================================
+
+def presentation_minutes(total: int, activities: int = 0, discussion: int = 0,
+                         buffer: int = BUFFER_MINUTES) -> int:
+    """Minutes left for slides once activities, discussion and buffer are taken."""
+    return max(0, total - activities - discussion - buffer)
+
+
+def max_slides(total: int, activities: int = 0, discussion: int = 0,
+               buffer: int = BUFFER_MINUTES, pace: float = MINUTES_PER_SLIDE,
+               rounding: str = "floor") -> int:
+    """Slides that fit in the presentation time at pace minutes per slide."""
+    slides = presentation_minutes(total, activities, discussion, buffer) / pace
+    return math.floor(slides) if rounding == "floor" else round(slides)
+
+
+def slide_budget(inputs: TimingInputs, rounding: str = "floor") -> SlideBudget:
+    """Presentation minutes, maximum slides and content slides for one session."""
+    slides = max_slides(*inputs, rounding=rounding)
+    return SlideBudget(presentation_minutes(*inputs[:4]), slides,
+                       max(0, slides - REQUIRED_SLIDES))
+
+
+def budget_range(total: int) -> tuple[int, int]:
+    """
+    Smallest and largest plausible slide budget for a session.
+
+    Spans SLOWEST_PACE to FASTEST_PACE with nothing deducted, leaving
+    room for activities and discussion at the low end.
+    """
+    return (max_slides(total, buffer=0, pace=SLOWEST_PACE),
+            max_slides(total, buffer=0, pace=FASTEST_PACE))
+
+
+def parse_timing(text: str) -> tuple[TimingInputs, int | None] | None:
+    """
+    Timing inputs and stated slide budget from a brief's Timing
+    Calculations block, or None if it has no total session time.
+
+    Lines left blank take the TimingInputs defaults: no activities or
+    discussion, BUFFER_MINUTES of buffer, MINUTES_PER_SLIDE pace.
+    """
+    section = TIMING_SECTION.search(text)
+    if not section:
+        return None
+    block = section.group(0)
+    found = {name: pattern.search(block) for name, pattern in TIMING_LINES.items()}
+    if not found["total"]:
+        return None
+
+    values = {name: int(match.group(1)) for name, match in found.items()
+              if match and name not in ("pace", "budget")}
+    if found["pace"]:
+        values["pace"] = float(found["pace"].group(1))
+    budget = int(found["budget"].group(1)) if found["budget"] else None
+    return TimingInputs(**values), budget
+
+
+# =============================================================================
+# BATCH MODEL
+# =============================================================================
+
+@functools.cache
+def load_numpy():
+    """NumPy, imported on first batch use; None when not installed."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def budget_arrays(total, activities=0, discussion=0, buffer=BUFFER_MINUTES,
+                  pace=MINUTES_PER_SLIDE, rounding: str = "floor"):
+    """
+    slide_budget over NumPy arrays (or anything broadcastable to them).
+
+    Returns (presentation minutes, max slides, content slides) arrays of
+    the broadcast shape. Requires NumPy.
+    """
+    np = load_numpy()
+    if np is None:
+        raise ImportError("NumPy required for budget_arrays. Install with: pip install numpy")
+    minutes = np.maximum(0, np.asarray(total) - activities - discussion - buffer)
+    exact = minutes / np.asarray(pace, dtype=float)
+    # np.rint rounds half to even, like round()
+    slides = (np.floor(exact) if rounding == "floor" else np.rint(exact)).astype(np.int64)
+    return minutes, slides, np.maximum(0, slides - REQUIRED_SLIDES)
+
+
+def scenario_grid(axes: dict[str, list]) -> list[dict]:
+    """Every combination of axis values, the last axis varying fastest."""
+    names = [a for a in AXES if a in axes]
+    return [dict(zip(names, combo)) for combo in itertools.product(*(axes[a] for a in names))]
+
+
+@traced("timing.sweep")
+def sweep(modules: list[TimingInputs], budgets: list[int | None],
+          axes: dict[str, list], rounding: str = "floor",
+          use_numpy: bool | None = None) -> list[ScenarioResult]:
+    """
+    Evaluate every scenario in the grid of axes against every module.
+
+    axes maps AXES names to the values to try; an axis not given keeps
+    each module's own value. budgets are the modules' stated slide
+    budgets (None when unknown). Uses NumPy when available unless
+    use_numpy is False.
+    """
+    grid = scenario_grid(axes)
+    if not modules or not grid:
+        return []
+    if use_numpy is None:
+        use_numpy = load_numpy() is not None
+    if use_numpy:
+        return _sweep_numpy(modules, budgets, axes, grid, rounding)
+
+    results = []
+    for scenario in grid:
+        slides = [max_slides(*m._replace(**scenario), rounding=rounding) for m in modules]
+        results.append(ScenarioResult(
+            scenario,
+            sum(slides),
+            sum(max(0, s - REQUIRED_SLIDES) for s in slides),
+            min(slides),
+            statistics.median(slides),
+            max(slides),
+            sum(1 for s, b in zip(slides, budgets) if b is not None and b > s),
+        ))
+    return results
+
+
+def _sweep_numpy(modules, budgets, axes, grid, rounding) -> list[ScenarioResult]:
+    """sweep() as one (scenarios x modules) array computation."""
+    np = load_numpy()
+    own = np.array(modules, dtype=float).T  # One row per TimingInputs field
+    names = [a for a in AXES if a in axes]
+    mesh = np.meshgrid(*(np.asarray(axes[a], dtype=float) for a in names), indexing="ij")
+    swept = {name: values.reshape(-1, 1) for name, values in zip(names, mesh)}
+
+    columns = [swept.get(field, own[i][np.newaxis, :])
+               for i, field in enumerate(TimingInputs._fields)]
+    _, slides, content = budget_arrays(*columns, rounding=rounding)
+    slides = np.broadcast_to(slides, (len(grid), len(modules)))
+
+    stated = np.array([-1 if b is None else b for b in budgets])
+    over = ((stated > slides) & (stated >= 0)).sum(axis=1)
+    totals = slides.sum(axis=1)
+    contents = np.broadcast_to(content, slides.shape).sum(axis=1)
+    lows, highs = slides.min(axis=1), slides.max(axis=1)
+    medians = np.median(slides, axis=1)
+
+    return [ScenarioResult(scenario, int(totals[i]), int(contents[i]), int(lows[i]),
+                           float(medians[i]), int(highs[i]), int(over[i]))
+            for i, scenario in enumerate(grid)]
+
+
+# =============================================================================
+# CATALOG
+# =============================================================================
+
+def catalog_inputs(conn, all_reworks: bool = False) -> tuple[list[str], list[TimingInputs],
+                                                               list[int | None], int]:
+    """
+    Timing inputs of catalog modules whose brief has timing calculations.
+
+    Returns (codes, inputs, stated budgets, modules skipped for lack of
+    a total session time).
+    """
+    where = "" if all_reworks else "WHERE latest = 1"
+    rows = conn.execute(f"""
+        SELECT code, session_minutes, activity_minutes, discussion_minutes,
+               buffer_minutes, slide_pace, slide_budget
+        FROM modules {where} ORDER BY course, module, rework_date, rework
+    """).fetchall()
+
+    codes, inputs, budgets, skipped = [], [], [], 0
+    for row in rows:
+        if row["session_minutes"] is None:
+            skipped += 1
+            continue
+        codes.append(row["code"] or "?")
+        inputs.append(TimingInputs(row["session_minutes"], row["activity_minutes"],
+                                   row["discussion_minutes"], row["buffer_minutes"],
+                                   row["slide_pace"]))
+        budgets.append(row["slide_budget"])
+    return codes, inputs, budgets, skipped
+
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def parse_values(spec: str) -> list[float]:
+    """Comma-separated values and START:STOP:STEP ranges (STOP included)."""
+    values = []
+    for part in spec.split(","):
+        if ":" in part:
+            start, stop, step = (float(x) for x in part.split(":"))
+            if step <= 0:
+                raise argparse.ArgumentTypeError(f"range step must be positive: {part}")
+            count = int(math.floor((stop - start) / step + 1e-9)) + 1
+            values.extend(round(start + i * step, 6) for i in range(count))
+        elif part.strip():
+            values.append(float(part))
+    # Whole minutes stay ints so output reads naturally
+    return [int(v) if v == int(v) else v for v in values]
+
+
+def print_budget(inputs: TimingInputs, budget: SlideBudget) -> None:
+    """The calculation steps, laid out like the brief template."""
+    print(f"Total session time:           {inputs.total} minutes")
+    print(f"Minus planned activities:     -{inputs.activities} minutes")
+    print(f"Minus structured discussion:  -{inputs.discussion} minutes")
+    print(f"Minus transitions/buffer:     -{inputs.buffer} minutes")
+    print(f"= Actual presentation time:   {budget.presentation_minutes} minutes")
+    print()
+    print(f"÷ {inputs.pace} minutes per slide =     {budget.max_slides} slides maximum")
+    print(f"Reserved for required:        -{REQUIRED_SLIDES} slides")
+    print(f"= Content slides:             {budget.content_slides} slides")
+
+
+def print_results(results: list[ScenarioResult], module_count: int, limit: int) -> None:
+    """Scenario results as a plain-text table."""
+    axes = list(results[0].scenario) if results else []
+    header = ("  ".join(f"{a.title():>10}" for a in axes)
+              + f"  {'Slides':>8} {'Content':>8} {'Min':>5} {'Median':>7} {'Max':>5} {'Over':>5}")
+    print(header)
+    print("-" * len(header))
+    for r in results[:limit]:
+        print("  ".join(f"{r.scenario[a]:>10}" for a in axes)
+              + f"  {r.total_slides:>8} {r.content_slides:>8} {r.min_slides:>5} "
+                f"{r.median_slides:>7g} {r.max_slides:>5} {r.over_budget:>5}")
+    if len(results) > limit:
+        print(f"... {len(results) - limit} more scenario(s) (use --limit or --json)")
+    print(f"\n{len(results)} scenario(s) x {module_count} module(s)")
+
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Slide budgets for one session or what-if sweeps across the catalog",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python timing_model.py budget 90 --activities 15 --discussion 10 --buffer 5
+  python timing_model.py sweep --pace 2:3.5:0.5 --buffer 0,3,5
+  python timing_model.py sweep --refresh --activities 0:30:5 --limit 10
+  python timing_model.py sweep --durations 45,60,90,120 --pace 2,2.5,3 --json
+
+Sweep values are comma-separated lists or START:STOP:STEP ranges. Axes
+not given keep each module's own value from its brief; "Over" counts
+modules whose stated budget exceeds the scenario's maximum.
+        """
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rounding_help = "Round slide counts down (brief template) or to nearest (project_init)"
+
+    budget_parser = subparsers.add_parser("budget", help="Slide budget for one session")
+    budget_parser.add_argument("total", type=int, help="Total session minutes")
+    budget_parser.add_argument("--activities", type=int, default=0)
+    budget_parser.add_argument("--discussion", type=int, default=0)
+    budget_parser.add_argument("--buffer", type=int, default=BUFFER_MINUTES,
+                               help=f"Buffer minutes (default: {BUFFER_MINUTES})")
+    budget_parser.add_argument("--pace", type=float, default=MINUTES_PER_SLIDE,
+                               help=f"Minutes per slide (default: {MINUTES_PER_SLIDE})")
+    budget_parser.add_argument("--rounding", choices=ROUNDING, default="floor", help=rounding_help)
+    budget_parser.add_argument("--json", action="store_true", help="Output as JSON")
+
+    sweep_parser = subparsers.add_parser("sweep", help="What-if scenarios across modules")
+    for axis in AXES:
+        sweep_parser.add_argument(f"--{axis}", type=parse_values, metavar="VALUES",
+                                  help=f"{axis.title()} values to try")
+    sweep_parser.add_argument("--durations", type=parse_values, metavar="MINUTES",
+                              help="Sweep these session lengths instead of catalog modules")
+    sweep_parser.add_argument("--refresh", action="store_true",
+                              help="Refresh the catalog before reading it")
+    sweep_parser.add_argument("--all-reworks", action="store_true",
+                              help="Include superseded rework folders")
+    sweep_parser.add_argument("--rounding", choices=ROUNDING, default="floor", help=rounding_help)
+    sweep_parser.add_argument("--limit", type=int, default=50,
+                              help="Scenarios to print (default: 50)")
+    sweep_parser.add_argument("--json", action="store_true", help="Output as JSON")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "budget":
+        if args.pace <= 0:
+            parser.error("--pace must be positive")
+        inputs = TimingInputs(args.total, args.activities, args.discussion, args.buffer, args.pace)
+        budget = slide_budget(inputs, args.rounding)
+        if args.json:
+            print(json.dumps({**inputs._asdict(), **budget._asdict()}, indent=2))
+        else:
+            print_budget(inputs, budget)
+        return 0
+
+    if any(p <= 0 for p in args.pace or []):
+        parser.error("--pace values must be positive")
+    axes = {axis: getattr(args, axis) for axis in AXES if getattr(args, axis)}
+
+    skipped = 0
+    if args.durations:
+        inputs = [TimingInputs(int(d)) for d in args.durations]
+        budgets = [None] * len(inputs)
+    else:
+        import catalog
+        conn = catalog.connect()
+        if args.refresh:
+            catalog.refresh_catalog(conn)
+        _, inputs, budgets, skipped = catalog_inputs(conn, args.all_reworks)
+        conn.close()
+        if not inputs:
+            print("No catalog modules with timing calculations "
+                  "(run `catalog refresh`, or pass --durations)")
+            return 1
+
+    results = sweep(inputs, budgets, axes, args.rounding)
+    if args.json:
+        rows = [{**r.scenario, **r._asdict()} for r in results]
+        for row in rows:
+            del row["scenario"]
+        print(json.dumps(rows, indent=2))
+        return 0
+
+    print_results(results, len(inputs), args.limit)
+    if skipped:
+        print(f"{skipped} module(s) without timing calculations skipped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Step Timing and Tracing
+
+A small span layer shared by the scripts. Each span records its wall time
+plus counters such as bytes read, files touched and retries, and is written
+as one JSON line when it ends. Tracing is off unless `--trace FILE` is
+given or CDK_TRACE is set; while off, span() returns a shared no-op object.
+
+Child processes (e.g. the validator run by publish) inherit CDK_TRACE and
+append to the same file.
+
+Usage:
+    from tracing import count, span, traced
+
+    @traced("publish.git")
+    def git_commit(...): ...
+
+    with span("publish.hash", module=code) as s:
+        ...
+        s.add(files=1, bytes_read=len(data))
+    count(retries=1)  # Adds to the innermost open span
+
+    python tracing.py summarize trace.jsonl
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+TRACE_ENV = "CDK_TRACE"
+
+_lock = threading.Lock()
+_local = threading.local()
+_trace_file = None
+_run_id = None
+
+
+class Span:
+    """An open span; written to the trace file when the with-block exits."""
+    __slots__ = ("name", "attrs", "counters", "start", "started_at", "parent", "depth")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+        self.counters: dict[str, int] = {}
+
+    def add(self, **counters: int) -> None:
+        for key, value in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def __enter__(self) -> "Span":
+        stack = _stack()
+        self.parent = stack[-1].name if stack else None
+        self.depth = len(stack)
+        stack.append(self)
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        wall_ms = (time.perf_counter() - self.start) * 1000
+        stack = _stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        record = {
+            "run": _run_id,
+            "pid": os.getpid(),
+            "span": self.name,
+            "parent": self.parent,
+            "depth": self.depth,
+            "start": round(self.started_at, 6),
+            "wall_ms": round(wall_ms, 3),
+            **self.counters,
+        }
+        if self.attrs:
+            record["attrs"] = self.attrs
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        _write(record)
+        return False
+
+
+class _NullSpan:
+    """Returned while tracing is off: entering, exiting and add() do nothing."""
+    __slots__ = ()
+
+    def add(self, **counters: int) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+def _stack() -> list[Span]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _write(record: dict) -> None:
+    line = json.dumps(record, separators=(',', ':')) + "\n"
+    with _lock:
+        if _trace_file is not None:
+            _trace_file.write(line)
+            _trace_file.flush()
+
+
+def enable(path: str | Path) -> None:
+    """Start appending spans to path (also for child processes)."""
+    global _trace_file, _run_id
+    if _trace_file is not None:
+        return
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _trace_file = open(path, 'a', encoding='utf-8')
+    _run_id = os.environ.get("CDK_TRACE_RUN") or os.urandom(6).hex()
+    os.environ[TRACE_ENV] = str(path.resolve())
+    os.environ["CDK_TRACE_RUN"] = _run_id
+
+
+def enabled() -> bool:
+    return _trace_file is not None
+
+
+def span(name: str, **attrs):
+    """Open a span named like "publish.hash"; a no-op while tracing is off."""
+    if _trace_file is None:
+        return NULL_SPAN
+    return Span(name, attrs)
+
+
+def traced(name: str):
+    """Decorator form of span() for functions that are a single step."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _trace_file is None:
+                return func(*args, **kwargs)
+            with Span(name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(**counters: int) -> None:
+    """Add counters (bytes_read, files, retries, ...) to the innermost span."""
+    if _trace_file is None:
+        return
+    stack = _stack()
+    if stack:
+        stack[-1].add(**counters)
+
+
+if os.environ.get(TRACE_ENV):
+    enable(os.environ[TRACE_ENV])
+
+
+# =============================================================================
+# SUMMARIES
+# =============================================================================
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(paths: list[Path]) -> list[dict]:
+    """Aggregate trace files into per-span percentiles and counter totals."""
+    walls: dict[str, list[float]] = {}
+    totals: dict[str, dict[str, int]] = {}
+    errors: dict[str, int] = {}
+
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                name = record["span"]
+                walls.setdefault(name, []).append(record["wall_ms"])
+                bucket = totals.setdefault(name, {})
+                for key in ("bytes_read", "bytes_written", "files", "retries"):
+                    if key in record:
+                        bucket[key] = bucket.get(key, 0) + record[key]
+                if "error" in record:
+                    errors[name] = errors.get(name, 0) + 1
+
+    rows = []
+    for name, values in walls.items():
+        values.sort()
+        rows.append({
+            "span": name,
+            "count": len(values),
+            "total_ms": round(sum(values), 3),
+            "p50_ms": percentile(values, 50),
+            "p90_ms": percentile(values, 90),
+            "p99_ms": percentile(values, 99),
+            "max_ms": values[-1],
+            "errors": errors.get(name, 0),
+            **totals[name],
+        })
+    rows.sort(key=lambda r: r["total_ms"], reverse=True)
+    return rows
+
+
+def print_summary(rows: list[dict]) -> None:
+    header = (f"{'Span':<24} {'Count':>6} {'Total ms':>10} {'p50':>9} {'p90':>9} "
+              f"{'p99':>9} {'Max':>9} {'Read KB':>9} {'Files':>6} {'Retry':>5}")
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{r['span']:<24} {r['count']:>6} {r['total_ms']:>10.1f} {r['p50_ms']:>9.2f} "
+              f"{r['p90_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['max_ms']:>9.2f} "
+              f"{r.get('bytes_read', 0) // 1024:>9} {r.get('files', 0):>6} {r.get('retries', 0):>5}")
+
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Summarize JSONL traces written with --trace or CDK_TRACE",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python publish_module.py C1M1 --trace trace.jsonl
+  CDK_TRACE=trace.jsonl python validate_module.py "/path/to/module"
+  python tracing.py summarize trace.jsonl
+        """
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary = sub.add_parser("summarize", help="Per-step percentiles")
+    summary.add_argument("files", nargs="+", type=Path, help="Trace JSONL files")
+    summary.add_argument("--json", action="store_true", help="Output as JSON")
+
+    args = parser.parse_args(argv)
+    missing = [p for p in args.files if not p.exists()]
+    if missing:
+        print(f"Error: Trace file not found: {missing[0]}")
+        return 3
+
+    rows = summarize(args.files)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_summary(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
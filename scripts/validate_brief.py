@@ -23,6 +23,9 @@ import argparse
 from pathlib import Path
 from typing import NamedTuple
 
+from timing_model import budget_range
+from tracing import count, enable as enable_tracing, span, traced
+
 
 class ValidationResult(NamedTuple):
     """Result of a single validation check."""
@@ -31,6 +34,29 @@ class ValidationResult(NamedTuple):
     severity: str  # 'error', 'warning', 'info'
 
 
+# Checkbox options on the "Brief Status:" line, most advanced first
+BRIEF_STATUSES = {
+    "locked": r"\[[xX]\]\s*LOCKED",
+    "review": r"\[[xX]\]\s*Under\s*Review",
+    "draft": r"\[[xX]\]\s*Draft",
+}
+
+
+def brief_status(content: str) -> str | None:
+    """
+    Which Brief Status box is ticked: locked, review, draft or unchecked.
+
+    None when the brief has no Brief Status line.
+    """
+    line = re.search(r"Brief\s*Status\s*:(.*)", content, re.IGNORECASE)
+    if not line:
+        return None
+    for status, pattern in BRIEF_STATUSES.items():
+        if re.search(pattern, line.group(1), re.IGNORECASE):
+            return status
+    return "unchecked"
+
+
 class BriefValidator:
     """Validates presentation brief documents."""
 
@@ -67,10 +93,12 @@ class BriefValidator:
         self.content = ""
         self.results: list[ValidationResult] = []
 
+    @traced("brief.load")
     def load_file(self) -> bool:
         """Load the brief file content."""
         try:
             self.content = self.filepath.read_text(encoding='utf-8')
+            count(files=1, bytes_read=len(self.content))
             return True
         except FileNotFoundError:
             self.results.append(ValidationResult(
@@ -160,9 +188,8 @@ class BriefValidator:
             total_time = int(total_match.group(1))
             slide_budget = int(budget_match.group(1))
 
-            # Check if math is roughly correct (2-3 min per slide)
-            min_expected = total_time // 4  # Allows for activities/discussion
-            max_expected = total_time // 1.5
+            # Check if math is roughly correct (1.5-4 min per slide)
+            min_expected, max_expected = budget_range(total_time)
 
             if slide_budget < min_expected:
                 self.results.append(ValidationResult(
@@ -238,6 +265,7 @@ class BriefValidator:
                 severity='warning' if not self.strict else 'error'
             ))
 
+    @traced("brief.validate")
     def validate(self) -> bool:
         """Run all validation checks."""
         if not self.load_file():
@@ -306,8 +334,9 @@ class BriefValidator:
             print("\nBrief validation FAILED - fix errors before proceeding")
 
 
-def main():
+def main(argv: list[str] | None = None, prog: str | None = None):
     parser = argparse.ArgumentParser(
+        prog=prog,
         description='Validate a presentation brief for completeness.'
     )
     parser.add_argument(
@@ -324,11 +353,19 @@ def main():
         action='store_true',
         help='Output results as JSON'
     )
+    parser.add_argument(
+        '--trace',
+        metavar='FILE',
+        help='Append per-step timings to FILE as JSONL'
+    )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.trace:
+        enable_tracing(args.trace)
 
-    validator = BriefValidator(args.filepath, strict=args.strict)
-    is_valid = validator.validate()
+    with span("validate_brief", path=args.filepath):
+        validator = BriefValidator(args.filepath, strict=args.strict)
+        is_valid = validator.validate()
 
     if args.json:
         print(json.dumps(validator.get_summary(), indent=2))
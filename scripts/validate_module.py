@@ -14,18 +14,23 @@ Exit codes:
 Usage:
   python validate_module.py "/path/to/module"
   python validate_module.py "/path/to/module" --schema-only
+  python validate_module.py "/path/to/module" --links
+  python validate_module.py --staged    # Pre-commit: modules in the staged diff
 """
 
 import argparse
+import hashlib
+import json
 import re
+import shutil
+import subprocess
 import sys
 from pathlib import Path
+from typing import NamedTuple
 
-try:
-    import yaml
-except ImportError:
-    print("ERROR: PyYAML required. Install with: pip install pyyaml")
-    sys.exit(1)
+from module_scan import ModuleSnapshot, scan_module
+from tracing import count, enable as enable_tracing, span, traced
+from yaml_compat import require_yaml, safe_load
 
 # =============================================================================
 # CONFIGURATION
@@ -74,9 +79,11 @@ def log(message: str, status: str = "INFO") -> None:
     print(f"{symbol} {message}")
 
 
+@traced("validate.schema")
 def validate_schema(module_path: Path) -> tuple[bool, dict | None, list[str]]:
     """Validate module.yaml exists and conforms to schema."""
     errors = []
+    yaml = require_yaml()
     yaml_path = module_path / "module.yaml"
 
     if not yaml_path.exists():
@@ -85,7 +92,7 @@ def validate_schema(module_path: Path) -> tuple[bool, dict | None, list[str]]:
 
     try:
         with open(yaml_path, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+            data = safe_load(f)
     except yaml.YAMLError as e:
         errors.append(f"YAML parse error: {e}")
         return False, None, errors
@@ -160,31 +167,38 @@ def validate_code_matches_path(module_path: Path, code: str) -> tuple[bool, list
     return len(errors) == 0, errors
 
 
-def validate_deliverables_exist(module_path: Path, deliverables: dict) -> tuple[bool, list[str]]:
+@traced("validate.deliverables")
+def validate_deliverables_exist(module_path: Path, deliverables: dict,
+                                snapshot: ModuleSnapshot | None = None) -> tuple[bool, list[str]]:
     """Check that all specified deliverable files exist."""
     errors = []
+    snapshot = snapshot or scan_module(module_path)
 
     for key, filename in deliverables.items():
         if filename:
             if isinstance(filename, list):
                 for f in filename:
-                    if not (module_path / f).exists():
+                    if not snapshot.exists(f):
                         errors.append(f"Deliverable not found: {key}/{f}")
             else:
-                if not (module_path / filename).exists():
+                if not snapshot.exists(filename):
                     errors.append(f"Deliverable not found: {key} -> {filename}")
 
     return len(errors) == 0, errors
 
 
-def validate_html_content(module_path: Path) -> tuple[bool, list[str]]:
+@traced("validate.html")
+def validate_html_content(module_path: Path,
+                          snapshot: ModuleSnapshot | None = None) -> tuple[bool, list[str]]:
     """Scan HTML files for banned patterns."""
     errors = []
-    html_files = list(module_path.glob("*.html"))
+    snapshot = snapshot or scan_module(module_path)
+    html_files = [f for f in snapshot.files if f.top_level and f.name.endswith(".html")]
 
     for html_file in html_files:
         try:
-            content = html_file.read_text(encoding='utf-8')
+            content = html_file.path.read_text(encoding='utf-8')
+            count(files=1, bytes_read=html_file.size)
         except Exception as e:
             errors.append(f"Cannot read {html_file.name}: {e}")
             continue
@@ -201,21 +215,35 @@ def validate_html_content(module_path: Path) -> tuple[bool, list[str]]:
     return len(errors) == 0, errors
 
 
-def validate_size(module_path: Path) -> tuple[bool, list[str], int]:
-    """Check file and total module size limits."""
+@traced("validate.size")
+def validate_size(module_path: Path,
+                  snapshot: ModuleSnapshot | None = None,
+                  optimize: bool = False) -> tuple[bool, list[str], int]:
+    """
+    Check file and total module size limits.
+
+    With optimize=True, top-level HTML files count at their size after
+    html_optimize, matching what `publish_module.py --optimize` publishes.
+    """
     errors = []
     total_size = 0
-
-    for file_path in module_path.rglob("*"):
-        if file_path.is_file():
-            size = file_path.stat().st_size
-            total_size += size
-
-            if size > MAX_FILE_SIZE:
-                errors.append(
-                    f"File too large: {file_path.name} "
-                    f"({size // 1024}KB > {MAX_FILE_SIZE // 1024}KB)"
-                )
+    snapshot = snapshot or scan_module(module_path)
+
+    for entry in snapshot.files:
+        size = entry.size
+        if optimize and entry.top_level and entry.name.endswith(".html"):
+            from html_optimize import optimize_html
+            try:
+                size = optimize_html(entry.path.read_text(encoding='utf-8')).optimized_bytes
+            except (OSError, UnicodeDecodeError):
+                pass  # Reported by the HTML check; count the raw size
+        total_size += size
+
+        if size > MAX_FILE_SIZE:
+            errors.append(
+                f"File too large: {entry.name} "
+                f"({size // 1024}KB > {MAX_FILE_SIZE // 1024}KB)"
+            )
 
     if total_size > MAX_MODULE_SIZE:
         errors.append(
@@ -230,88 +258,298 @@ def validate_size(module_path: Path) -> tuple[bool, list[str], int]:
 # MAIN VALIDATION
 # =============================================================================
 
-def validate_module(module_path: Path, schema_only: bool = False) -> int:
-    """
-    Full validation of a module.
+class ValidationReport(NamedTuple):
+    """Outcome of check_module, in the order the checks ran."""
+    exit_code: int
+    messages: list[tuple[str, str]]  # (status, text); status "DETAIL" is indented
+    errors: list[str]
+    data: dict | None  # Parsed module.yaml, even when the schema is invalid
+    total_size: int
+    schema_valid: bool
 
-    Returns exit code (0 = valid, 1 = schema, 2 = HTML, 3 = file)
+
+def check_module(module_path: Path, schema_only: bool = False,
+                 snapshot: ModuleSnapshot | None = None,
+                 optimize: bool = False) -> ValidationReport:
     """
-    print(f"\nValidating: {module_path}\n")
+    Run every validation step without printing.
 
+    Exit code semantics match validate_module (0 = valid, 1 = schema,
+    2 = HTML, 3 = file). Other tools (catalog, reports) use this directly.
+    """
+    messages = []
     all_errors = []
     exit_code = 0
 
+    def fail(errors: list[str]) -> None:
+        messages.extend(("FAIL", err) for err in errors)
+        all_errors.extend(errors)
+
     # Step 1: Schema validation
     valid, data, errors = validate_schema(module_path)
     if valid:
-        log("module.yaml exists and parses", "OK")
-        log(f"Schema valid (v{SUPPORTED_SCHEMA_VERSION})", "OK")
+        messages.append(("OK", "module.yaml exists and parses"))
+        messages.append(("OK", f"Schema valid (v{SUPPORTED_SCHEMA_VERSION})"))
     else:
-        for err in errors:
-            log(err, "FAIL")
-        all_errors.extend(errors)
+        fail(errors)
         exit_code = 1
 
     if exit_code != 0 or data is None:
-        print(f"\nRESULT: INVALID - Schema validation failed")
-        return 1
+        return ValidationReport(1, messages, all_errors, data, 0, False)
 
     # Step 2: Code matches path
     valid, errors = validate_code_matches_path(module_path, data.get("code", ""))
     if valid:
-        log(f"Code {data.get('code')} matches path", "OK")
+        messages.append(("OK", f"Code {data.get('code')} matches path"))
     else:
-        for err in errors:
-            log(err, "FAIL")
-        all_errors.extend(errors)
+        fail(errors)
         exit_code = 1
 
+    # One walk of the module folder shared by the remaining steps
+    snapshot = snapshot or scan_module(module_path)
+
     # Step 3: Deliverables exist
     deliverables = data.get("deliverables", {})
-    valid, errors = validate_deliverables_exist(module_path, deliverables)
+    valid, errors = validate_deliverables_exist(module_path, deliverables, snapshot)
     if valid:
-        log("Deliverables exist", "OK")
+        messages.append(("OK", "Deliverables exist"))
     else:
-        for err in errors:
-            log(err, "FAIL")
-        all_errors.extend(errors)
+        fail(errors)
         exit_code = max(exit_code, 3)
 
     if schema_only:
-        if exit_code == 0:
-            print(f"\nRESULT: VALID (schema-only check)")
-        else:
-            print(f"\nRESULT: INVALID - Fix {len(all_errors)} issue(s)")
-        return exit_code
+        return ValidationReport(exit_code, messages, all_errors, data,
+                                snapshot.total_size, True)
 
     # Step 4: HTML validation
-    valid, errors = validate_html_content(module_path)
+    valid, errors = validate_html_content(module_path, snapshot)
     if valid:
-        log("HTML clean (no banned patterns)", "OK")
+        messages.append(("OK", "HTML clean (no banned patterns)"))
     else:
-        log("HTML validation failed:", "FAIL")
-        for err in errors:
-            print(f"  {err}")
+        messages.append(("FAIL", "HTML validation failed:"))
+        messages.extend(("DETAIL", err) for err in errors)
         all_errors.extend(errors)
         exit_code = max(exit_code, 2)
 
     # Step 5: Size check
-    valid, errors, total_size = validate_size(module_path)
+    valid, errors, total_size = validate_size(module_path, snapshot, optimize)
     if valid:
-        log(f"Size: {total_size // 1024}KB (< {MAX_MODULE_SIZE // 1024}KB limit)", "OK")
+        note = " after optimization" if optimize else ""
+        messages.append(("OK", f"Size: {total_size // 1024}KB{note} (< {MAX_MODULE_SIZE // 1024}KB limit)"))
     else:
-        for err in errors:
-            log(err, "FAIL")
-        all_errors.extend(errors)
+        fail(errors)
         exit_code = max(exit_code, 1)
 
+    return ValidationReport(exit_code, messages, all_errors, data, total_size, True)
+
+
+def validate_module(module_path: Path, schema_only: bool = False,
+                    optimize: bool = False, links: bool = False) -> int:
+    """
+    Full validation of a module.
+
+    links also checks Sources-slide and brief URLs (see link_check.py);
+    broken links are warnings and do not change the exit code.
+
+    Returns exit code (0 = valid, 1 = schema, 2 = HTML, 3 = file)
+    """
+    print(f"\nValidating: {module_path}\n")
+
+    report = check_module(module_path, schema_only, optimize=optimize)
+    for status, message in report.messages:
+        if status == "DETAIL":
+            print(f"  {message}")
+        else:
+            log(message, status)
+
+    if not report.schema_valid:
+        print(f"\nRESULT: INVALID - Schema validation failed")
+        return 1
+
+    if schema_only:
+        if report.exit_code == 0:
+            print(f"\nRESULT: VALID (schema-only check)")
+        else:
+            print(f"\nRESULT: INVALID - Fix {len(report.errors)} issue(s)")
+        return report.exit_code
+
+    if links:
+        # Network checks stay out of check_module, which the catalog reuses
+        from link_check import check_links, collect_links
+        results = check_links(list(collect_links([module_path])))
+        broken = [r for r in results.values() if not r.ok]
+        if broken:
+            log(f"{len(broken)} of {len(results)} link(s) broken:", "WARN")
+            for result in broken:
+                print(f"  {result.url} - {result.error}")
+        else:
+            log(f"Links reachable ({len(results)} checked)", "OK")
+
     # Final result
     print()
-    if exit_code == 0:
+    if report.exit_code == 0:
         print("RESULT: VALID - Ready for publish")
     else:
-        print(f"RESULT: INVALID - Fix {len(all_errors)} issue(s) before publish")
+        print(f"RESULT: INVALID - Fix {len(report.errors)} issue(s) before publish")
 
+    return report.exit_code
+
+
+# =============================================================================
+# STAGED (PRE-COMMIT) MODE
+# =============================================================================
+
+# Results of --staged runs, kept inside the git directory so they are never
+# committed. Keyed by module path; reused while the module's staged blobs
+# (every index entry's path, mode and object id) are unchanged.
+STAGED_CACHE_NAME = "cdk-validate-cache.json"
+
+# Staged modules are checked out here (inside the git directory) for checking
+STAGED_CHECKOUT_NAME = "cdk-staged"
+
+
+def git_staged_paths(cwd: Path | None = None) -> tuple[Path, Path, list[str]]:
+    """
+    Return (repository root, git directory, staged paths).
+
+    Raises subprocess.CalledProcessError outside a git repository.
+    """
+    result = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel", "--git-dir"],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    top, git_dir = result.stdout.splitlines()[:2]
+    git_dir = Path(cwd or ".").resolve() / git_dir
+
+    result = subprocess.run(
+        ["git", "diff", "--cached", "--name-only", "-z"],
+        cwd=top, capture_output=True, check=True,
+    )
+    paths = [p.decode('utf-8', 'surrogateescape') for p in result.stdout.split(b"\0") if p]
+    return Path(top), git_dir, paths
+
+
+def git_index_files(repo_root: Path, *pathspecs: str) -> dict[str, tuple[str, str]]:
+    """Index entries matching pathspecs: posix path -> (mode, blob id)."""
+    result = subprocess.run(["git", "ls-files", "--stage", "-z", "--", *pathspecs],
+                            cwd=repo_root, capture_output=True, check=True)
+    entries = {}
+    for record in result.stdout.split(b"\0"):
+        if record:
+            meta, _, path = record.partition(b"\t")
+            mode, blob, _ = meta.decode('ascii').split()
+            entries[path.decode('utf-8', 'surrogateescape')] = (mode, blob)
+    return entries
+
+
+def module_roots_for(repo_root: Path, paths: list[str]) -> list[str]:
+    """Map changed paths to the nearest enclosing folder with a staged module.yaml."""
+    roots_in_index = {
+        path.rpartition("/")[0]
+        for path in git_index_files(repo_root, ":(glob)**/module.yaml")
+    }
+    roots = set()
+
+    for rel in paths:
+        folder = rel.rpartition("/")[0]
+        while folder:
+            if folder in roots_in_index:
+                roots.add(folder)
+                break
+            folder = folder.rpartition("/")[0]
+
+    return sorted(roots)
+
+
+def checkout_staged(repo_root: Path, paths: list[str], dest: Path) -> None:
+    """Write the staged version of paths under dest, keeping their relative paths."""
+    subprocess.run(
+        ["git", "checkout-index", "--force", f"--prefix={dest}/", "-z", "--stdin"],
+        cwd=repo_root, input="\0".join(paths).encode('utf-8', 'surrogateescape'),
+        capture_output=True, check=True,
+    )
+
+
+def load_staged_cache(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def validate_staged(schema_only: bool = False, optimize: bool = False) -> int:
+    """
+    Validate only modules touched by the staged diff, as staged.
+
+    Each module is checked from the index (checked out into the git
+    directory), not the working tree, so unstaged edits neither hide nor
+    cause failures in what is about to be committed.
+
+    Returns the highest exit code across those modules (0 if none).
+    """
+    try:
+        repo_root, git_dir, paths = git_staged_paths()
+    except (OSError, subprocess.CalledProcessError):
+        print("Error: --staged must be run inside a git repository")
+        return 3
+
+    modules = module_roots_for(repo_root, paths)
+    if not modules:
+        log(f"No modules in staged changes ({len(paths)} file(s))")
+        return 0
+
+    cache_path = git_dir / STAGED_CACHE_NAME
+    cache = load_staged_cache(cache_path)
+    mode = f"schema_only={schema_only},optimize={optimize}"
+    index = git_index_files(repo_root, *modules)
+    results = {}
+    pending = {}
+
+    for rel in modules:
+        files = sorted((path, entry) for path, entry in index.items()
+                       if path.startswith(rel + "/"))
+        fingerprint = hashlib.sha1(f"{mode}{files!r}".encode('utf-8')).hexdigest()
+        cached = cache.get(rel)
+        if cached and cached["fingerprint"] == fingerprint:
+            results[rel] = cached["exit_code"], cached["errors"], " (cached)"
+        else:
+            pending[rel] = (fingerprint, [path for path, _ in files])
+
+    if pending:
+        checkout = git_dir / STAGED_CHECKOUT_NAME
+        shutil.rmtree(checkout, ignore_errors=True)
+        try:
+            checkout_staged(repo_root, [p for _, files in pending.values() for p in files],
+                            checkout)
+            for rel, (fingerprint, _) in pending.items():
+                report = check_module(checkout / rel, schema_only, optimize=optimize)
+                results[rel] = report.exit_code, report.errors, ""
+                cache[rel] = {"fingerprint": fingerprint, "exit_code": report.exit_code,
+                              "errors": report.errors}
+        finally:
+            shutil.rmtree(checkout, ignore_errors=True)
+
+    exit_code = 0
+    for rel in modules:
+        code, errors, note = results[rel]
+        if code == 0:
+            log(f"{rel}{note}", "OK")
+        else:
+            log(f"{rel}{note}: {len(errors)} issue(s)", "FAIL")
+            for err in errors:
+                print(f"  {err}")
+        exit_code = max(exit_code, code)
+
+    try:
+        cache_path.write_text(json.dumps(cache, indent=2, sort_keys=True), encoding='utf-8')
+    except OSError:
+        pass  # Cache is an optimization only
+
+    print()
+    if exit_code == 0:
+        print(f"RESULT: VALID - {len(modules)} staged module(s)")
+    else:
+        print(f"RESULT: INVALID - Fix staged modules before committing")
     return exit_code
 
 
@@ -319,8 +557,9 @@ def validate_module(module_path: Path, schema_only: bool = False) -> int:
 # COMMAND LINE INTERFACE
 # =============================================================================
 
-def main():
+def main(argv: list[str] | None = None, prog: str | None = None):
     parser = argparse.ArgumentParser(
+        prog=prog,
         description="Validate a course module before publishing",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
@@ -333,13 +572,34 @@ Exit codes:
 Examples:
   python validate_module.py "/path/to/module"
   python validate_module.py "/path/to/module" --schema-only
+  python validate_module.py --staged    # From a git pre-commit hook
         """
     )
-    parser.add_argument("path", help="Path to module folder")
+    parser.add_argument("path", nargs="?", help="Path to module folder")
+    parser.add_argument("--staged", action="store_true",
+                        help="Validate only modules touched by the staged git diff")
     parser.add_argument("--schema-only", action="store_true",
                         help="Only validate schema, skip HTML checks")
-
-    args = parser.parse_args()
+    parser.add_argument("--optimize", action="store_true",
+                        help="Check HTML sizes after minification (as published with --optimize)")
+    parser.add_argument("--links", action="store_true",
+                        help="Also check Sources-slide and brief links (warnings only)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Append per-step timings to FILE as JSONL")
+
+    args = parser.parse_args(argv)
+    if args.trace:
+        enable_tracing(args.trace)
+
+    if args.staged:
+        if args.path:
+            parser.error("--staged does not take a path")
+        with span("validate_module.staged"):
+            exit_code = validate_staged(args.schema_only, args.optimize)
+        sys.exit(exit_code)
+
+    if not args.path:
+        parser.error("path is required unless --staged is given")
 
     module_path = Path(args.path)
     if not module_path.exists():
@@ -350,7 +610,8 @@ Examples:
         print(f"Error: Path is not a directory: {module_path}")
         sys.exit(3)
 
-    exit_code = validate_module(module_path, args.schema_only)
+    with span("validate_module", path=str(module_path)):
+        exit_code = validate_module(module_path, args.schema_only, args.optimize, args.links)
     sys.exit(exit_code)
 
 
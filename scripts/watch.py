@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Watch and Revalidate
+
+Watches the course base tree and re-runs only the validator affected by a
+save inside a ReWork folder:
+
+    *brief*.md          -> validate_brief
+    module.yaml         -> full module validation
+    *.html              -> HTML patterns + size limits
+    anything else       -> size limits
+
+Bursts of events (synced-drive clients write, rename and touch the same
+file several times) are debounced per ReWork folder. Results go to the
+console and to a JSON status file. Uses inotify on Linux and falls back to
+stat polling elsewhere; both block between events, so an idle watcher
+uses next to no CPU.
+
+Usage:
+    python watch.py
+    python watch.py --base "/path/to/courses" --debounce 3
+    python watch.py --backend poll --interval 5
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from module_scan import scan_module
+from state_paths import CACHE_DIR
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+COURSE_BASE_PATH = Path(os.environ.get("COURSE_BASE_PATH", "."))
+STATUS_FILE = Path(os.environ.get("WATCH_STATUS_FILE", CACHE_DIR / "watch-status.json"))
+
+DEBOUNCE_SECONDS = 2.0
+POLL_INTERVAL = 2.0
+REDISCOVER_SECONDS = 60.0  # Polling backend: look for new ReWork folders
+
+# Deepest level searched for ReWork folders ({year}/Course/Module/ReWork = 4)
+MAX_WATCH_DEPTH = 4
+
+# Editor, sync-client and kit-generated files that never trigger validation
+IGNORED_PREFIXES = ("~$", ".~lock", ".#", "_GIT_PUBLISHED")
+IGNORED_SUFFIXES = (".tmp", ".swp", ".swx", ".part", ".crdownload", "~")
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def log(message: str, status: str = "INFO") -> None:
+    """Print formatted, timestamped log message."""
+    symbols = {
+        "OK": "[OK]",
+        "FAIL": "[FAIL]",
+        "WARN": "[WARN]",
+        "INFO": "->",
+    }
+    symbol = symbols.get(status, "->")
+    print(f"{datetime.now().strftime('%H:%M:%S')} {symbol} {message}", flush=True)
+
+
+def is_rework_folder(name: str) -> bool:
+    """Same naming rule as project_init.find_existing_reworks."""
+    name = name.lower()
+    return "rework" in name or "remake" in name
+
+
+def is_ignored(name: str) -> bool:
+    return name.startswith(IGNORED_PREFIXES) or name.endswith(IGNORED_SUFFIXES)
+
+
+def rework_folder_for(path: Path, base: Path) -> Path | None:
+    """The ReWork folder containing path, if any."""
+    for parent in (path, *path.parents):
+        if parent == base or base not in parent.parents:
+            return None
+        if is_rework_folder(parent.name):
+            return parent
+    return None
+
+
+def classify(path: Path) -> str:
+    """Which validator a change to path affects: brief, module, html or size."""
+    name = path.name.lower()
+    if name == "module.yaml":
+        return "module"
+    if name.endswith(".md") and "brief" in name:
+        return "brief"
+    if name.endswith((".html", ".htm")):
+        return "html"
+    return "size"
+
+
+def find_watch_dirs(base: Path) -> tuple[list[Path], list[Path]]:
+    """
+    Directories to watch: (ancestors of ReWork folders, ReWork folder trees).
+
+    Ancestors are watched so newly created ReWork folders are picked up.
+    """
+    ancestors = []
+    reworks = []
+    pending = [(base, 0)]
+    while pending:
+        folder, depth = pending.pop()
+        if is_rework_folder(folder.name) and depth > 0:
+            reworks.append(folder)
+            reworks.extend(folder.joinpath(*d) for d in sorted(scan_module(folder).dirs))
+            continue
+        ancestors.append(folder)
+        if depth < MAX_WATCH_DEPTH:
+            for sub in scan_module(folder, recursive=False).subdirs:
+                if not sub.name.startswith('.'):
+                    pending.append((sub, depth + 1))
+    return ancestors, reworks
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class InotifyWatcher:
+    """Linux inotify via ctypes; one watch per directory."""
+
+    def __init__(self, base: Path):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.base = base
+        self.watches: dict[int, Path] = {}
+        self.add_tree(base)
+
+    def add_watch(self, folder: Path) -> None:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+        if wd >= 0:
+            self.watches[wd] = folder
+
+    def add_tree(self, folder: Path) -> None:
+        ancestors, reworks = find_watch_dirs(folder)
+        for d in ancestors + reworks:
+            self.add_watch(d)
+
+    def wait(self, timeout: float | None) -> list[Path]:
+        """Block up to timeout seconds; return paths that changed."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        changed = []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            raw = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length]
+            offset += EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                log("Event queue overflowed; revalidating every ReWork folder", "WARN")
+                changed.extend(find_watch_dirs(self.base)[1])
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+
+            folder = self.watches.get(wd)
+            if folder is None:
+                continue
+            path = folder / os.fsdecode(raw.rstrip(b"\0")) if raw.strip(b"\0") else folder
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_tree(path)
+                    changed.append(path)
+                continue
+            changed.append(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Portable fallback: compare file size/mtime snapshots of ReWork folders."""
+
+    def __init__(self, base: Path, interval: float = POLL_INTERVAL):
+        self.base = base
+        self.interval = interval
+        self.snapshots: dict[Path, dict[tuple, tuple]] = {}
+        self.discovered_at = 0.0
+        self.discover()
+
+    def discover(self) -> None:
+        _, reworks = find_watch_dirs(self.base)
+        for folder in reworks:
+            if is_rework_folder(folder.name) and folder not in self.snapshots:
+                self.snapshots[folder] = self.snapshot(folder)
+        self.discovered_at = time.monotonic()
+
+    @staticmethod
+    def snapshot(folder: Path) -> dict[tuple, tuple]:
+        return {f.parts: (f.size, f.mtime_ns) for f in scan_module(folder).files}
+
+    def wait(self, timeout: float | None) -> list[Path]:
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        if time.monotonic() - self.discovered_at > REDISCOVER_SECONDS:
+            self.discover()
+
+        changed = []
+        for folder, before in list(self.snapshots.items()):
+            after = self.snapshot(folder)
+            if after != before:
+                self.snapshots[folder] = after
+                for parts in set(before) ^ set(after) | {
+                        p for p in before.keys() & after.keys() if before[p] != after[p]}:
+                    changed.append(folder.joinpath(*parts))
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def make_watcher(base: Path, backend: str, interval: float):
+    """inotify when available (or requested), else polling."""
+    if backend in ("auto", "inotify") and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(base)
+        except (OSError, AttributeError) as e:
+            if backend == "inotify":
+                raise
+            log(f"inotify unavailable ({e}); falling back to polling", "WARN")
+    return PollingWatcher(base, interval)
+
+
+# =============================================================================
+# VALIDATION
+# =============================================================================
+
+def run_validators(folder: Path, kinds: set[str], paths: set[Path]) -> dict:
+    """Run the validators selected by kinds; returns {kind: result}."""
+    from validate_brief import BriefValidator
+    from validate_module import check_module, validate_html_content, validate_size
+
+    results = {}
+    snapshot = scan_module(folder)
+
+    if "module" in kinds:
+        report = check_module(folder, snapshot=snapshot)
+        results["module"] = {"ok": report.exit_code == 0, "exit_code": report.exit_code,
+                             "errors": report.errors}
+        kinds = kinds - {"html", "size"}  # Covered by the full check
+
+    if "brief" in kinds:
+        for brief in sorted(p for p in paths if classify(p) == "brief" and p.exists()):
+            validator = BriefValidator(str(brief))
+            validator.validate()
+            summary = validator.get_summary()
+            results[f"brief:{brief.name}"] = {"ok": summary["valid"],
+                                              "errors": summary["errors"],
+                                              "warnings": summary["warnings"]}
+
+    if "html" in kinds:
+        ok, errors = validate_html_content(folder, snapshot)
+        results["html"] = {"ok": ok, "errors": errors}
+
+    if kinds & {"html", "size"}:
+        ok, errors, total = validate_size(folder, snapshot)
+        results["size"] = {"ok": ok, "errors": errors, "total_size": total}
+
+    return results
+
+
+def write_status(status_file: Path, status: dict) -> None:
+    """Atomically replace the status file."""
+    status_file.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=status_file.parent, prefix=".watch-")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(status, f, indent=2, sort_keys=True)
+    os.replace(tmp, status_file)
+
+
+def report(folder: Path, results: dict) -> None:
+    """Console lines for one revalidation."""
+    for kind, result in results.items():
+        label = f"{folder.parent.parent.name} / {folder.parent.name}: {kind}"
+        if result["ok"]:
+            log(label, "OK")
+        else:
+            log(f"{label} ({len(result['errors'])} issue(s))", "FAIL")
+            for err in result["errors"][:5]:
+                print(f"           {err}")
+
+
+# =============================================================================
+# MAIN LOOP
+# =============================================================================
+
+def watch(base: Path, status_file: Path = STATUS_FILE, backend: str = "auto",
+          debounce: float = DEBOUNCE_SECONDS, interval: float = POLL_INTERVAL) -> None:
+    """Watch base until interrupted."""
+    watcher = make_watcher(base, backend, interval)
+    log(f"Watching {base} ({type(watcher).__name__.replace('Watcher', '').lower()})")
+
+    status = {}
+    if status_file.exists():
+        try:
+            status = json.loads(status_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            status = {}
+
+    # folder -> (deadline, kinds, paths)
+    pending: dict[Path, tuple[float, set[str], set[Path]]] = {}
+
+    try:
+        while True:
+            now = time.monotonic()
+            timeout = max(0.0, min(d for d, _, _ in pending.values()) - now) if pending else None
+
+            for path in watcher.wait(timeout):
+                if is_ignored(path.name) or path == status_file:
+                    continue
+                folder = rework_folder_for(path, base)
+                if folder is None:
+                    continue
+                _, kinds, paths = pending.get(folder, (0, set(), set()))
+                kinds.add("size" if path == folder else classify(path))
+                paths.add(path)
+                pending[folder] = (time.monotonic() + debounce, kinds, paths)
+
+            now = time.monotonic()
+            due = [f for f, (deadline, _, _) in pending.items() if deadline <= now]
+            for folder in due:
+                _, kinds, paths = pending.pop(folder)
+                if not folder.exists():
+                    status.pop(str(folder), None)
+                    continue
+                results = run_validators(folder, kinds, paths)
+                report(folder, results)
+                status[str(folder)] = {
+                    "checked_at": datetime.now().isoformat(timespec='seconds'),
+                    "ok": all(r["ok"] for r in results.values()),
+                    "results": results,
+                }
+            if due:
+                write_status(status_file, status)
+    except KeyboardInterrupt:
+        log("Stopped")
+    finally:
+        watcher.close()
+
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main(argv: list[str] | None = None, prog: str | None = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Re-run validators when files in ReWork folders change",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python watch.py
+  python watch.py --base "/path/to/courses" --debounce 3
+  python watch.py --backend poll --interval 5
+        """
+    )
+    parser.add_argument("--base", type=Path, default=COURSE_BASE_PATH,
+                        help="Course base path (default: COURSE_BASE_PATH)")
+    parser.add_argument("--status-file", type=Path, default=STATUS_FILE,
+                        help=f"JSON status file (default: {STATUS_FILE})")
+    parser.add_argument("--backend", choices=["auto", "inotify", "poll"], default="auto",
+                        help="Change detection backend (default: auto)")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE_SECONDS,
+                        help=f"Quiet seconds before revalidating (default: {DEBOUNCE_SECONDS})")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL,
+                        help=f"Polling interval in seconds (default: {POLL_INTERVAL})")
+
+    args = parser.parse_args(argv)
+    if not args.base.is_dir():
+        print(f"Error: Path is not a directory: {args.base}")
+        return 3
+
+    watch(args.base.resolve(), args.status_file, args.backend, args.debounce, args.interval)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Lazy PyYAML loading.
+
+PyYAML is only imported the first time a script actually parses YAML, so
+`--help` and commands that never touch module.yaml start quickly. The C
+(libyaml) loader is preferred when PyYAML was built with it.
+
+Usage:
+    from yaml_compat import require_yaml, safe_load
+
+    data = safe_load(path.read_text(encoding='utf-8'))
+"""
+
+import sys
+
+from tracing import span
+
+_yaml = None
+
+
+def require_yaml():
+    """Import and return the yaml module, exiting with a hint if missing."""
+    global _yaml
+    if _yaml is None:
+        try:
+            import yaml
+        except ImportError:
+            print("ERROR: PyYAML required. Install with: pip install pyyaml")
+            sys.exit(1)
+        _yaml = yaml
+    return _yaml
+
+
+def safe_load(stream):
+    """yaml.safe_load, using CSafeLoader when libyaml is available."""
+    yaml = require_yaml()
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with span("yaml.parse"):
+        return yaml.load(stream, Loader=loader)
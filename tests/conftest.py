@@ -0,0 +1,7 @@
+"""The kit's scripts import each other by module name; make them importable here."""
+
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
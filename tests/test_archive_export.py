@@ -0,0 +1,46 @@
+"""archive_export: plain and object-store published modules in one archive."""
+
+import pytest
+
+import archive_export
+from archive_export import create_archive, extract_module, load_manifest, select_modules
+from object_store import ObjectStore
+
+STORED = {
+    "module.yaml": b'code: "C1M2"\nstatus: "published"\n',
+    "slides.html": b"<html><style>p{}</style><p>Stored</p></html>",
+}
+
+
+@pytest.fixture
+def courses(tmp_path, monkeypatch):
+    """C1M1 published as a folder, C1M2 into the object store."""
+    courses = tmp_path / "courses"
+    published = courses / "google-pm"
+    monkeypatch.setattr(archive_export, "COURSES_ROOT", courses)
+    monkeypatch.setattr(archive_export, "PUBLISHED_ROOT", published)
+
+    folder = published / "c1" / "m1"
+    folder.mkdir(parents=True)
+    (folder / "module.yaml").write_bytes(b'code: "C1M1"\nstatus: "review"\n')
+    (folder / "slides.html").write_bytes(b"<html><p>Plain</p></html>")
+    ObjectStore(courses / ".store").put_module("C1M2", STORED)
+    return courses
+
+
+def test_store_published_modules_are_selected(courses):
+    store = courses / ".store"
+    assert list(select_modules(root=courses / "google-pm", store_root=store)) == ["C1M1", "C1M2"]
+    assert list(select_modules(status="published", root=courses / "google-pm",
+                               store_root=store)) == ["C1M2"]
+
+
+def test_stored_module_is_archived_under_its_publish_path(courses, tmp_path):
+    archive = tmp_path / "recording.zip"
+    modules = select_modules(root=courses / "google-pm", store_root=courses / ".store")
+    create_archive(archive, modules)
+
+    manifest = load_manifest(archive)
+    assert manifest["modules"]["C1M2"]["path"] == "google-pm/c1/m2"
+    extract_module(archive, "C1M2", tmp_path / "out")
+    assert {p.name: p.read_bytes() for p in (tmp_path / "out").iterdir()} == STORED
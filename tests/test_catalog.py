@@ -0,0 +1,78 @@
+"""catalog: newest-rework flags, publish state and incremental refreshes."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import catalog
+from benchmark import build_catalog, init_git_repo
+from conftest import SCRIPTS_DIR
+
+
+def make_module(folder, code: str) -> None:
+    folder.mkdir(parents=True)
+    (folder / "module.yaml").write_text(f'code: "{code}"\ntitle: "{code}"\n', encoding='utf-8')
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = catalog.connect(tmp_path / "catalog.db")
+    yield conn
+    conn.close()
+
+
+def latest(conn) -> dict[str, str]:
+    return {row["code"]: row["rework"] for row in catalog.query_catalog(conn)}
+
+
+def test_latest_rework_goes_by_month_and_year(tmp_path, conn):
+    base = tmp_path / "base"
+    for name in ("March 2026 ReWork", "January 2027 ReWork", "November 2026 ReWork"):
+        make_module(base / "Course 1" / "Module 1" / name, "C1M1")
+    for name in ("September 2026 ReWork", "October 2026 ReWork"):
+        make_module(base / "Course 1" / "Module 2" / name, "C1M2")
+    catalog.refresh_catalog(conn, base)
+
+    assert latest(conn) == {"C1M1": "January 2027 ReWork", "C1M2": "October 2026 ReWork"}
+    reworks = [row["rework"] for row in catalog.query_catalog(conn, code="C1M1", all_reworks=True)]
+    assert reworks == ["March 2026 ReWork", "November 2026 ReWork", "January 2027 ReWork"]
+
+
+def test_published_module_with_subfolders_is_not_unpublished(tmp_path, conn):
+    base = tmp_path / "base"
+    ((code, folder),) = build_catalog(base, 1)
+    (folder / "research").mkdir()
+    (folder / "research" / "report.md").write_text("# Gemini report\n", encoding='utf-8')
+
+    workspace = tmp_path / "workspace"
+    init_git_repo(workspace)
+    env = {**os.environ, "WORKSPACE_ROOT": str(workspace), "COURSE_BASE_PATH": str(base),
+           "CDK_STATE_DIR": str(tmp_path / "state")}
+    for flags in ([], ["--optimize"]):
+        subprocess.run([sys.executable, "publish_module.py", code, *flags], cwd=SCRIPTS_DIR,
+                       env=env, check=True, capture_output=True)
+        catalog.refresh_catalog(conn, base)
+        assert catalog.query_catalog(conn, unpublished=True) == []
+
+    (folder / "speaker_notes.md").write_text("# Edited\n", encoding='utf-8')
+    catalog.refresh_catalog(conn, base)
+    assert [row["code"] for row in catalog.query_catalog(conn, unpublished=True)] == [code]
+
+
+def test_refresh_skips_unchanged_modules(tmp_path, conn):
+    base = tmp_path / "base"
+    make_module(base / "Course 1" / "Module 1" / "March 2026 ReWork", "C1M1")
+    make_module(base / "Course 1" / "Module 2" / "March 2026 ReWork", "C1M2")
+    assert catalog.refresh_catalog(conn, base)["added"] == 2
+    before = {row["code"]: dict(row) for row in catalog.query_catalog(conn)}
+
+    edited = base / "Course 1" / "Module 2" / "March 2026 ReWork" / "module.yaml"
+    edited.write_text('code: "C1M2"\ntitle: "Renamed"\n', encoding='utf-8')
+    counts = catalog.refresh_catalog(conn, base)
+
+    assert counts == {"added": 0, "updated": 1, "unchanged": 1, "removed": 0}
+    after = {row["code"]: dict(row) for row in catalog.query_catalog(conn)}
+    assert after["C1M1"] == before["C1M1"]
+    assert after["C1M2"]["title"] == "Renamed"
@@ -0,0 +1,55 @@
+"""
+cdk startup: help output must not import PyYAML or the subcommands.
+
+-X importtime only reports `import` statements, not the subcommand that
+cdk loads with importlib.import_module, so the checks look for PyYAML and
+for the kit modules every subcommand imports in turn (tracing, module_scan,
+yaml_compat, ...).
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+from cdk import COMMANDS
+from conftest import SCRIPTS_DIR
+
+# Self time (microseconds) cdk --help may add to bare interpreter startup
+HELP_IMPORT_BUDGET_US = 20_000
+
+KIT_MODULES = {path.stem for path in SCRIPTS_DIR.glob("*.py")}
+
+
+def imported_modules(*args: str) -> dict[str, int]:
+    """Modules imported by `python -X importtime *args`, with self time in us."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=SCRIPTS_DIR,
+                            capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            self_us, _, name = line[len("import time:"):].split("|")
+            if self_us.strip().isdigit():
+                modules[name.strip()] = int(self_us)
+    return modules
+
+
+def test_help_imports_no_subcommand_within_budget():
+    baseline = imported_modules("-c", "pass")
+    added = {name: us for name, us in imported_modules("cdk.py", "--help").items()
+             if name not in baseline}
+
+    assert "yaml" not in added
+    assert not KIT_MODULES & set(added)
+    assert sum(added.values()) < HELP_IMPORT_BUDGET_US, added
+
+
+@pytest.mark.parametrize("command", sorted(COMMANDS))
+def test_subcommand_help_does_not_import_yaml(command):
+    assert "yaml" not in imported_modules("cdk.py", command, "--help")
+
+
+def test_publish_does_not_import_project_init():
+    # publish only needs rework_order, which lives in module_scan
+    added = imported_modules("-c", "import publish_module")
+    assert "project_init" not in added and "timing_model" not in added
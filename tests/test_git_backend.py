@@ -0,0 +1,86 @@
+"""git_backend: FastImportGit commits the same trees as SubprocessGit."""
+
+import os
+import subprocess
+
+import pytest
+
+from benchmark import init_git_repo
+from git_backend import FastImportGit, SubprocessGit, run_git
+
+
+def write(path, text: str, executable: bool = False) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding='utf-8')
+    os.chmod(path, 0o755 if executable else 0o644)
+
+
+def publish_twice(backend, repo, file_mode: str) -> list[str]:
+    """Commit a module folder, then again after edits; returns both trees."""
+    init_git_repo(repo)
+    subprocess.run(["git", "config", "core.fileMode", file_mode], cwd=repo, check=True)
+    write(repo / ".gitignore", "*.tmp\nscratch/\n")
+    run_git(repo, "add", ".gitignore")
+    run_git(repo, "commit", "-q", "-m", "ignore rules")
+
+    folder = repo / "courses" / "c1" / "m1"
+    write(folder / "slides.html", "<h1>Slides</h1>")
+    write(folder / "build.sh", "echo build\n", executable=True)
+    write(folder / "draft.tmp", "autosave")
+    write(folder / "scratch" / "notes.md", "# Scratch")
+
+    trees = []
+    for message in ("Publish", "Update"):
+        with backend(repo) as git:
+            ok, _ = git.commit_folder(folder, message)
+        assert ok
+        trees.append(run_git(repo, "ls-tree", "-r", "HEAD", "--", "courses"))
+        # Second round: an edit plus a mode flip
+        write(folder / "slides.html", "<h1>Slides v2</h1>", executable=True)
+    return trees
+
+
+@pytest.mark.parametrize("file_mode", ["true", "false"])
+def test_fast_import_matches_git_add(tmp_path, file_mode):
+    expected = publish_twice(SubprocessGit, tmp_path / "subprocess", file_mode)
+    assert "draft.tmp" not in expected[0] and "scratch" not in expected[0]
+    assert publish_twice(FastImportGit, tmp_path / "fast-import", file_mode) == expected
+
+
+def commit_paths_twice(backend, repo, one_session: bool = False) -> list[str]:
+    """Commit listed files, then an edit, an addition and a deletion; returns both trees."""
+    init_git_repo(repo)
+    shared = backend(repo) if one_session else None
+    store = repo / "store"
+    write(store / "manifest.json", "{}")
+    write(store / "ab" / "cdef", "block")
+    write(store / "stray", "not listed")
+
+    trees = []
+    for paths in ([store / "manifest.json", store / "ab" / "cdef"],
+                  [store / "manifest.json", store / "ab" / "cdef", store / "12" / "3456"]):
+        if shared:
+            ok, _ = shared.commit_paths(paths, "Store")
+        else:
+            with backend(repo) as git:
+                ok, _ = git.commit_paths(paths, "Store")
+        assert ok
+        if not shared:
+            trees.append(run_git(repo, "ls-tree", "-r", "HEAD", "--", "store"))
+        if len(paths) == 2:
+            write(store / "manifest.json", '{"v": 2}')
+            write(store / "12" / "3456", "new block")
+            (store / "ab" / "cdef").unlink()
+    if shared:
+        shared.close()
+        trees.append(run_git(repo, "ls-tree", "-r", "HEAD", "--", "store"))
+    assert run_git(repo, "status", "--porcelain", "--", "store") == "?? store/stray"
+    return trees
+
+
+def test_fast_import_commit_paths_matches_update_index(tmp_path):
+    expected = commit_paths_twice(SubprocessGit, tmp_path / "subprocess")
+    assert "stray" not in expected[0] and "ab/cdef" not in expected[1]
+    assert commit_paths_twice(FastImportGit, tmp_path / "fast-import") == expected
+    # Both commits in one session: the second sees the first before it lands
+    assert commit_paths_twice(FastImportGit, tmp_path / "batch", one_session=True) == expected[1:]
@@ -0,0 +1,27 @@
+"""html_optimize: unused-rule pruning and whitespace collapsing."""
+
+from html_optimize import minify_css, optimize_html
+
+USED = ({"card", "title"}, {"main"})
+
+
+def test_negated_and_functional_classes_are_not_required():
+    css = ".card:not(.hidden){color:red}:is(.card,.gone) p{margin:0}:where(.gone) a{x:y}"
+    assert minify_css(css, USED) == css
+
+
+def test_unused_rules_are_still_pruned():
+    css = ".gone{a:b}.card:has(.x), .gone:not(.card){c:d}#main,#other{e:f}"
+    assert minify_css(css, USED) == ".card:has(.x){c:d}#main{e:f}"
+
+
+def test_selector_list_splits_on_top_level_commas_only():
+    css = ":is(.gone, .card) > p, .gone{a:b}"
+    assert minify_css(css, USED) == ":is(.gone,.card)>p{a:b}"
+
+
+def test_quoted_attribute_values_keep_their_whitespace():
+    html = '<p  class="card"\n  title="a   b"  data-note=\'x  >  y\'>one    two</p>'
+    text = optimize_html(html).text
+    assert text == '<p class="card"\ntitle="a   b" data-note=\'x  >  y\'>one two</p>\n'
+    assert optimize_html(text).text == text
@@ -0,0 +1,144 @@
+"""link_check against a local stand-in server."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from link_check import FAILURE_TTL, MAX_REDIRECTS, LinkCache, check_links
+
+SLOW_SECONDS = 1.0
+TIMEOUT = 0.2  # Client timeout used against /slow
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Keep-alive server with slow, redirecting and failing endpoints."""
+    protocol_version = "HTTP/1.1"
+    requests: list[tuple[str, str]] = []  # (method, path) of every request
+
+    def respond(self, status: int, location: str | None = None) -> None:
+        self.send_response(status)
+        if location:
+            self.send_header("Location", location)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        if self.command == "GET":
+            self.wfile.write(b"ok")
+
+    def route(self) -> None:
+        self.requests.append((self.command, self.path))
+        path = self.path.partition("?")[0]
+        if path == "/ok":
+            self.respond(200)
+        elif path == "/slow":
+            time.sleep(SLOW_SECONDS)
+            self.respond(200)
+        elif path == "/no-head":
+            self.respond(405 if self.command == "HEAD" else 200)
+        elif path == "/fail":
+            self.respond(500)
+        elif path == "/loop":
+            self.respond(302, self.path)
+        elif path.startswith("/hops/"):
+            # /hops/N redirects N more times before reaching /ok
+            hops = int(path.rsplit("/", 1)[1])
+            self.respond(302, f"/hops/{hops - 1}" if hops > 1 else "/ok")
+        else:
+            self.respond(404)
+
+    do_HEAD = do_GET = route
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def requests():
+    StandInHandler.requests.clear()
+    return StandInHandler.requests
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LinkCache(tmp_path / "links.json", ttl=600)
+
+
+def check(url: str, cache: LinkCache, **kwargs):
+    return check_links([url], cache, **kwargs)[url]
+
+
+def test_head_success_needs_no_get(server, cache, requests):
+    result = check(f"{server}/ok", cache)
+    assert (result.ok, result.status, result.method) == (True, 200, "HEAD")
+    assert requests == [("HEAD", "/ok")]
+
+
+def test_rejected_head_falls_back_to_get(server, cache, requests):
+    result = check(f"{server}/no-head", cache)
+    assert (result.ok, result.status, result.method) == (True, 200, "GET")
+    assert requests == [("HEAD", "/no-head"), ("GET", "/no-head")]
+
+
+def test_server_error_is_broken_after_get(server, cache):
+    result = check(f"{server}/fail", cache)
+    assert (result.ok, result.status, result.error, result.method) == (False, 500, "HTTP 500",
+                                                                      "GET")
+
+
+def test_redirects_are_followed_up_to_the_limit(server, cache):
+    result = check(f"{server}/hops/{MAX_REDIRECTS}", cache)
+    assert result.ok and result.final_url == f"{server}/ok"
+
+    result = check(f"{server}/hops/{MAX_REDIRECTS + 1}", cache)
+    assert not result.ok and result.status is None
+    assert f"more than {MAX_REDIRECTS} redirects" in result.error
+
+
+def test_redirect_loop_is_broken(server, cache, requests):
+    result = check(f"{server}/loop", cache)
+    assert not result.ok and "redirects" in result.error
+    # MAX_REDIRECTS + 1 HEAD requests; too many redirects is not retried with GET
+    assert len(requests) == MAX_REDIRECTS + 1
+
+
+def test_slow_server_times_out(server, cache):
+    start = time.perf_counter()
+    result = check(f"{server}/slow", cache, timeout=TIMEOUT)
+    assert not result.ok and result.status is None
+    assert "timed out" in result.error
+    assert time.perf_counter() - start < SLOW_SECONDS
+
+
+def test_cached_results_expire_after_their_ttl(server, tmp_path, requests):
+    path = tmp_path / "links.json"
+    urls = [f"{server}/ok", f"{server}/fail"]
+    check_links(urls, LinkCache(path, ttl=600))
+    checked = len(requests)
+
+    # Fresh: both served from the saved cache without a request
+    results = check_links(urls, LinkCache(path, ttl=600))
+    assert all(r.cached for r in results.values())
+    assert len(requests) == checked
+
+    # Past FAILURE_TTL only the broken link is rechecked...
+    cache = LinkCache(path, ttl=2 * FAILURE_TTL)
+    for entry in cache.results.values():
+        entry["checked_at"] -= FAILURE_TTL + 1
+    results = check_links(urls, cache)
+    assert results[urls[0]].cached and not results[urls[1]].cached
+
+    # ...and past the TTL the working one is too
+    cache = LinkCache(path, ttl=600)
+    cache.results[urls[0]]["checked_at"] -= 601
+    results = check_links(urls, cache)
+    assert not results[urls[0]].cached and results[urls[1]].cached
@@ -0,0 +1,86 @@
+"""module_scan: one os.scandir per directory, no per-file stat calls."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from module_scan import scan_module
+from validate_module import validate_deliverables_exist, validate_html_content, validate_size
+
+DELIVERABLES = {
+    "presentation": "presentation.html",
+    "speaker_notes": "speaker_notes.md",
+    "brief": "02_Presentation_Brief.md",
+}
+
+
+@pytest.fixture
+def module_path(tmp_path: Path) -> Path:
+    """A rework folder with top-level deliverables and two asset folders."""
+    root = tmp_path / "Course 1" / "Module 2" / "March 2026 ReWork"
+    for name in ("assets/img", "research"):
+        (root / name).mkdir(parents=True)
+    (root / "presentation.html").write_text("<html><body><h1>Slide</h1></body></html>")
+    (root / "speaker_notes.md").write_text("# Notes\n")
+    (root / "02_Presentation_Brief.md").write_text("# Brief\n")
+    for i in range(5):
+        (root / "assets" / "img" / f"figure{i}.svg").write_text("<svg/>")
+        (root / "research" / f"report{i}.md").write_text("# Report\n")
+    return root
+
+
+@pytest.fixture
+def syscalls(monkeypatch) -> dict[str, int]:
+    """Count os.scandir and os.stat calls (pathlib goes through both)."""
+    calls = {"scandir": 0, "stat": 0}
+
+    def counting(name, func):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(os, "scandir", counting("scandir", os.scandir))
+    monkeypatch.setattr(os, "stat", counting("stat", os.stat))
+    return calls
+
+
+def per_validator_walk(module_path: Path) -> None:
+    """The validators before module_scan: each one re-walks and re-stats."""
+    for filename in DELIVERABLES.values():
+        (module_path / filename).exists()
+    for html_file in module_path.glob("*.html"):
+        html_file.read_text(encoding='utf-8')
+    for file_path in module_path.rglob("*"):
+        if file_path.is_file():
+            file_path.stat().st_size
+
+
+def shared_snapshot(module_path: Path) -> None:
+    snapshot = scan_module(module_path)
+    validate_deliverables_exist(module_path, DELIVERABLES, snapshot)
+    validate_html_content(module_path, snapshot)
+    validate_size(module_path, snapshot)
+
+
+def test_scan_lists_each_directory_once(module_path, syscalls):
+    snapshot = scan_module(module_path)
+    assert len(snapshot.files) == 13
+    assert syscalls == {"scandir": 4, "stat": 0}
+
+
+def test_validators_on_a_snapshot_do_not_touch_the_tree(module_path, syscalls):
+    shared_snapshot(module_path)
+    assert syscalls == {"scandir": 4, "stat": 0}
+
+
+def test_snapshot_beats_the_per_validator_walk(module_path, syscalls):
+    per_validator_walk(module_path)
+    old = dict(syscalls)
+    syscalls.update(scandir=0, stat=0)
+    shared_snapshot(module_path)
+
+    assert old["scandir"] > syscalls["scandir"]
+    assert old["stat"] >= 2 * 13  # is_file() and stat() for every file
+    assert syscalls["stat"] == 0
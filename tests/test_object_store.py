@@ -0,0 +1,85 @@
+"""object_store: garbage collection driven by the live manifests, and --store publishes."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmark import build_catalog, init_git_repo
+from conftest import SCRIPTS_DIR
+from git_backend import run_git
+from object_store import ObjectStore
+
+STYLE = b"<style>body { margin: 0; }</style>"
+
+
+def deck(body: bytes) -> bytes:
+    return b"<html><head>" + STYLE + b"</head><body>" + body + b"</body></html>"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ObjectStore(tmp_path / ".store")
+    store.put_module("C1M1", {"slides.html": deck(b"<h1>First draft</h1>"), "notes.md": b"v1"})
+    store.put_module("C1M2", {"slides.html": deck(b"<h1>Other module</h1>")})
+    return store
+
+
+def test_republishing_leaves_unreferenced_objects(store):
+    before = store.stats()
+    store.put_module("C1M1", {"slides.html": deck(b"<h1>Second draft</h1>"), "notes.md": b"v2"})
+    stats = store.stats()
+
+    # The old markup after the shared <style> block, and the old notes
+    old = len(b"</head><body><h1>First draft</h1></body></html>") + len(b"v1")
+    assert before["orphaned_objects"] == 0
+    assert (stats["orphaned_objects"], stats["orphaned_bytes"]) == (2, old)
+    assert stats["objects"] == before["objects"]
+
+
+def test_gc_deletes_only_unreferenced_objects(store):
+    store.put_module("C1M1", {"slides.html": deck(b"<h1>Second draft</h1>"), "notes.md": b"v2"})
+    orphaned = store.stats()
+
+    assert store.gc(dry_run=True)["objects"] == orphaned["orphaned_objects"]
+    assert store.stats() == orphaned
+
+    removed = store.gc()
+    assert removed == {"objects": orphaned["orphaned_objects"],
+                       "bytes": orphaned["orphaned_bytes"]}
+    stats = store.stats()
+    assert stats["orphaned_objects"] == 0
+    assert {d for d, _ in store.iter_objects()} == store.live_digests()
+    assert store.read_module("C1M1")["notes.md"] == b"v2"
+    assert store.read_module("C1M2")["slides.html"] == deck(b"<h1>Other module</h1>")
+    assert store.gc() == {"objects": 0, "bytes": 0}
+
+
+@pytest.mark.parametrize("backend", ["subprocess", "fast-import"])
+def test_store_publish_commits_only_the_module(tmp_path, backend):
+    base = tmp_path / "base"
+    ((code, folder),) = build_catalog(base, 1)
+    # Latin-1, not UTF-8
+    (folder / "speaker_notes.md").write_bytes(b"# Notes\n\nCaf\xe9 au lait\n")
+
+    workspace = tmp_path / "workspace"
+    init_git_repo(workspace)
+    stray = workspace / "courses" / ".store" / "notes.txt"
+    stray.parent.mkdir(parents=True)
+    stray.write_text("Not part of any module\n", encoding='utf-8')
+    env = {**os.environ, "WORKSPACE_ROOT": str(workspace), "COURSE_BASE_PATH": str(base),
+           "CDK_STATE_DIR": str(tmp_path / "state"), "GIT_BACKEND": backend}
+
+    def publish():
+        subprocess.run([sys.executable, "publish_module.py", code, "--store"], cwd=SCRIPTS_DIR,
+                       env=env, check=True, capture_output=True)
+        committed = set(run_git(workspace, "ls-files", "--", "courses/.store").splitlines())
+        assert committed == {p.relative_to(workspace).as_posix()
+                             for p in ObjectStore(workspace / "courses" / ".store")
+                             .module_paths(code)}
+
+    publish()
+    (folder / "speaker_notes.md").write_bytes(b"# Notes\n\nTh\xe9 au citron\n")
+    publish()
+    assert run_git(workspace, "status", "--porcelain") == "?? courses/.store/notes.txt"
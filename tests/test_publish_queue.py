@@ -0,0 +1,69 @@
+"""publish_queue with several submitting processes racing to drain."""
+
+import os
+import sqlite3
+import subprocess
+import sys
+
+from conftest import SCRIPTS_DIR
+
+SUBMITTERS = 6
+
+# One client process: queue the modules, then drain until they have all
+# finished. publish is a stand-in that logs when each run starts and ends.
+CLIENT = """
+import os, sys, time
+from pathlib import Path
+import publish_queue
+
+log = Path(sys.argv[1])
+
+def publish(module, git=None, **options):
+    with open(log, "a") as f:
+        f.write(f"start {module}\\n")
+    time.sleep(0.005)
+    with open(log, "a") as f:
+        f.write(f"end {module}\\n")
+    return 0
+
+conn = publish_queue.connect(publish_queue.QUEUE_DB)
+ids = publish_queue.submit(conn, sys.argv[2:], submitted_by=f"client-{os.getpid()}")
+while not all(job["status"] in publish_queue.FINISHED for job in publish_queue.get_jobs(conn, ids)):
+    if publish_queue.work(conn, batch_size=3, publish=publish) is None:
+        time.sleep(0.02)
+"""
+
+
+def test_concurrent_submitters_run_each_job_once_in_order(tmp_path):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    for cmd in (["git", "init", "-q"],
+                ["git", "-c", "user.name=t", "-c", "user.email=t@example.invalid",
+                 "commit", "-q", "--allow-empty", "-m", "init"]):
+        subprocess.run(cmd, cwd=workspace, check=True)
+    env = {**os.environ, "WORKSPACE_ROOT": str(workspace), "CDK_STATE_DIR": str(tmp_path)}
+    log = tmp_path / "publish.log"
+
+    # Every client queues two modules of its own and two everyone shares
+    clients = [subprocess.Popen([sys.executable, "-c", CLIENT, str(log),
+                                 f"C{i}M1", "C9M1", f"C{i}M2", "C9M2"],
+                                cwd=SCRIPTS_DIR, env=env)
+               for i in range(1, SUBMITTERS + 1)]
+    assert [client.wait(timeout=60) for client in clients] == [0] * SUBMITTERS
+
+    conn = sqlite3.connect(str(tmp_path / "publish-queue.db"))
+    jobs = conn.execute("SELECT id, module, status, run_id FROM jobs ORDER BY id").fetchall()
+    runs = dict(conn.execute("SELECT id, module FROM jobs WHERE id = run_id ORDER BY id"))
+    conn.close()
+
+    assert len(jobs) == 4 * SUBMITTERS
+    assert all(status == "done" for _, _, status, _ in jobs)
+    # Each job belongs to exactly one run, of its own module
+    assert all(runs[run_id] == module for _, module, _, run_id in jobs)
+
+    # Runs never overlapped, and ran once each in the order they were queued
+    lines = log.read_text().split()
+    assert lines[0::4] == ["start"] * len(runs) and lines[2::4] == ["end"] * len(runs)
+    assert lines[1::4] == lines[3::4] == list(runs.values())
+    # Duplicate submissions coalesced into fewer runs than jobs
+    assert len(runs) < len(jobs)
@@ -0,0 +1,38 @@
+"""qa_report: publish state of the newest rework of each module."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import catalog
+from benchmark import build_catalog, init_git_repo
+from conftest import SCRIPTS_DIR
+from qa_report import write_report
+
+
+def test_published_module_is_not_changed_since_publish(tmp_path):
+    base = tmp_path / "base"
+    ((code, folder),) = build_catalog(base, 1)
+    (folder / "research").mkdir()
+    (folder / "research" / "report.md").write_text("# Gemini report\n", encoding='utf-8')
+    # An older rework that sorts after March by name
+    shutil.copytree(folder, folder.parent / "September 2025 ReWork")
+
+    workspace = tmp_path / "workspace"
+    init_git_repo(workspace)
+    env = {**os.environ, "WORKSPACE_ROOT": str(workspace), "COURSE_BASE_PATH": str(base),
+           "CDK_STATE_DIR": str(tmp_path / "state")}
+    subprocess.run([sys.executable, "publish_module.py", code, "--optimize"], cwd=SCRIPTS_DIR,
+                   env=env, check=True, capture_output=True)
+
+    conn = catalog.connect(tmp_path / "catalog.db")
+    catalog.refresh_catalog(conn, base)
+    summary = write_report(conn, tmp_path / "report")
+    conn.close()
+
+    (row,) = json.loads((tmp_path / "report" / "report.json").read_text())["modules"]
+    assert row["path"] == str(folder)
+    assert row["published_hash"] and not row["changed_since_publish"]
+    assert summary.counts["changed_since_publish"] == 0
@@ -0,0 +1,49 @@
+"""validate_module --staged: modules are checked as staged, not as on disk."""
+
+import subprocess
+
+import pytest
+
+from benchmark import build_catalog, init_git_repo
+from validate_module import validate_staged
+
+BROKEN = '<img src="https://example.com/logo.png">'
+
+
+@pytest.fixture
+def presentation(tmp_path, monkeypatch):
+    """A valid module committed in a repository that is the cwd."""
+    repo = tmp_path / "repo"
+    init_git_repo(repo)
+    ((_, folder),) = build_catalog(repo, 1)
+    subprocess.run(["git", "add", "."], cwd=repo, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "module"], cwd=repo, check=True)
+    monkeypatch.chdir(repo)
+    return folder / "presentation.html"
+
+
+def stage(path) -> None:
+    subprocess.run(["git", "add", str(path)], cwd=path.parent, check=True)
+
+
+def test_broken_staged_version_fails_despite_unstaged_fix(presentation):
+    clean = presentation.read_text(encoding='utf-8')
+    presentation.write_text(clean.replace("</body>", BROKEN + "</body>"), encoding='utf-8')
+    stage(presentation)
+    presentation.write_text(clean, encoding='utf-8')
+
+    assert validate_staged() == 2
+
+
+def test_unstaged_breakage_does_not_fail_the_commit(presentation, capsys):
+    clean = presentation.read_text(encoding='utf-8')
+    presentation.write_text(clean.replace("<h1>", "<h1>Edited "), encoding='utf-8')
+    stage(presentation)
+    presentation.write_text(clean.replace("</body>", BROKEN + "</body>"), encoding='utf-8')
+
+    assert validate_staged() == 0
+    # Reused while the staged blobs are unchanged, whatever the working tree holds
+    presentation.write_text(clean, encoding='utf-8')
+    capsys.readouterr()
+    assert validate_staged() == 0
+    assert "(cached)" in capsys.readouterr().out